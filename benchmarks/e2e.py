@@ -0,0 +1,260 @@
+"""End-to-end orchestration benchmark for OrderProcessingWorkflow with stub agents.
+
+Runs the real workflow and activities on Temporal's in-process test server
+(time-skipping by default) while ``BaseEcommerceAgent._run`` is replaced by an
+instant stub, so the numbers measure Temporal and our own code, not the model.
+With ``--cassette`` the agents instead replay conversations recorded with
+``AGENT_CASSETTE_MODE=record`` (see src/agents/cassette.py), at their recorded
+latency multiplied by ``--time-scale``.
+
+    python -m benchmarks.e2e --orders 200 --concurrency 50 --output e2e_results.json
+    python -m benchmarks.e2e --address localhost:7233   # use an already running server
+    python -m benchmarks.e2e --cassette cassettes/agents.jsonl --time-scale 0.5
+    python -m benchmarks.e2e --step-mode inline local activity   # compare status update modes
+    python -m benchmarks.e2e --lanes --concurrency 200           # per-lane latency under backlog
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+import uuid
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Sequence
+from temporalio.api.enums.v1 import EventType
+from temporalio.client import Client
+from temporalio.common import Priority
+from temporalio.testing import WorkflowEnvironment
+from temporalio.worker import Worker
+from src.agents.base import BaseEcommerceAgent
+from src.utils.lanes import LanePolicy
+from src.demo import (
+    create_sample_order,
+    create_suspicious_order,
+    create_inventory_issue_order,
+    create_payment_issue_order
+)
+from src.worker import ACTIVITIES, WORKFLOWS
+from src.workflows.order_processing import OrderProcessingWorkflow
+
+SCENARIOS = {
+    "normal": create_sample_order,
+    "suspicious": create_suspicious_order,
+    "inventory_issue": create_inventory_issue_order,
+    "payment_issue": create_payment_issue_order,
+}
+
+STUB_OUTPUTS = {
+    ("Order Intake Agent", "normal"): "Email valid, address complete, inventory available. APPROVE",
+    ("Order Intake Agent", "suspicious"): "High quantity and test email look suspicious. ESCALATE",
+    ("Order Intake Agent", "inventory_issue"): "Insufficient inventory for the requested quantity. REJECT",
+    ("Order Intake Agent", "payment_issue"): "Email valid, address complete, inventory available. APPROVE",
+    ("Payment Agent", "normal"): "Payment successful. Transaction ID: TXN123456. APPROVE",
+    ("Payment Agent", "payment_issue"): "Payment method expired. ESCALATE",
+    ("Fulfillment Agent", "normal"): "Shipping to New York available with standard. SHIP",
+    ("Customer Service Agent", "suspicious"): "Ticket created and verification requested. RESOLVE",
+    ("Customer Service Agent", "payment_issue"): "Ticket created, asked customer for a new card. RESOLVE",
+}
+
+
+async def stub_run(self: BaseEcommerceAgent, prompt: str, model: Optional[str] = None) -> str:
+    """Instant stand-in for the model: the scenario is encoded in the order id."""
+    for (agent_name, scenario), output in STUB_OUTPUTS.items():
+        if agent_name == self.name and f"-{scenario.upper()}-" in prompt:
+            return output
+    return STUB_OUTPUTS.get((self.name, "normal"), "RESOLVE")
+
+
+def make_orders(count: int) -> List[Dict[str, Any]]:
+    orders = []
+    names = list(SCENARIOS)
+    for i in range(count):
+        scenario = names[i % len(names)]
+        order = SCENARIOS[scenario]()
+        order.id = f"ORD-{scenario.upper()}-{i}-{uuid.uuid4().hex[:6].upper()}"
+        orders.append({"scenario": scenario, "order": order.to_dict()})
+    return orders
+
+
+def summarize_history(events: Sequence[Any]) -> Dict[str, int]:
+    """Event count, serialized size, scheduled activities, local activities and timers for one history."""
+    def count(event_type: int) -> int:
+        return sum(1 for e in events if e.event_type == event_type)
+    
+    return {
+        "events": len(events),
+        "bytes": sum(e.ByteSize() for e in events),
+        "activities": count(EventType.EVENT_TYPE_ACTIVITY_TASK_SCHEDULED),
+        # Local activity results are recorded as markers.
+        "local_activities": count(EventType.EVENT_TYPE_MARKER_RECORDED),
+        "timers": count(EventType.EVENT_TYPE_TIMER_STARTED),
+    }
+
+
+def aggregate(runs: List[Dict[str, Any]], elapsed: float) -> Dict[str, Any]:
+    by_path: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for run in runs:
+        by_path[f"{run['scenario']}:{run['status']}"].append(run)
+    
+    paths = {}
+    for path, items in sorted(by_path.items()):
+        paths[path] = {
+            "orders": len(items),
+            "activities_per_order": statistics.mean(r["activities"] for r in items),
+            "local_activities_per_order": statistics.mean(r.get("local_activities", 0) for r in items),
+            "timers_per_order": statistics.mean(r.get("timers", 0) for r in items),
+            "events_per_order": statistics.mean(r["events"] for r in items),
+            "bytes_per_order": statistics.mean(r["bytes"] for r in items),
+            "latency_ms_p50": statistics.median(r["latency_ms"] for r in items),
+            "latency_ms_mean": statistics.mean(r["latency_ms"] for r in items),
+        }
+    
+    by_lane: Dict[str, List[float]] = defaultdict(list)
+    for run in runs:
+        if "lane" in run:
+            by_lane[run["lane"]].append(run["latency_ms"])
+    lanes = {
+        lane: {
+            "orders": len(latencies),
+            "latency_ms_p50": statistics.median(latencies),
+            "latency_ms_p95": sorted(latencies)[min(len(latencies) - 1, round(0.95 * (len(latencies) - 1)))],
+        }
+        for lane, latencies in sorted(by_lane.items())
+    }
+    
+    return {
+        "orders": len(runs),
+        "elapsed_seconds": elapsed,
+        "workflows_per_second": len(runs) / elapsed if elapsed else 0.0,
+        "paths": paths,
+        **({"lanes": lanes} if lanes else {}),
+    }
+
+
+async def drive(
+    client: Client,
+    task_queue: str,
+    orders: List[Dict[str, Any]],
+    concurrency: int,
+    options: Optional[Dict[str, Any]] = None,
+    lanes: Optional[LanePolicy] = None
+) -> Dict[str, Any]:
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def run_one(item: Dict[str, Any]) -> Dict[str, Any]:
+        lane = lanes.classify(item["order"]) if lanes else None
+        async with semaphore:
+            started = time.perf_counter()
+            handle = await client.start_workflow(
+                OrderProcessingWorkflow.run,
+                args=[item["order"], options or {}],
+                id=f"bench-{item['order']['id']}",
+                task_queue=task_queue,
+                priority=lanes.priority(item["order"]) if lanes else Priority.default
+            )
+            try:
+                status = (await handle.result())["status"]
+            except Exception:
+                status = "failed"
+            latency_ms = (time.perf_counter() - started) * 1000
+        history = await handle.fetch_history()
+        return {
+            "scenario": item["scenario"],
+            "status": status,
+            "latency_ms": latency_ms,
+            **({"lane": lane} if lane else {}),
+            **summarize_history(history.events),
+        }
+    
+    started = time.perf_counter()
+    runs = await asyncio.gather(*(run_one(item) for item in orders))
+    return aggregate(list(runs), time.perf_counter() - started)
+
+
+async def run_benchmark(
+    orders: int,
+    concurrency: int,
+    address: Optional[str] = None,
+    time_skipping: bool = True,
+    cassette: Optional[str] = None,
+    time_scale: float = 1.0,
+    step_modes: Sequence[str] = ("inline",),
+    lanes: bool = False
+) -> Dict[str, Any]:
+    """Benchmark report for one step mode, or ``{"modes": {mode: report}}`` for several on the same server."""
+    if cassette:
+        os.environ.update({
+            "AGENT_CASSETTE_MODE": "replay",
+            "AGENT_CASSETTE_PATH": cassette,
+            "AGENT_CASSETTE_TIME_SCALE": str(time_scale),
+        })
+    else:
+        BaseEcommerceAgent._run = stub_run
+    task_queue = f"bench-{uuid.uuid4().hex[:8]}"
+    
+    if address:
+        env = None
+        client = await Client.connect(address)
+    elif time_skipping:
+        env = await WorkflowEnvironment.start_time_skipping()
+        client = env.client
+    else:
+        env = await WorkflowEnvironment.start_local()
+        client = env.client
+    
+    # Lane thresholds and weights come from the environment, as for the real worker.
+    policy = LanePolicy.from_env().model_copy(update={"enabled": True}) if lanes else LanePolicy()
+    try:
+        async with Worker(client, task_queue=task_queue, workflows=WORKFLOWS, activities=ACTIVITIES):
+            reports = {}
+            for mode in step_modes:
+                reports[mode] = await drive(
+                    client, task_queue, make_orders(orders), concurrency, {"step_mode": mode}, policy if lanes else None
+                )
+            return reports[step_modes[0]] if len(step_modes) == 1 else {"modes": reports}
+    finally:
+        if env is not None:
+            await env.shutdown()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark OrderProcessingWorkflow orchestration with stub agents")
+    parser.add_argument("--orders", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--address", help="Connect to an existing Temporal server instead of the test server")
+    parser.add_argument("--no-time-skipping", action="store_true", help="Use the local dev server instead of the time-skipping one")
+    parser.add_argument("--cassette", help="Replay recorded agent runs from this cassette instead of stub outputs")
+    parser.add_argument("--time-scale", type=float, default=1.0, help="Multiplier for recorded model latency (0 = instant)")
+    parser.add_argument(
+        "--step-mode", nargs="+", default=["inline"], choices=["inline", "local", "activity"],
+        help="How status updates, notifications and event logs run; several modes are benchmarked one after another"
+    )
+    parser.add_argument("--lanes", action="store_true", help="Route orders to priority lanes and report latency per lane")
+    parser.add_argument("--output", default="e2e_results.json")
+    args = parser.parse_args()
+    
+    report = asyncio.run(run_benchmark(
+        args.orders, args.concurrency, args.address, not args.no_time_skipping, args.cassette, args.time_scale,
+        args.step_mode, args.lanes
+    ))
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    
+    for mode, mode_report in report.get("modes", {args.step_mode[0]: report}).items():
+        print(f"[{mode}] {mode_report['orders']} orders in {mode_report['elapsed_seconds']:.2f}s "
+              f"({mode_report['workflows_per_second']:.1f} workflows/s)")
+        for path, stats in mode_report["paths"].items():
+            print(f"{path:32s} activities={stats['activities_per_order']:.1f} "
+                  f"local={stats['local_activities_per_order']:.1f} timers={stats['timers_per_order']:.1f} "
+                  f"events={stats['events_per_order']:.0f} bytes={stats['bytes_per_order']:.0f} "
+                  f"p50={stats['latency_ms_p50']:.0f}ms")
+        for lane, stats in mode_report.get("lanes", {}).items():
+            print(f"lane {lane:27s} orders={stats['orders']} "
+                  f"p50={stats['latency_ms_p50']:.0f}ms p95={stats['latency_ms_p95']:.0f}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,240 @@
+"""Offline micro-benchmarks for the model, serialization and prompt-building hot paths.
+
+    python -m benchmarks.micro --output bench_results.json
+    python -m benchmarks.micro --output bench_results.json --compare benchmarks/baseline.json
+
+With ``--compare`` the run exits non-zero if any case's median time per call is
+more than ``--threshold`` slower than the baseline.
+"""
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from typing import Any, Callable, Dict, List, Tuple
+from src.agents.customer_service import (
+    CustomerServiceAgent,
+    calculate_refund_amount,
+    check_customer_history,
+    create_support_ticket,
+    suggest_resolution
+)
+from src.agents.fulfillment import (
+    FulfillmentAgent,
+    calculate_shipping_cost,
+    check_shipping_availability,
+    estimate_delivery_time,
+    generate_tracking_number
+)
+from src.agents.order_intake import (
+    OrderIntakeAgent,
+    check_inventory,
+    validate_address,
+    validate_customer_email
+)
+from src.agents.payment import (
+    PaymentAgent,
+    check_fraud_risk,
+    process_payment,
+    validate_payment_method
+)
+from src.models.order import Order
+from src.utils.json_encoder import deserialize_from_temporal, serialize_for_temporal
+
+ORDER_SIZES = {"small": 2, "large": 200}
+
+SAMPLE_OUTPUTS = {
+    "intake": "All checks passed: email valid, address complete, inventory available. Decision: APPROVE",
+    "payment": "Payment method valid, low fraud risk. Payment successful, Transaction ID: TXN123456. Decision: APPROVE",
+    "fulfillment": "Shipping to New York available with standard. Tracking TRK0123456789. Decision: SHIP",
+    "customer_service": "Created ticket TKT123456 and suggested an alternative payment method. Decision: RESOLVE",
+}
+
+
+def make_order_data(product_count: int) -> Dict[str, Any]:
+    products = [
+        {
+            "id": f"PROD-{i:05d}",
+            "name": f"Benchmark Product {i}",
+            "price": 10.0 + i,
+            "quantity": 1 + i % 3,
+            "sku": f"SKU-{i:05d}"
+        }
+        for i in range(product_count)
+    ]
+    return {
+        "id": f"ORD-BENCH-{product_count}",
+        "customer": {
+            "id": "CUST-BENCH",
+            "name": "Bench Customer",
+            "email": "bench@example.com",
+            "phone": "+1-555-0100",
+            "address": {
+                "street": "123 Main Street",
+                "city": "New York",
+                "state": "NY",
+                "zip_code": "10001",
+                "country": "USA"
+            }
+        },
+        "products": products,
+        "total_amount": sum(p["price"] * p["quantity"] for p in products),
+        "payment_method": {
+            "type": "credit_card",
+            "last4": "1234",
+            "expiry_month": 12,
+            "expiry_year": 2030
+        }
+    }
+
+
+def build_cases() -> List[Tuple[str, Callable[[], Any]]]:
+    cases: List[Tuple[str, Callable[[], Any]]] = []
+    agents = {
+        "intake": OrderIntakeAgent(),
+        "payment": PaymentAgent(),
+        "fulfillment": FulfillmentAgent(),
+        "customer_service": CustomerServiceAgent(),
+    }
+    
+    for size, product_count in ORDER_SIZES.items():
+        order_data = make_order_data(product_count)
+        order = Order(**order_data)
+        payload = serialize_for_temporal(order.model_dump())
+        context = {
+            "order": order,
+            "retry_count": 1,
+            "issue_type": "payment_failed",
+            "escalation_reason": "Payment declined"
+        }
+        
+        cases.append((f"order_construct[{size}]", lambda d=order_data: Order(**d)))
+        cases.append((f"order_to_dict[{size}]", order.to_dict))
+        cases.append((f"serialize_for_temporal[{size}]", lambda o=order: serialize_for_temporal(o.model_dump())))
+        cases.append((f"deserialize_from_temporal[{size}]", lambda p=payload: deserialize_from_temporal(p)))
+        for name, agent in agents.items():
+            cases.append((f"build_prompt[{name},{size}]", lambda a=agent, c=context: a.build_prompt(c)))
+    
+    context = {"order": Order(**make_order_data(ORDER_SIZES["small"])), "retry_count": 0}
+    for name, agent in agents.items():
+        output = SAMPLE_OUTPUTS[name]
+        cases.append((f"parse_decision[{name}]", lambda a=agent, o=output: a.parse_decision(o, context)))
+    
+    cases.extend([
+        ("tool[check_inventory]", lambda: check_inventory("SKU-00001", 2)),
+        ("tool[validate_customer_email]", lambda: validate_customer_email("bench@example.com")),
+        ("tool[validate_address]", lambda: validate_address("123 Main Street, New York")),
+        ("tool[process_payment]", lambda: process_payment(120.0, "credit_card", "1234")),
+        ("tool[validate_payment_method]", lambda: validate_payment_method("1234", 12, 2030)),
+        ("tool[check_fraud_risk]", lambda: check_fraud_risk(1200.0, "bench@example.com", "123 Main Street, New York, NY")),
+        ("tool[calculate_shipping_cost]", lambda: calculate_shipping_cost(6.0, "New York", "express")),
+        ("tool[generate_tracking_number]", generate_tracking_number),
+        ("tool[check_shipping_availability]", lambda: check_shipping_availability("New York", "standard")),
+        ("tool[estimate_delivery_time]", lambda: estimate_delivery_time("New York", "standard")),
+        ("tool[create_support_ticket]", lambda: create_support_ticket("ORD-1", "payment_failed", "declined")),
+        ("tool[check_customer_history]", lambda: check_customer_history("bench@example.com")),
+        ("tool[suggest_resolution]", lambda: suggest_resolution("payment_failed", 120.0)),
+        ("tool[calculate_refund_amount]", lambda: calculate_refund_amount(120.0, "inventory_unavailable")),
+    ])
+    return cases
+
+
+def time_case(func: Callable[[], Any], repeat: int = 5, min_time: float = 0.05) -> Dict[str, Any]:
+    """Time ``func`` like ``timeit``: calibrate a loop count, then take ``repeat`` samples."""
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        loops *= 2 if elapsed == 0 else max(2, min(10, int(min_time / elapsed) + 1))
+    
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        samples.append((time.perf_counter() - start) / loops * 1e9)
+    
+    return {
+        "loops": loops,
+        "ns_per_op_min": min(samples),
+        "ns_per_op_median": statistics.median(samples),
+    }
+
+
+def run_benchmarks(select: str = "", repeat: int = 5, min_time: float = 0.05) -> Dict[str, Any]:
+    random.seed(0)
+    results = {}
+    for name, func in build_cases():
+        if select and select not in name:
+            continue
+        results[name] = time_case(func, repeat=repeat, min_time=min_time)
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    """Return one row per case present in both runs, with ``regression`` set past ``threshold``."""
+    rows = []
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        ratio = result["ns_per_op_median"] / base["ns_per_op_median"]
+        rows.append({
+            "name": name,
+            "baseline_ns": base["ns_per_op_median"],
+            "current_ns": result["ns_per_op_median"],
+            "ratio": ratio,
+            "regression": ratio > 1.0 + threshold,
+        })
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Run offline micro-benchmarks")
+    parser.add_argument("--output", default="bench_results.json", help="Where to write the JSON results")
+    parser.add_argument("--compare", help="Baseline JSON file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed slowdown before flagging, e.g. 0.10 for 10%%")
+    parser.add_argument("--select", default="", help="Only run cases whose name contains this string")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.05, help="Minimum seconds per timing sample")
+    args = parser.parse_args()
+    
+    current = run_benchmarks(args.select, args.repeat, args.min_time)
+    with open(args.output, "w") as f:
+        json.dump(current, f, indent=2, sort_keys=True)
+    
+    for name, result in current["results"].items():
+        print(f"{name:50s} {result['ns_per_op_median']:>14,.0f} ns/op")
+    print(f"\nWrote {len(current['results'])} results to {args.output}")
+    
+    if not args.compare:
+        return 0
+    
+    with open(args.compare) as f:
+        baseline = json.load(f)
+    rows = compare(current, baseline, args.threshold)
+    regressions = [r for r in rows if r["regression"]]
+    
+    print(f"\nComparison against {args.compare} (threshold {args.threshold:.0%}):")
+    for row in rows:
+        flag = "REGRESSION" if row["regression"] else "ok"
+        print(f"{row['name']:50s} {row['ratio']:>7.2f}x  {flag}")
+    
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) detected")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
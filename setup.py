@@ -7,12 +7,13 @@ setup(
     author="Demo Developer",
     author_email="demo@example.com",
     packages=find_packages(),
+    package_data={"src.catalog": ["products.json"]},
     python_requires=">=3.9",
     install_requires=[
-        "temporalio>=1.5.0",
+        "temporalio>=1.10.0",
         "openai-agents>=0.1.0",
         "pydantic>=2.0.0",
-        "httpx>=0.24.0",
+        "httpx[http2]>=0.24.0",
         "python-dotenv>=1.0.0",
     ],
     extras_require={
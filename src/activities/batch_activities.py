@@ -0,0 +1,29 @@
+import json
+import logging
+from typing import Any, Dict
+from temporalio import activity
+
+logger = logging.getLogger(__name__)
+
+
+@activity.defn
+async def load_order_batch(source: str, cursor: int, limit: int) -> Dict[str, Any]:
+    """Read up to ``limit`` orders from a JSON-lines file starting at byte ``cursor``.
+
+    The returned ``next_cursor`` is a byte offset, so each page costs a seek rather
+    than a rescan of the lines already handed out.
+    """
+    logger.info(f"Loading up to {limit} orders from {source} at offset {cursor}")
+    
+    orders = []
+    with open(source, "rb") as f:
+        f.seek(cursor)
+        while len(orders) < limit:
+            line = f.readline()
+            if not line:
+                break
+            if line.strip():
+                orders.append(json.loads(line))
+        next_cursor = f.tell()
+    
+    return {"orders": orders, "next_cursor": next_cursor}
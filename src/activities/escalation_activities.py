@@ -0,0 +1,27 @@
+import logging
+import os
+from typing import Any, Dict
+from temporalio import activity
+from src.utils.sharding import base_task_queue
+from src.workflows.escalation_queue import ESCALATION_QUEUE_WORKFLOW_ID, EscalationQueueWorkflow
+
+logger = logging.getLogger(__name__)
+
+
+@activity.defn
+async def enqueue_escalation(request_data: Dict[str, Any]) -> None:
+    """Signal-with-start the escalation queue so it is created on first use."""
+    logger.info(f"Enqueueing escalation for order {request_data['order']['id']}: {request_data['issue_type']}")
+    
+    await activity.client().start_workflow(
+        EscalationQueueWorkflow.run,
+        {
+            "max_concurrency": int(os.getenv("ESCALATION_QUEUE_MAX_CONCURRENCY", "4")),
+            "dedup_window_seconds": float(os.getenv("ESCALATION_DEDUP_WINDOW_SECONDS", "300"))
+        },
+        id=ESCALATION_QUEUE_WORKFLOW_ID,
+        # One queue for all shards, so it must not follow the caller's shard queue.
+        task_queue=base_task_queue(activity.info().task_queue),
+        start_signal="enqueue",
+        start_signal_args=[request_data]
+    )
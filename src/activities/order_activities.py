@@ -1,42 +1,92 @@
 import asyncio
 import logging
+import re
+import time
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 from temporalio import activity
-from src.agents.order_intake import OrderIntakeAgent
-from src.agents.payment import PaymentAgent
-from src.agents.fulfillment import FulfillmentAgent
-from src.agents.customer_service import CustomerServiceAgent
-from src.models.order import Order, OrderStatus, PaymentStatus, ShippingStatus
+from src.agents.registry import load_agent_class
+from src.catalog.index import get_catalog
+from src.catalog.prices import get_price_file, verify_order_total
+from src.models.order import Order, OrderStatus, OrderValidationResult, PaymentStatus, Product, ShippingStatus
+from src.utils.profiling import profiled
+from src.utils.sharding import sharded
 
 logger = logging.getLogger(__name__)
 
 
+STOCK_PATTERN = re.compile(r"out[ -]of[ -]stock|inventory|unavailable|not available|discontinued", re.IGNORECASE)
+
+
+def stock_alternatives(order: Order, reasoning: str) -> List[Product]:
+    """Alternatives for a rejected order, only when it was rejected over stock.
+
+    Suggestions cover the products the catalog cannot supply, or the whole
+    order when the agent cites a stock problem the catalog does not show.
+    Other rejections (a bad email, a suspicious order) get none.
+    """
+    catalog = get_catalog()
+    unavailable = catalog.unavailable_products(order)
+    if unavailable:
+        return catalog.suggest_for_order(order, products=unavailable)
+    if STOCK_PATTERN.search(reasoning):
+        return catalog.suggest_for_order(order)
+    return []
+
+
 @activity.defn
+@sharded
+@profiled()
 async def process_order_intake(order_data: Dict[str, Any]) -> Dict[str, Any]:
     logger.info(f"Processing order intake for order {order_data['id']}")
     
-    agent = OrderIntakeAgent()
-    context = {"order": Order(**order_data)}
-    
+    order = Order(**order_data)
+    context = {"order": order}
+    
+    # Price verification runs before the model is involved; a mismatch escalates directly.
+    prices = get_price_file()
+    if prices is not None:
+        price_check = verify_order_total(order, prices)
+        context["price_check"] = price_check
+        if not price_check.ok:
+            logger.warning(f"Price mismatch on order {order.id}: {price_check.mismatches}")
+            return {
+                "decision": "ESCALATE",
+                "confidence": 1.0,
+                "reasoning": "Price verification failed: " + "; ".join(price_check.mismatches),
+                "next_action": "escalate_to_customer_service",
+                "requires_human_intervention": True,
+                "suggested_alternatives": []
+            }
+    
+    agent = load_agent_class("order_intake")()
     decision = await agent.process(context)
     
     logger.info(f"Order intake decision: {decision.decision} - {decision.reasoning}")
     
+    approved = decision.decision == "APPROVE"
+    validation = OrderValidationResult(
+        is_valid=approved,
+        suggested_alternatives=[] if approved else stock_alternatives(order, decision.reasoning)
+    )
+    
     return {
         "decision": decision.decision,
         "confidence": decision.confidence,
         "reasoning": decision.reasoning,
         "next_action": decision.next_action,
-        "requires_human_intervention": decision.requires_human_intervention
+        "requires_human_intervention": decision.requires_human_intervention,
+        "suggested_alternatives": [p.model_dump() for p in validation.suggested_alternatives]
     }
 
 
 @activity.defn
+@sharded
+@profiled()
 async def process_payment(order_data: Dict[str, Any], retry_count: int = 0) -> Dict[str, Any]:
     logger.info(f"Processing payment for order {order_data['id']} (retry {retry_count})")
     
-    agent = PaymentAgent()
+    agent = load_agent_class("payment")()
     context = {"order": Order(**order_data), "retry_count": retry_count}
     
     decision = await agent.process(context)
@@ -54,11 +104,47 @@ async def process_payment(order_data: Dict[str, Any], retry_count: int = 0) -> D
 
 
 @activity.defn
-async def process_fulfillment(order_data: Dict[str, Any]) -> Dict[str, Any]:
+@sharded
+@profiled()
+async def quote_fulfillment(order_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Check shipping availability and price a shipment without involving the model."""
+    from src.agents.fulfillment import (
+        calculate_shipping_cost,
+        check_shipping_availability,
+        estimate_delivery_time,
+        shipping_details
+    )
+    
+    logger.info(f"Quoting fulfillment for order {order_data['id']}")
+    started = time.perf_counter()
+    
+    order = Order(**order_data)
+    shipping_address, total_weight = shipping_details(order)
+    shipping_method = "standard"
+    availability = check_shipping_availability(shipping_address, shipping_method)
+    
+    return {
+        "shipping_method": shipping_method,
+        "available": "not available" not in availability,
+        "availability": availability,
+        "shipping_cost": calculate_shipping_cost(total_weight, shipping_address, shipping_method),
+        "estimated_delivery": estimate_delivery_time(shipping_address, shipping_method),
+        "elapsed_ms": (time.perf_counter() - started) * 1000
+    }
+
+
+@activity.defn
+@sharded
+@profiled()
+async def process_fulfillment(
+    order_data: Dict[str, Any],
+    quote: Optional[Dict[str, Any]] = None,
+    batched: bool = False
+) -> Dict[str, Any]:
     logger.info(f"Processing fulfillment for order {order_data['id']}")
     
-    agent = FulfillmentAgent()
-    context = {"order": Order(**order_data)}
+    agent = load_agent_class("fulfillment")()
+    context = {"order": Order(**order_data), "quote": quote, "batched": batched}
     
     decision = await agent.process(context)
     
@@ -74,6 +160,8 @@ async def process_fulfillment(order_data: Dict[str, Any]) -> Dict[str, Any]:
 
 
 @activity.defn
+@sharded
+@profiled()
 async def handle_customer_service(
     order_data: Dict[str, Any],
     issue_type: str,
@@ -81,11 +169,13 @@ async def handle_customer_service(
 ) -> Dict[str, Any]:
     logger.info(f"Handling customer service for order {order_data['id']}")
     
-    agent = CustomerServiceAgent()
+    agent = load_agent_class("customer_service")()
+    order = Order(**order_data)
     context = {
-        "order": Order(**order_data),
+        "order": order,
         "issue_type": issue_type,
-        "escalation_reason": escalation_reason
+        "escalation_reason": escalation_reason,
+        "suggested_alternatives": get_catalog().suggest_for_order(order)
     }
     
     decision = await agent.process(context)
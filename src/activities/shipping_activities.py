@@ -0,0 +1,74 @@
+import logging
+import os
+from typing import Any, Dict
+from temporalio import activity
+from src.models.order import Order
+from src.shipping.carriers import get_tracking_pool
+from src.shipping.manifest import Manifest, destination_zone
+from src.utils.metrics import METRICS
+from src.utils.sharding import base_task_queue
+
+logger = logging.getLogger(__name__)
+
+
+@activity.defn
+async def enqueue_shipment(workflow_id: str, order_data: Dict[str, Any], shipping_method: str = "standard") -> None:
+    """Signal-with-start the manifest builder so it is created on first use."""
+    from src.agents.fulfillment import shipping_details
+    # The manifest workflow imports submit_manifest from this module.
+    from src.workflows.shipment_manifest import SHIPMENT_MANIFEST_WORKFLOW_ID, ShipmentManifestWorkflow
+    
+    order = Order(**order_data)
+    destination, weight = shipping_details(order)
+    request = {
+        "workflow_id": workflow_id,
+        "order_id": order.id,
+        "carrier": os.getenv("SHIPPING_CARRIER", "local"),
+        "zone": destination_zone(order_data["customer"]["address"]),
+        "shipping_method": shipping_method,
+        "weight_lbs": weight,
+        "destination": destination
+    }
+    logger.info(f"Adding order {order.id} to the {request['carrier']} manifest for zone {request['zone']}")
+    
+    await activity.client().start_workflow(
+        ShipmentManifestWorkflow.run,
+        {
+            "max_shipments": int(os.getenv("MANIFEST_MAX_SHIPMENTS", "50")),
+            "window_seconds": float(os.getenv("MANIFEST_WINDOW_SECONDS", "30"))
+        },
+        id=SHIPMENT_MANIFEST_WORKFLOW_ID,
+        # One builder for all shards, so it must not follow the caller's shard queue.
+        task_queue=base_task_queue(activity.info().task_queue),
+        start_signal="add_shipment",
+        start_signal_args=[request]
+    )
+
+
+@activity.defn
+async def submit_manifest(manifest_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Allocate tracking numbers for a closed manifest and submit it to its carrier in one request.
+
+    A retry allocates fresh numbers, but the carrier keeps those of the first
+    submission and returns them, so orders are always told the numbers on record.
+    """
+    manifest = Manifest(**manifest_data)
+    pool = get_tracking_pool(manifest.carrier)
+    
+    numbers = await pool.take(len(manifest.shipments))
+    receipt = await pool.carrier.submit_manifest(
+        manifest,
+        {s.order_id: number for s, number in zip(manifest.shipments, numbers)}
+    )
+    
+    METRICS.increment("shipping.manifests", carrier=manifest.carrier)
+    METRICS.observe("shipping.manifest_size", len(manifest.shipments), carrier=manifest.carrier)
+    logger.info(
+        f"Submitted manifest {manifest.manifest_id} with {len(manifest.shipments)} shipment(s) "
+        f"({manifest.total_weight_lbs:.1f} lbs) to {manifest.carrier}: {receipt.confirmation}"
+    )
+    return {
+        "manifest_id": manifest.manifest_id,
+        "confirmation": receipt.confirmation,
+        "tracking_numbers": receipt.tracking_numbers
+    }
@@ -1,16 +1,263 @@
-from typing import Any, Dict, Optional
-from agents import Agent
+import asyncio
+import logging
+import os
+import re
+import time
+from typing import Any, Dict, Optional, Set, Tuple
+from agents import Agent, RunConfig, Runner
+from src.agents.cassette import run_agent
+from src.agents.hedging import HedgePolicy, run_hedged
+from src.agents.model_routing import load_tier_config
+from src.agents.prompts import PromptTemplate, record_input_tokens, record_prompt
+from src.agents.rate_limiter import AGENT_PRIORITIES, Permit, estimate_tokens, get_rate_limiter
+from src.agents.tool_memo import memo_scope
 from src.models.order import AgentDecision
+from src.utils.lanes import LANE_RATE_LIMIT_OFFSETS, current_lane
+from src.utils.metrics import METRICS
+from src.utils.profiling import PROFILER
+
+logger = logging.getLogger(__name__)
+
+VERDICT_PATTERN = re.compile(r"DECISION:\s*\**\s*([A-Z_]+)[^A-Z_]", re.IGNORECASE)
+CONFIDENCE_PATTERN = re.compile(r"CONFIDENCE:\s*\**\s*([01](?:\.\d+)?)", re.IGNORECASE)
+
+STREAMING_INSTRUCTION = """
+        Begin your final answer with a single line of the form "DECISION: <{choices}>"
+        before any explanation.
+        """
+
+TIERING_INSTRUCTION = """
+        End your answer with a line of the form "CONFIDENCE: <0.0-1.0>" saying how
+        sure you are of your decision.
+        """
+
+# Reasoning capture keeps running after the activity has returned its decision.
+_background_tasks: Set[asyncio.Task] = set()
 
 
 class BaseEcommerceAgent:
+    # Registry key, used for per-agent configuration such as model tiers.
+    KEY = ""
+    # Whether two copies of a run may race (hedging); false for tools whose side
+    # effects are not idempotent.
+    HEDGE_SAFE = True
+    # Whether the run may keep going after the activity has returned its streamed
+    # decision; false for any side-effecting tool, idempotent or not.
+    STREAM_SAFE = True
+    # Maps each verdict to (next_action, confidence, requires_human_intervention),
+    # used when the decision is read from the leading "DECISION:" line of a stream.
+    DECISIONS: Dict[str, Tuple[str, float, bool]] = {}
+
     def __init__(self, name: str, instructions: str):
         self.name = name
         self.agent = Agent(name=name, instructions=instructions)
-    
+        self.streaming = self.STREAM_SAFE and os.getenv("AGENT_STREAMING", "false").lower() == "true"
+        self.tiers = load_tier_config(self.KEY)
+        self.hedging = HedgePolicy.from_env() if self.HEDGE_SAFE else HedgePolicy()
+
     async def process(self, context: Dict[str, Any]) -> AgentDecision:
-        raise NotImplementedError("Subclasses must implement process method")
-    
+        if PROFILER.deadline is None:
+            return await self._process(context)
+        return await PROFILER.run(f"agent-{self.KEY or self.name}", self._process, context)
+
+    async def _process(self, context: Dict[str, Any]) -> AgentDecision:
+        prompt = self.build_prompt(context)
+        order = context.get("order")
+        # Deterministic tools called again on a retry of this order return their memoized result.
+        customer = getattr(order, "customer", None)
+        with memo_scope(getattr(order, "id", None), getattr(customer, "id", None)):
+            if self.streaming and self.DECISIONS:
+                return await self._process_streamed(prompt, context)
+            if len(self.tiers.models) > 1:
+                return await self._process_tiered(prompt, context)
+            output = await self._run(prompt, self.tiers.first_model)
+        return self.parse_decision(output, context)
+
+    async def _run(self, prompt: str, model: Optional[str] = None) -> str:
+        run_config = RunConfig(model=model) if model else None
+        model_label = model or "default"
+        delay = self.hedging.delay_seconds(self.name, model_label)
+        started = time.perf_counter()
+        
+        async def call() -> str:
+            permit = await self._acquire_model_budget(prompt)
+            result = await run_agent(self.agent, prompt, run_config, Runner, model)
+            self._charge_model_usage(permit, result)
+            return result.final_output
+        
+        METRICS.increment("agent.runs", agent=self.name)
+        output, hedge_won = await run_hedged(
+            call,
+            delay,
+            on_hedge=lambda: METRICS.increment("agent.hedges_issued", agent=self.name)
+        )
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        
+        METRICS.observe("agent.run_latency_ms", elapsed_ms, agent=self.name, model=model_label)
+        if hedge_won:
+            logger.info(f"{self.name} hedge won after {elapsed_ms:.0f} ms (delay {delay * 1000:.0f} ms)")
+            METRICS.increment("agent.hedges_won", agent=self.name)
+        return output
+
+    async def _acquire_model_budget(self, prompt: str) -> Permit:
+        requests = int(os.getenv("MODEL_REQUESTS_PER_RUN_ESTIMATE", "3"))
+        return await get_rate_limiter().acquire(
+            requests=requests,
+            tokens=estimate_tokens(self.agent.instructions + prompt, requests),
+            priority=AGENT_PRIORITIES.get(self.KEY, 1) + LANE_RATE_LIMIT_OFFSETS.get(current_lane(), 0)
+        )
+
+    def _charge_model_usage(self, permit: Permit, result: Any) -> None:
+        """Replace the estimate with actual usage; failed runs keep the estimate."""
+        usage = result.context_wrapper.usage
+        get_rate_limiter().reconcile(permit, usage.requests, usage.total_tokens)
+        record_input_tokens(self.name, usage)
+
+    async def _process_tiered(self, prompt: str, context: Dict[str, Any]) -> AgentDecision:
+        """Try each model tier in turn until one gives a verdict it is confident in.
+
+        A run moves on when its output names none of the agent's verdicts or the
+        model reports a confidence below the threshold; the per-verdict
+        confidences in ``DECISIONS`` say nothing about the model and are ignored.
+        """
+        METRICS.increment("agent.tier_runs", agent=self.name)
+        models = self.tiers.models
+        discarded_ms = 0.0
+        
+        for model, next_model in zip(models, models[1:]):
+            started = time.perf_counter()
+            output = await self._run(prompt, model)
+            decision = self.parse_decision(output, context)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            METRICS.observe("agent.tier_latency_ms", elapsed_ms, agent=self.name, model=model)
+            
+            reported = self.reported_confidence(output)
+            if self.mentions_verdict(output) and (reported is None or reported >= self.tiers.confidence_threshold):
+                return decision
+            
+            logger.info(
+                f"{self.name} escalating from {model} to {next_model}: "
+                f"{decision.decision} at reported confidence {reported}"
+            )
+            METRICS.increment("agent.tier_escalations", agent=self.name, from_model=model)
+            discarded_ms += elapsed_ms
+        
+        started = time.perf_counter()
+        output = await self._run(prompt, models[-1])
+        METRICS.observe("agent.tier_latency_ms", (time.perf_counter() - started) * 1000, agent=self.name, model=models[-1])
+        METRICS.observe("agent.tier_escalation_cost_ms", discarded_ms, agent=self.name)
+        return self.parse_decision(output, context)
+
+    def mentions_verdict(self, output: str) -> bool:
+        if not self.DECISIONS:
+            return True
+        return re.search(rf"\b({'|'.join(self.DECISIONS)})\b", output, re.IGNORECASE) is not None
+
+    def reported_confidence(self, output: str) -> Optional[float]:
+        """The confidence the model states on its "CONFIDENCE:" line, if any."""
+        match = CONFIDENCE_PATTERN.search(output)
+        return float(match.group(1)) if match else None
+
+    def build_prompt(self, context: Dict[str, Any]) -> str:
+        raise NotImplementedError("Subclasses must implement build_prompt method")
+
+    def render_prompt(self, template: PromptTemplate, data: Dict[str, Any]) -> str:
+        """Render order data after the template's static prefix, recording the prompt size."""
+        if self.streaming and self.DECISIONS:
+            template = template.extend(STREAMING_INSTRUCTION.format(choices="|".join(self.DECISIONS)))
+        elif len(self.tiers.models) > 1:
+            template = template.extend(TIERING_INSTRUCTION)
+        prompt = template.render(data)
+        record_prompt(self.name, template, prompt)
+        return prompt
+
+    def parse_decision(self, output: str, context: Dict[str, Any]) -> AgentDecision:
+        raise NotImplementedError("Subclasses must implement parse_decision method")
+
+    def decision_from_verdict(self, verdict: str, reasoning: str, context: Dict[str, Any]) -> AgentDecision:
+        next_action, confidence, requires_human_intervention = self.DECISIONS[verdict]
+        return self._create_decision(
+            decision=verdict,
+            confidence=confidence,
+            reasoning=reasoning,
+            next_action=next_action,
+            requires_human_intervention=requires_human_intervention
+        )
+
+    def find_verdict(self, text: str) -> Optional[str]:
+        """Return the verdict once a complete "DECISION: X" token has streamed in."""
+        match = VERDICT_PATTERN.search(text)
+        if match and match.group(1).upper() in self.DECISIONS:
+            return match.group(1).upper()
+        return None
+
+    async def _process_streamed(self, prompt: str, context: Dict[str, Any]) -> AgentDecision:
+        """Return as soon as the verdict is known and keep capturing reasoning in the background.
+
+        ``render_prompt`` has already asked for the leading "DECISION:" line. Only
+        ``STREAM_SAFE`` agents stream, since the run outlives the activity.
+        """
+        started = time.perf_counter()
+        decided: asyncio.Future = asyncio.get_running_loop().create_future()
+
+        task = asyncio.create_task(self._consume_stream(prompt, context, decided, started))
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+
+        return await decided
+
+    async def _consume_stream(
+        self,
+        prompt: str,
+        context: Dict[str, Any],
+        decided: asyncio.Future,
+        started: float
+    ) -> None:
+        text = ""
+        try:
+            permit = await self._acquire_model_budget(prompt)
+            model = self.tiers.first_model
+            result = Runner.run_streamed(self.agent, prompt, run_config=RunConfig(model=model) if model else None)
+            async for event in result.stream_events():
+                if event.type != "raw_response_event":
+                    continue
+                event_type = getattr(event.data, "type", None)
+                if event_type == "response.created":
+                    text = ""
+                elif event_type == "response.output_text.delta":
+                    text += event.data.delta
+                    if not decided.done():
+                        verdict = self.find_verdict(text)
+                        if verdict:
+                            elapsed_ms = (time.perf_counter() - started) * 1000
+                            logger.info(f"{self.name} decided {verdict} after {elapsed_ms:.0f} ms")
+                            METRICS.observe("agent.time_to_decision_ms", elapsed_ms, agent=self.name)
+                            METRICS.increment("agent.early_decisions", agent=self.name)
+                            decided.set_result(self.decision_from_verdict(verdict, text, context))
+            output = result.final_output
+        except Exception as e:
+            if not decided.done():
+                decided.set_exception(e)
+            else:
+                logger.warning(f"{self.name} stream failed after decision was returned: {e}")
+            return
+
+        self._charge_model_usage(permit, result)
+        total_ms = (time.perf_counter() - started) * 1000
+        METRICS.observe("agent.stream_total_ms", total_ms, agent=self.name)
+
+        if not decided.done():
+            METRICS.observe("agent.time_to_decision_ms", total_ms, agent=self.name)
+            METRICS.increment("agent.stream_fallbacks", agent=self.name)
+            decided.set_result(self.parse_decision(output, context))
+            return
+
+        # The workflow only saw the reasoning up to the verdict; keep the full text in the order's event log.
+        from src.activities.order_activities import log_order_event
+        order = context.get("order")
+        if order is not None:
+            await log_order_event(order.to_dict(), f"{self.KEY or self.name}_reasoning", output)
+
     def _create_decision(
         self,
         decision: str,
@@ -26,4 +273,4 @@ class BaseEcommerceAgent:
             reasoning=reasoning,
             next_action=next_action,
             requires_human_intervention=requires_human_intervention
-        ) 
\ No newline at end of file
+        )
@@ -0,0 +1,180 @@
+"""Record and replay ``Runner.run`` conversations without the network.
+
+``AGENT_CASSETTE_MODE=record`` appends every agent run (prompt, model, final
+output, tool calls, usage and latency) to a JSON-lines cassette at
+``AGENT_CASSETTE_PATH``. ``AGENT_CASSETTE_MODE=replay`` serves runs from it
+instead of calling the model, sleeping for the recorded latency scaled by
+``AGENT_CASSETTE_TIME_SCALE`` (0 replays instantly).
+
+A run is matched by agent, model and prompt hash. Prompts that were never
+recorded (new order ids, for instance) get the agent's recorded runs in
+recording order, cycling, so replay is deterministic either way. An index of
+byte offsets is kept next to the cassette (``<path>.idx``) so replay reads only
+the records it serves.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections import defaultdict
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+OFF, RECORD, REPLAY = "off", "record", "replay"
+
+
+def prompt_key(agent: str, model: Optional[str], prompt: str) -> str:
+    digest = hashlib.sha256(prompt.encode()).hexdigest()[:32]
+    return f"{agent}|{model or 'default'}|{digest}"
+
+
+def _tool_calls(result: Any) -> List[Dict[str, Any]]:
+    calls = []
+    for item in getattr(result, "new_items", []):
+        if item.type == "tool_call_item":
+            calls.append({
+                "type": "call",
+                "name": getattr(item.raw_item, "name", None),
+                "arguments": getattr(item.raw_item, "arguments", None)
+            })
+        elif item.type == "tool_call_output_item":
+            calls.append({"type": "output", "output": str(item.output)})
+    return calls
+
+
+def _usage(result: Any) -> Dict[str, int]:
+    usage = result.context_wrapper.usage
+    details = getattr(usage, "input_tokens_details", None)
+    return {
+        "requests": usage.requests,
+        "input_tokens": usage.input_tokens,
+        "cached_tokens": getattr(details, "cached_tokens", 0) or 0,
+        "output_tokens": usage.output_tokens,
+        "total_tokens": usage.total_tokens,
+    }
+
+
+class ReplayedRun:
+    """Stands in for ``RunResult`` with the attributes the agents read."""
+
+    def __init__(self, record: Dict[str, Any]):
+        usage = record["usage"]
+        self.final_output = record["output"]
+        self.tool_calls = record["tool_calls"]
+        self.context_wrapper = SimpleNamespace(usage=SimpleNamespace(
+            requests=usage["requests"],
+            input_tokens=usage["input_tokens"],
+            input_tokens_details=SimpleNamespace(cached_tokens=usage["cached_tokens"]),
+            output_tokens=usage["output_tokens"],
+            total_tokens=usage["total_tokens"]
+        ))
+
+
+class Cassette:
+    def __init__(self, path: str, mode: str = REPLAY, time_scale: float = 1.0):
+        self.path = path
+        self.mode = mode
+        self.time_scale = time_scale
+        self._by_key: Dict[str, List[int]] = defaultdict(list)
+        self._by_agent: Dict[str, List[int]] = defaultdict(list)
+        self._served: Dict[str, int] = defaultdict(int)
+        if mode == REPLAY:
+            self._load_index()
+
+    @property
+    def index_path(self) -> str:
+        return self.path + ".idx"
+
+    def _load_index(self) -> None:
+        if os.path.exists(self.index_path) and os.path.getmtime(self.index_path) >= os.path.getmtime(self.path):
+            with open(self.index_path) as f:
+                index = json.load(f)
+            self._by_key.update(index["by_key"])
+            self._by_agent.update(index["by_agent"])
+            return
+        self.build_index()
+
+    def build_index(self) -> None:
+        self._by_key.clear()
+        self._by_agent.clear()
+        with open(self.path, "rb") as f:
+            offset = 0
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    self._by_key[record["key"]].append(offset)
+                    self._by_agent[record["agent"]].append(offset)
+                offset += len(line)
+        with open(self.index_path, "w") as f:
+            json.dump({"by_key": self._by_key, "by_agent": self._by_agent}, f)
+
+    def _read(self, offset: int) -> Dict[str, Any]:
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            return json.loads(f.readline())
+
+    def lookup(self, agent: str, model: Optional[str], prompt: str) -> Dict[str, Any]:
+        key = prompt_key(agent, model, prompt)
+        offsets = self._by_key.get(key) or self._by_agent.get(agent)
+        if not offsets:
+            raise LookupError(f"No recorded runs for {agent} in {self.path}")
+        lookup_key = key if key in self._by_key else agent
+        served = self._served[lookup_key]
+        self._served[lookup_key] += 1
+        return self._read(offsets[served % len(offsets)])
+
+    async def replay(self, agent: str, model: Optional[str], prompt: str) -> ReplayedRun:
+        record = self.lookup(agent, model, prompt)
+        if self.time_scale > 0:
+            await asyncio.sleep(record["elapsed_ms"] / 1000 * self.time_scale)
+        return ReplayedRun(record)
+
+    def record(self, agent: str, model: Optional[str], prompt: str, result: Any, elapsed_ms: float) -> None:
+        record = {
+            "key": prompt_key(agent, model, prompt),
+            "agent": agent,
+            "model": model,
+            "prompt": prompt,
+            "output": result.final_output,
+            "tool_calls": _tool_calls(result),
+            "usage": _usage(result),
+            "elapsed_ms": elapsed_ms,
+            "recorded_at": time.time(),
+        }
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        # One write per record keeps lines whole when runs finish concurrently.
+        with open(self.path, "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+
+_cassette: Optional[Cassette] = None
+
+
+def get_cassette() -> Optional[Cassette]:
+    """The cassette configured by ``AGENT_CASSETTE_MODE``; None when recording and replay are off."""
+    global _cassette
+    mode = os.getenv("AGENT_CASSETTE_MODE", OFF).lower()
+    if mode == OFF:
+        return None
+    if _cassette is None or _cassette.mode != mode:
+        _cassette = Cassette(
+            os.getenv("AGENT_CASSETTE_PATH", "cassettes/agents.jsonl"),
+            mode=mode,
+            time_scale=float(os.getenv("AGENT_CASSETTE_TIME_SCALE", "1.0"))
+        )
+    return _cassette
+
+
+async def run_agent(agent: Any, prompt: str, run_config: Any, runner: Any, model: Optional[str] = None) -> Any:
+    """``runner.run`` with the configured cassette applied."""
+    cassette = get_cassette()
+    if cassette is None:
+        return await runner.run(agent, prompt, run_config=run_config)
+    if cassette.mode == REPLAY:
+        return await cassette.replay(agent.name, model, prompt)
+
+    started = time.perf_counter()
+    result = await runner.run(agent, prompt, run_config=run_config)
+    cassette.record(agent.name, model, prompt, result, (time.perf_counter() - started) * 1000)
+    return result
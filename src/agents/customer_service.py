@@ -1,18 +1,19 @@
 import asyncio
 from typing import Any, Dict
-from agents import Agent, Runner, function_tool
+from agents import function_tool
 from src.agents.base import BaseEcommerceAgent
+from src.agents.prompts import PromptTemplate
+from src.agents.tool_memo import memoized
+from src.catalog.index import find_alternatives
 from src.models.order import Order, AgentDecision
 
 
-@function_tool
 def create_support_ticket(order_id: str, issue_type: str, description: str) -> str:
     import random
     ticket_id = f"TKT{random.randint(100000, 999999)}"
     return f"Support ticket created: {ticket_id} for order {order_id}"
 
 
-@function_tool
 def check_customer_history(customer_email: str) -> str:
     import random
     order_count = random.randint(0, 10)
@@ -24,7 +25,7 @@ def check_customer_history(customer_email: str) -> str:
         return f"Customer {customer_email} has no previous orders - new customer"
 
 
-@function_tool
+@memoized
 def suggest_resolution(issue_type: str, order_amount: float) -> str:
     if issue_type == "payment_failed":
         return "Suggest alternative payment method or contact customer for updated card"
@@ -38,7 +39,7 @@ def suggest_resolution(issue_type: str, order_amount: float) -> str:
         return "Contact customer directly to resolve issue"
 
 
-@function_tool
+@memoized
 def calculate_refund_amount(order_amount: float, issue_type: str) -> str:
     if issue_type == "payment_failed":
         return f"No refund needed - payment was not processed"
@@ -48,7 +49,42 @@ def calculate_refund_amount(order_amount: float, issue_type: str) -> str:
         return f"Partial refund of ${order_amount * 0.8:.2f}"
 
 
+TOOLS = [
+    function_tool(create_support_ticket),
+    function_tool(check_customer_history),
+    function_tool(suggest_resolution),
+    function_tool(calculate_refund_amount),
+    function_tool(find_alternatives)
+]
+
+PROMPT = PromptTemplate(
+    """
+    Please handle the customer service escalation below.
+    
+    Please:
+    1. Check customer history
+    2. Create a support ticket
+    3. Suggest appropriate resolution
+    4. Calculate refund if necessary
+    5. Determine if human intervention is needed
+    
+    "alternatives" lists in-stock catalog products that can be offered instead.
+    """,
+    choices=["RESOLVE", "ESCALATE_TO_HUMAN", "CANCEL_ORDER"]
+)
+
+
 class CustomerServiceAgent(BaseEcommerceAgent):
+    KEY = "customer_service"
+    # create_support_ticket opens a ticket on every call.
+    HEDGE_SAFE = False
+    STREAM_SAFE = False
+    DECISIONS = {
+        "RESOLVE": ("apply_resolution", 0.8, False),
+        "ESCALATE_TO_HUMAN": ("assign_to_human_agent", 0.9, True),
+        "CANCEL_ORDER": ("cancel_and_refund", 0.7, False),
+    }
+    
     def __init__(self):
         instructions = """
         You are a Customer Service Agent responsible for handling escalated e-commerce issues.
@@ -63,53 +99,36 @@ class CustomerServiceAgent(BaseEcommerceAgent):
         Always prioritize customer satisfaction while following company policies.
         """
         super().__init__("Customer Service Agent", instructions)
-        self.agent.tools = [
-            create_support_ticket,
-            check_customer_history,
-            suggest_resolution,
-            calculate_refund_amount
-        ]
+        self.agent.tools = list(TOOLS)
     
-    async def process(self, context: Dict[str, Any]) -> AgentDecision:
+    def build_prompt(self, context: Dict[str, Any]) -> str:
         order: Order = context["order"]
-        issue_type = context.get("issue_type", "general")
-        escalation_reason = context.get("escalation_reason", "Unknown issue")
-        
-        prompt = f"""
-        Please handle this customer service escalation:
+        alternatives = context.get("suggested_alternatives") or []
         
-        Order ID: {order.id}
-        Customer: {order.customer.name} ({order.customer.email})
-        Issue Type: {issue_type}
-        Escalation Reason: {escalation_reason}
-        Order Amount: ${order.total_amount}
-        
-        Please:
-        1. Check customer history
-        2. Create a support ticket
-        3. Suggest appropriate resolution
-        4. Calculate refund if necessary
-        5. Determine if human intervention is needed
-        
-        Provide your decision: RESOLVE, ESCALATE_TO_HUMAN, or CANCEL_ORDER
-        """
-        
-        result = await Runner.run(self.agent, prompt)
-        
-        decision_text = result.final_output.lower()
+        return self.render_prompt(PROMPT, {
+            "order_id": order.id,
+            "customer": {"name": order.customer.name, "email": order.customer.email},
+            "issue_type": context.get("issue_type", "general"),
+            "escalation_reason": context.get("escalation_reason", "Unknown issue"),
+            "order_amount": order.total_amount,
+            "alternatives": [[p.sku, p.name, p.price] for p in alternatives]
+        })
+    
+    def parse_decision(self, output: str, context: Dict[str, Any]) -> AgentDecision:
+        decision_text = output.lower()
         
         if "resolve" in decision_text and "human" not in decision_text:
             return self._create_decision(
                 decision="RESOLVE",
                 confidence=0.8,
-                reasoning=result.final_output,
+                reasoning=output,
                 next_action="apply_resolution"
             )
         elif "human" in decision_text or "escalate" in decision_text:
             return self._create_decision(
                 decision="ESCALATE_TO_HUMAN",
                 confidence=0.9,
-                reasoning=result.final_output,
+                reasoning=output,
                 next_action="assign_to_human_agent",
                 requires_human_intervention=True
             )
@@ -117,6 +136,6 @@ class CustomerServiceAgent(BaseEcommerceAgent):
             return self._create_decision(
                 decision="CANCEL_ORDER",
                 confidence=0.7,
-                reasoning=result.final_output,
+                reasoning=output,
                 next_action="cancel_and_refund"
             ) 
\ No newline at end of file
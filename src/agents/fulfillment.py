@@ -1,11 +1,14 @@
 import asyncio
-from typing import Any, Dict
-from agents import Agent, Runner, function_tool
+from contextvars import ContextVar
+from typing import Any, Dict, Tuple
+from agents import function_tool
 from src.agents.base import BaseEcommerceAgent
+from src.agents.prompts import PromptTemplate
+from src.agents.tool_memo import memoized
 from src.models.order import Order, FulfillmentResult, AgentDecision
 
 
-@function_tool
+@memoized
 def calculate_shipping_cost(weight: float, destination: str, shipping_method: str) -> str:
     import random
     base_cost = 10.0
@@ -16,7 +19,10 @@ def calculate_shipping_cost(weight: float, destination: str, shipping_method: st
     return f"Shipping cost: ${base_cost:.2f}"
 
 
-@function_tool
+# Set while processing an order whose tracking number comes from the carrier manifest.
+_batched: ContextVar[bool] = ContextVar("fulfillment_batched", default=False)
+
+
 def generate_tracking_number() -> str:
     import random
     import string
@@ -25,7 +31,7 @@ def generate_tracking_number() -> str:
     return f"{prefix}{numbers}"
 
 
-@function_tool
+@memoized
 def check_shipping_availability(destination: str, shipping_method: str) -> str:
     import random
     unavailable_destinations = ["remote_island", "war_zone"]
@@ -36,7 +42,6 @@ def check_shipping_availability(destination: str, shipping_method: str) -> str:
         return f"Shipping to {destination} available with {shipping_method}"
 
 
-@function_tool
 def estimate_delivery_time(destination: str, shipping_method: str) -> str:
     import random
     if "express" in shipping_method.lower():
@@ -46,7 +51,59 @@ def estimate_delivery_time(destination: str, shipping_method: str) -> str:
     return f"Estimated delivery: {days} business days"
 
 
+def shipping_details(order: Order) -> Tuple[str, float]:
+    """Shipping address line and total weight (lbs) used for quoting."""
+    address = order.customer.address
+    return f"{address.street}, {address.city}, {address.state}", sum(p.quantity * 0.5 for p in order.products)
+
+
+TOOLS = [
+    function_tool(calculate_shipping_cost),
+    # Not offered for batched shipments, whose tracking number is assigned by the manifest.
+    function_tool(generate_tracking_number, is_enabled=lambda ctx, agent: not _batched.get()),
+    function_tool(check_shipping_availability),
+    function_tool(estimate_delivery_time)
+]
+
+PROMPT = PromptTemplate(
+    """
+    Please process fulfillment for the order below.
+    
+    Please:
+    1. Check shipping availability to the destination
+    2. Calculate shipping costs
+    3. Generate a tracking number
+    4. Estimate delivery time
+    5. Determine the best shipping method
+    """,
+    choices=["SHIP", "HOLD", "ESCALATE"]
+)
+
+QUOTED_PROMPT = PromptTemplate(
+    """
+    Please process fulfillment for the order below.
+    A shipping quote ("quote") was already prepared while payment was processed.
+    
+    Please:
+    1. Generate a tracking number
+    2. Confirm the quoted shipping method or choose a better one
+    """,
+    choices=["SHIP", "HOLD", "ESCALATE"]
+)
+
+
+# Tells the model why the tracking number step has no tool for batched shipments.
+MANIFEST_NOTE = "Do not generate a tracking number: one is assigned when the shipment is added to the carrier manifest."
+
+
 class FulfillmentAgent(BaseEcommerceAgent):
+    KEY = "fulfillment"
+    DECISIONS = {
+        "SHIP": ("create_shipment", 0.9, False),
+        "HOLD": ("hold_for_review", 0.7, False),
+        "ESCALATE": ("escalate_to_customer_service", 0.8, True),
+    }
+    
     def __init__(self):
         instructions = """
         You are a Fulfillment Agent responsible for coordinating shipping and tracking.
@@ -61,53 +118,62 @@ class FulfillmentAgent(BaseEcommerceAgent):
         Always provide accurate shipping information and handle edge cases gracefully.
         """
         super().__init__("Fulfillment Agent", instructions)
-        self.agent.tools = [
-            calculate_shipping_cost,
-            generate_tracking_number,
-            check_shipping_availability,
-            estimate_delivery_time
-        ]
+        self.agent.tools = list(TOOLS)
     
     async def process(self, context: Dict[str, Any]) -> AgentDecision:
-        order: Order = context["order"]
-        
-        shipping_address = f"{order.customer.address.street}, {order.customer.address.city}, {order.customer.address.state}"
-        total_weight = sum(p.quantity * 0.5 for p in order.products)
-        
-        prompt = f"""
-        Please process fulfillment for this order:
-        
-        Order ID: {order.id}
-        Shipping Address: {shipping_address}
-        Products: {[f"{p.name} x{p.quantity}" for p in order.products]}
-        Total Weight: {total_weight:.1f} lbs
+        quote = context.get("quote")
         
-        Please:
-        1. Check shipping availability to the destination
-        2. Calculate shipping costs
-        3. Generate a tracking number
-        4. Estimate delivery time
-        5. Determine the best shipping method
+        if quote and not quote["available"]:
+            return self._create_decision(
+                decision="ESCALATE",
+                confidence=1.0,
+                reasoning=quote["availability"],
+                next_action="escalate_to_customer_service",
+                requires_human_intervention=True
+            )
         
-        Provide your decision: SHIP, HOLD, or ESCALATE
-        """
+        token = _batched.set(bool(context.get("batched")))
+        try:
+            return await super().process(context)
+        finally:
+            _batched.reset(token)
+    
+    def build_prompt(self, context: Dict[str, Any]) -> str:
+        order: Order = context["order"]
+        quote = context.get("quote")
+        shipping_address, total_weight = shipping_details(order)
         
-        result = await Runner.run(self.agent, prompt)
+        data = {
+            "order_id": order.id,
+            "shipping_address": shipping_address,
+            "products": [[p.sku, p.name, p.quantity] for p in order.products],
+            "total_weight_lbs": round(total_weight, 1)
+        }
+        template = PROMPT
+        if quote:
+            template = QUOTED_PROMPT
+            data["quote"] = {key: quote[key] for key in ("shipping_method", "availability", "shipping_cost", "estimated_delivery")}
+        if context.get("batched"):
+            template = template.extend(MANIFEST_NOTE)
+        return self.render_prompt(template, data)
+    
+    def parse_decision(self, output: str, context: Dict[str, Any]) -> AgentDecision:
+        decision_text = output.lower()
         
-        decision_text = result.final_output.lower()
+        quoted = bool(context.get("quote"))
         
-        if "available" in decision_text and "ship" in decision_text:
+        if ("available" in decision_text or quoted) and "ship" in decision_text:
             return self._create_decision(
                 decision="SHIP",
                 confidence=0.9,
-                reasoning=result.final_output,
+                reasoning=output,
                 next_action="create_shipment"
             )
         elif "not available" in decision_text or "unavailable" in decision_text:
             return self._create_decision(
                 decision="ESCALATE",
                 confidence=0.8,
-                reasoning=result.final_output,
+                reasoning=output,
                 next_action="escalate_to_customer_service",
                 requires_human_intervention=True
             )
@@ -115,6 +181,6 @@ class FulfillmentAgent(BaseEcommerceAgent):
             return self._create_decision(
                 decision="HOLD",
                 confidence=0.7,
-                reasoning=result.final_output,
+                reasoning=output,
                 next_action="hold_for_review"
             ) 
\ No newline at end of file
@@ -0,0 +1,84 @@
+import asyncio
+import os
+from typing import Awaitable, Callable, Optional, Tuple, TypeVar
+from pydantic import BaseModel
+from src.utils.metrics import METRICS
+
+T = TypeVar("T")
+
+
+class HedgePolicy(BaseModel):
+    """When to fire a duplicate model request for a slow run.
+
+    The hedge delay is the ``percentile`` of recent run latencies for the same
+    agent and model, once at least ``min_samples`` runs have been seen. Hedges
+    are capped at ``max_rate`` of all runs so a slow provider is not hit with
+    double traffic.
+    """
+
+    enabled: bool = False
+    percentile: float = 95.0
+    min_samples: int = 20
+    max_rate: float = 0.05
+    min_delay_ms: float = 500.0
+
+    @classmethod
+    def from_env(cls) -> "HedgePolicy":
+        return cls(
+            enabled=os.getenv("AGENT_HEDGING", "false").lower() == "true",
+            percentile=float(os.getenv("AGENT_HEDGE_PERCENTILE", "95")),
+            min_samples=int(os.getenv("AGENT_HEDGE_MIN_SAMPLES", "20")),
+            max_rate=float(os.getenv("AGENT_HEDGE_MAX_RATE", "0.05")),
+            min_delay_ms=float(os.getenv("AGENT_HEDGE_MIN_DELAY_MS", "500"))
+        )
+
+    def delay_seconds(self, agent: str, model: str) -> Optional[float]:
+        """Seconds to wait before hedging, or ``None`` if this run must not be hedged."""
+        if not self.enabled:
+            return None
+        if METRICS.sample_count("agent.run_latency_ms", agent=agent, model=model) < self.min_samples:
+            return None
+        runs = METRICS.counter("agent.runs", agent=agent)
+        if METRICS.counter("agent.hedges_issued", agent=agent) >= self.max_rate * runs:
+            return None
+        delay_ms = METRICS.percentile("agent.run_latency_ms", self.percentile, agent=agent, model=model)
+        return max(delay_ms, self.min_delay_ms) / 1000
+
+
+async def run_hedged(
+    call: Callable[[], Awaitable[T]],
+    delay: Optional[float],
+    on_hedge: Optional[Callable[[], None]] = None
+) -> Tuple[T, bool]:
+    """Run ``call``; if it has not finished after ``delay`` seconds, race a second copy.
+
+    Returns the first successful result and whether the hedge produced it. The
+    losing request is cancelled. An error from one copy is only raised if the
+    other copy fails as well.
+    """
+    primary = asyncio.ensure_future(call())
+    if delay is None:
+        return await primary, False
+    
+    # Cancelling the caller at any point, including the initial wait, cancels both copies.
+    pending = {primary}
+    error: Optional[BaseException] = None
+    try:
+        done, _ = await asyncio.wait(pending, timeout=delay)
+        if done:
+            return primary.result(), False
+        
+        if on_hedge is not None:
+            on_hedge()
+        hedge = asyncio.ensure_future(call())
+        pending = {primary, hedge}
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result(), task is hedge
+                error = task.exception()
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
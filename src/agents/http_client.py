@@ -0,0 +1,122 @@
+import asyncio
+import logging
+import os
+from typing import Any, Dict, Optional
+import httpx
+from src.utils.metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+_shared_client: Optional[httpx.AsyncClient] = None
+_openai_client_installed = False
+
+
+async def _trace(event_name: str, info: Dict[str, Any]) -> None:
+    if event_name == "connection.connect_tcp.complete":
+        METRICS.increment("model_http.new_connections")
+    elif event_name == "connection.start_tls.complete":
+        METRICS.increment("model_http.tls_handshakes")
+
+
+async def _on_request(request: httpx.Request) -> None:
+    METRICS.increment("model_http.requests")
+    request.extensions["trace"] = _trace
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def open_shared_http_client() -> httpx.AsyncClient:
+    """Create the worker-wide keep-alive client used for all model traffic."""
+    global _shared_client
+    if _shared_client is not None:
+        return _shared_client
+    
+    http2 = os.getenv("MODEL_HTTP2", "true").lower() == "true"
+    if http2 and not _http2_available():
+        logger.warning("MODEL_HTTP2 is enabled but the h2 package is not installed; using HTTP/1.1")
+        http2 = False
+    
+    limits = httpx.Limits(
+        max_connections=int(os.getenv("MODEL_HTTP_MAX_CONNECTIONS", "100")),
+        max_keepalive_connections=int(os.getenv("MODEL_HTTP_MAX_KEEPALIVE", "20")),
+        keepalive_expiry=float(os.getenv("MODEL_HTTP_KEEPALIVE_EXPIRY", "60"))
+    )
+    _shared_client = httpx.AsyncClient(
+        http2=http2,
+        limits=limits,
+        timeout=httpx.Timeout(float(os.getenv("MODEL_HTTP_TIMEOUT", "600")), connect=10.0),
+        event_hooks={"request": [_on_request]}
+    )
+    logger.info(
+        f"Opened shared model HTTP client (http2={http2}, max_connections={limits.max_connections}, "
+        f"max_keepalive={limits.max_keepalive_connections})"
+    )
+    return _shared_client
+
+
+async def close_shared_http_client() -> None:
+    global _shared_client, _openai_client_installed
+    if _shared_client is None:
+        return
+    logger.info(f"Closing shared model HTTP client: {connection_stats()}")
+    await _shared_client.aclose()
+    _shared_client = None
+    _openai_client_installed = False
+
+
+def install_openai_client() -> None:
+    """Point the Agents SDK at the shared client; a no-op until the worker has opened one.
+
+    Called when the first agent module is loaded so the SDK import stays lazy.
+    """
+    global _openai_client_installed
+    if _shared_client is None or _openai_client_installed:
+        return
+    
+    from agents import set_default_openai_client
+    from openai import AsyncOpenAI, OpenAIError
+    
+    try:
+        client = AsyncOpenAI(http_client=_shared_client)
+    except OpenAIError as e:
+        # Typically OPENAI_API_KEY is unset; agents then fail only when they run,
+        # rather than taking down warm-up with them.
+        logger.warning(f"Not installing the shared model HTTP client: {e}")
+        return
+    set_default_openai_client(client)
+    _openai_client_installed = True
+
+
+async def prewarm_connections(count: int = 2) -> int:
+    """Open up to ``count`` keep-alive connections to the model endpoint; returns how many were opened.
+
+    Sends unauthenticated ``GET /models`` requests: the response (usually 401)
+    does not matter, only the TCP and TLS handshakes it leaves in the pool.
+    """
+    if _shared_client is None or count <= 0:
+        return 0
+    url = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1").rstrip("/") + "/models"
+    before = METRICS.counter("model_http.new_connections")
+    results = await asyncio.gather(*(_shared_client.get(url) for _ in range(count)), return_exceptions=True)
+    for result in results:
+        if isinstance(result, Exception):
+            logger.warning(f"Could not pre-open model connection to {url}: {result}")
+    return int(METRICS.counter("model_http.new_connections") - before)
+
+
+def connection_stats() -> Dict[str, float]:
+    requests = METRICS.counter("model_http.requests")
+    new_connections = METRICS.counter("model_http.new_connections")
+    return {
+        "requests": requests,
+        "new_connections": new_connections,
+        "tls_handshakes": METRICS.counter("model_http.tls_handshakes"),
+        "reused": max(requests - new_connections, 0),
+        "reuse_ratio": (requests - new_connections) / requests if requests else 0.0,
+    }
@@ -0,0 +1,38 @@
+import os
+from typing import List, Optional
+from pydantic import BaseModel
+
+
+class ModelTierConfig(BaseModel):
+    """Models to try in order, cheapest first, for one agent.
+
+    An empty list leaves model choice to the SDK default and disables tiering.
+    A run moves to the next tier when its output names none of the agent's
+    verdicts or the model reports a confidence below ``confidence_threshold``.
+    """
+
+    models: List[str] = []
+    confidence_threshold: float = 0.75
+
+    @property
+    def first_model(self) -> Optional[str]:
+        return self.models[0] if self.models else None
+
+
+def load_tier_config(agent_key: str) -> ModelTierConfig:
+    """Read tiers for ``agent_key`` (e.g. ``payment``) from the environment.
+
+    ``PAYMENT_AGENT_MODEL_TIERS=gpt-4o-mini,gpt-4o`` and
+    ``PAYMENT_AGENT_CONFIDENCE_THRESHOLD=0.8`` override the
+    ``AGENT_MODEL_TIERS`` / ``AGENT_CONFIDENCE_THRESHOLD`` defaults.
+    """
+    models = os.getenv("AGENT_MODEL_TIERS", "")
+    threshold = os.getenv("AGENT_CONFIDENCE_THRESHOLD", "0.75")
+    if agent_key:
+        prefix = f"{agent_key.upper()}_AGENT_"
+        models = os.getenv(f"{prefix}MODEL_TIERS", models)
+        threshold = os.getenv(f"{prefix}CONFIDENCE_THRESHOLD", threshold)
+    return ModelTierConfig(
+        models=[m.strip() for m in models.split(",") if m.strip()],
+        confidence_threshold=float(threshold)
+    )
@@ -1,11 +1,13 @@
 import asyncio
 from typing import Any, Dict
-from agents import Agent, Runner, function_tool
+from agents import function_tool
 from src.agents.base import BaseEcommerceAgent
+from src.agents.prompts import PromptTemplate
+from src.agents.tool_memo import memoized_per_customer
+from src.catalog.index import find_alternatives
 from src.models.order import Order, OrderValidationResult, AgentDecision
 
 
-@function_tool
 def check_inventory(product_sku: str, quantity: int) -> str:
     import random
     available = random.randint(0, 10)
@@ -15,7 +17,7 @@ def check_inventory(product_sku: str, quantity: int) -> str:
         return f"Insufficient inventory: {available} available, {quantity} requested for {product_sku}"
 
 
-@function_tool
+@memoized_per_customer
 def validate_customer_email(email: str) -> str:
     if "@" in email and "." in email.split("@")[1]:
         return f"Email {email} is valid"
@@ -23,7 +25,7 @@ def validate_customer_email(email: str) -> str:
         return f"Email {email} is invalid"
 
 
-@function_tool
+@memoized_per_customer
 def validate_address(address: str) -> str:
     if len(address) > 10:
         return f"Address {address} appears valid"
@@ -31,7 +33,37 @@ def validate_address(address: str) -> str:
         return f"Address {address} appears incomplete"
 
 
+TOOLS = [
+    function_tool(check_inventory),
+    function_tool(validate_customer_email),
+    function_tool(validate_address),
+    function_tool(find_alternatives)
+]
+
+PROMPT = PromptTemplate(
+    """
+    Please validate the order below.
+    
+    Please check:
+    1. Customer email validity
+    2. Address completeness
+    3. Inventory availability for each product
+    4. Any suspicious patterns (high value, unusual quantities, etc.)
+    
+    "pricing" says whether the total was already verified against the price catalog.
+    """,
+    choices=["APPROVE", "REJECT", "ESCALATE"]
+)
+
+
 class OrderIntakeAgent(BaseEcommerceAgent):
+    KEY = "order_intake"
+    DECISIONS = {
+        "APPROVE": ("proceed_to_payment", 0.9, False),
+        "REJECT": ("reject_order", 0.7, False),
+        "ESCALATE": ("escalate_to_customer_service", 0.8, True),
+    }
+    
     def __init__(self):
         instructions = """
         You are an Order Intake Agent responsible for validating e-commerce orders.
@@ -45,45 +77,36 @@ class OrderIntakeAgent(BaseEcommerceAgent):
         Always be thorough and cautious. If you detect any issues, escalate to customer service.
         """
         super().__init__("Order Intake Agent", instructions)
-        self.agent.tools = [check_inventory, validate_customer_email, validate_address]
+        self.agent.tools = list(TOOLS)
     
-    async def process(self, context: Dict[str, Any]) -> AgentDecision:
+    def build_prompt(self, context: Dict[str, Any]) -> str:
         order: Order = context["order"]
+        price_check = context.get("price_check")
         
-        prompt = f"""
-        Please validate this order:
-        
-        Order ID: {order.id}
-        Customer: {order.customer.name} ({order.customer.email})
-        Address: {order.customer.address.street}, {order.customer.address.city}
-        Products: {[f"{p.name} x{p.quantity}" for p in order.products]}
-        Total Amount: ${order.total_amount}
-        
-        Please check:
-        1. Customer email validity
-        2. Address completeness
-        3. Inventory availability for each product
-        4. Any suspicious patterns (high value, unusual quantities, etc.)
-        
-        Provide your decision: APPROVE, REJECT, or ESCALATE
-        """
-        
-        result = await Runner.run(self.agent, prompt)
-        
-        decision_text = result.final_output.lower()
+        return self.render_prompt(PROMPT, {
+            "order_id": order.id,
+            "customer": {"name": order.customer.name, "email": order.customer.email},
+            "address": f"{order.customer.address.street}, {order.customer.address.city}",
+            "products": [[p.sku, p.name, p.quantity] for p in order.products],
+            "total": order.total_amount,
+            "pricing": f"verified ({price_check.catalog_total})" if price_check else "not verified"
+        })
+    
+    def parse_decision(self, output: str, context: Dict[str, Any]) -> AgentDecision:
+        decision_text = output.lower()
         
         if "approve" in decision_text:
             return self._create_decision(
                 decision="APPROVE",
                 confidence=0.9,
-                reasoning=result.final_output,
+                reasoning=output,
                 next_action="proceed_to_payment"
             )
         elif "escalate" in decision_text or "suspicious" in decision_text:
             return self._create_decision(
                 decision="ESCALATE",
                 confidence=0.8,
-                reasoning=result.final_output,
+                reasoning=output,
                 next_action="escalate_to_customer_service",
                 requires_human_intervention=True
             )
@@ -91,6 +114,6 @@ class OrderIntakeAgent(BaseEcommerceAgent):
             return self._create_decision(
                 decision="REJECT",
                 confidence=0.7,
-                reasoning=result.final_output,
+                reasoning=output,
                 next_action="reject_order"
             ) 
\ No newline at end of file
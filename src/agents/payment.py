@@ -1,22 +1,75 @@
 import asyncio
-from typing import Any, Dict
-from agents import Agent, Runner, function_tool
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Optional, Tuple
+from agents import function_tool
 from src.agents.base import BaseEcommerceAgent
+from src.agents.prompts import PromptTemplate
+from src.agents.tool_memo import memoized
 from src.models.order import Order, PaymentResult, AgentDecision
+from src.utils.metrics import METRICS
+
+# Idempotency key of the charge the current payment agent run may make.
+_charge_key: ContextVar[Optional[str]] = ContextVar("payment_charge_key", default=None)
+
+
+def charge_idempotency_key(order_id: str, attempt: int) -> str:
+    """One charge per order and workflow payment attempt, whatever the model passes the tool."""
+    return f"{order_id}:payment:{attempt}"
+
+
+class LocalPaymentProvider:
+    """Stand-in for the card processor.
+
+    Like a real processor's idempotency keys, a charge sent again with the same
+    key returns the original outcome instead of charging again. A real provider
+    keeps keys on its side, so the protection holds across workers and restarts;
+    this simulation only keeps the most recent ``max_keys`` in the process, each
+    for ``ttl_seconds``, which outlasts every retry of a payment attempt.
+    """
+    
+    def __init__(self, max_keys: int = 10000, ttl_seconds: float = 3600.0, clock: Callable[[], float] = time.monotonic):
+        self.max_keys = max_keys
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self._charges: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+    
+    def __len__(self) -> int:
+        return len(self._charges)
+    
+    def charge(self, idempotency_key: Optional[str], amount: float, card_last4: str) -> str:
+        now = self.clock()
+        while self._charges and now - next(iter(self._charges.values()))[0] > self.ttl_seconds:
+            self._charges.popitem(last=False)
+        if idempotency_key is not None and idempotency_key in self._charges:
+            METRICS.increment("payment.idempotent_replays")
+            return self._charges[idempotency_key][1]
+        
+        import random
+        success_rate = 0.85
+        if random.random() < success_rate:
+            transaction_id = f"TXN{random.randint(100000, 999999)}"
+            result = f"Payment successful. Transaction ID: {transaction_id}"
+        else:
+            result = "Payment failed: Insufficient funds or card declined"
+        if idempotency_key is not None:
+            self._charges[idempotency_key] = (now, result)
+            while len(self._charges) > self.max_keys:
+                self._charges.popitem(last=False)
+        return result
+
+
+PAYMENT_PROVIDER = LocalPaymentProvider()
 
 
-@function_tool
 def process_payment(amount: float, payment_method: str, card_last4: str) -> str:
-    import random
-    success_rate = 0.85
-    if random.random() < success_rate:
-        transaction_id = f"TXN{random.randint(100000, 999999)}"
-        return f"Payment successful. Transaction ID: {transaction_id}"
-    else:
-        return "Payment failed: Insufficient funds or card declined"
+    # The key comes from the order and attempt, not from the model's arguments, so
+    # activity retries and repeated tool calls in one attempt charge only once.
+    return PAYMENT_PROVIDER.charge(_charge_key.get(), amount, card_last4)
 
 
-@function_tool
+@memoized
 def validate_payment_method(card_last4: str, expiry_month: int, expiry_year: int) -> str:
     import random
     if expiry_year > 2024 and 1 <= expiry_month <= 12:
@@ -25,7 +78,7 @@ def validate_payment_method(card_last4: str, expiry_month: int, expiry_year: int
         return f"Payment method {card_last4} is expired or invalid"
 
 
-@function_tool
+@memoized
 def check_fraud_risk(amount: float, customer_email: str, shipping_address: str) -> str:
     import random
     risk_factors = []
@@ -43,7 +96,38 @@ def check_fraud_risk(amount: float, customer_email: str, shipping_address: str)
         return "Low fraud risk"
 
 
+TOOLS = [
+    function_tool(process_payment),
+    function_tool(validate_payment_method),
+    function_tool(check_fraud_risk)
+]
+
+PROMPT = PromptTemplate(
+    """
+    Please process the payment below.
+    
+    Please:
+    1. Validate the payment method
+    2. Check for fraud risk
+    3. Process the payment
+    4. If this is a retry (retry_count > 0), be more cautious
+    """,
+    choices=["APPROVE", "RETRY", "ESCALATE"]
+)
+
+
 class PaymentAgent(BaseEcommerceAgent):
+    KEY = "payment"
+    # A hedged copy shares the attempt's charge key, so it replays the charge
+    # instead of making a second one. The charge must still happen before the
+    # activity returns, so no early streamed decisions.
+    STREAM_SAFE = False
+    DECISIONS = {
+        "APPROVE": ("proceed_to_fulfillment", 0.95, False),
+        "RETRY": ("retry_payment", 0.7, False),
+        "ESCALATE": ("escalate_to_customer_service", 0.8, True),
+    }
+    
     def __init__(self):
         instructions = """
         You are a Payment Processing Agent responsible for handling e-commerce payments.
@@ -57,11 +141,10 @@ class PaymentAgent(BaseEcommerceAgent):
         Always prioritize security and customer experience. If payment fails multiple times, escalate to customer service.
         """
         super().__init__("Payment Agent", instructions)
-        self.agent.tools = [process_payment, validate_payment_method, check_fraud_risk]
+        self.agent.tools = list(TOOLS)
     
     async def process(self, context: Dict[str, Any]) -> AgentDecision:
         order: Order = context["order"]
-        retry_count = context.get("retry_count", 0)
         
         if not order.payment_method:
             return self._create_decision(
@@ -72,46 +155,50 @@ class PaymentAgent(BaseEcommerceAgent):
                 requires_human_intervention=True
             )
         
-        prompt = f"""
-        Please process this payment:
-        
-        Order ID: {order.id}
-        Amount: ${order.total_amount}
-        Payment Method: {order.payment_method.type} ending in {order.payment_method.last4}
-        Retry Count: {retry_count}
-        
-        Please:
-        1. Validate the payment method
-        2. Check for fraud risk
-        3. Process the payment
-        4. If this is a retry (retry_count > 0), be more cautious
-        
-        Provide your decision: APPROVE, RETRY, or ESCALATE
-        """
-        
-        result = await Runner.run(self.agent, prompt)
+        token = _charge_key.set(charge_idempotency_key(order.id, context.get("retry_count", 0)))
+        try:
+            return await super().process(context)
+        finally:
+            _charge_key.reset(token)
+    
+    def build_prompt(self, context: Dict[str, Any]) -> str:
+        order: Order = context["order"]
         
-        decision_text = result.final_output.lower()
+        return self.render_prompt(PROMPT, {
+            "order_id": order.id,
+            "amount": order.total_amount,
+            "payment_method": f"{order.payment_method.type} ending in {order.payment_method.last4}",
+            "retry_count": context.get("retry_count", 0)
+        })
+    
+    def decision_from_verdict(self, verdict: str, reasoning: str, context: Dict[str, Any]) -> AgentDecision:
+        if verdict == "RETRY" and context.get("retry_count", 0) >= 3:
+            verdict = "ESCALATE"
+        return super().decision_from_verdict(verdict, reasoning, context)
+    
+    def parse_decision(self, output: str, context: Dict[str, Any]) -> AgentDecision:
+        retry_count = context.get("retry_count", 0)
+        decision_text = output.lower()
         
         if "successful" in decision_text and "approve" in decision_text:
             return self._create_decision(
                 decision="APPROVE",
                 confidence=0.95,
-                reasoning=result.final_output,
+                reasoning=output,
                 next_action="proceed_to_fulfillment"
             )
         elif "retry" in decision_text and retry_count < 3:
             return self._create_decision(
                 decision="RETRY",
                 confidence=0.7,
-                reasoning=result.final_output,
+                reasoning=output,
                 next_action="retry_payment"
             )
         else:
             return self._create_decision(
                 decision="ESCALATE",
                 confidence=0.8,
-                reasoning=result.final_output,
+                reasoning=output,
                 next_action="escalate_to_customer_service",
                 requires_human_intervention=True
             ) 
\ No newline at end of file
@@ -0,0 +1,61 @@
+import json
+import textwrap
+from typing import Any, Dict, Sequence, Tuple
+from src.utils.metrics import METRICS
+
+DATA_HEADER = "Order data (JSON):"
+
+# Extended templates keyed by (prefix, text) rather than by template instance, so
+# no template is kept alive; prompt text is fixed per agent, so this stays small.
+_EXTENDED: Dict[Tuple[str, str], "PromptTemplate"] = {}
+
+
+def canonical_json(data: Dict[str, Any]) -> str:
+    """Compact, key-sorted JSON, so equal data always renders to the same text."""
+    return json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+class PromptTemplate:
+    """A prompt whose static task text is compiled once and always comes first.
+
+    Rendering appends only the per-order data, as canonical JSON, after an
+    identical prefix. Together with the agent's fixed instructions and tool
+    schemas, this lets provider-side prompt caching reuse everything up to the
+    order data.
+    """
+
+    def __init__(self, task: str, choices: Sequence[str] = ()):
+        prefix = textwrap.dedent(task).strip()
+        if choices:
+            prefix += f"\n\nProvide your decision: {', '.join(choices[:-1])}, or {choices[-1]}"
+        self.prefix = prefix
+
+    def extend(self, text: str) -> "PromptTemplate":
+        """A template with ``text`` added to the static prefix; compiled once per prefix and text."""
+        key = (self.prefix, text)
+        template = _EXTENDED.get(key)
+        if template is None:
+            template = PromptTemplate.__new__(PromptTemplate)
+            template.prefix = f"{self.prefix}\n{textwrap.dedent(text).strip()}"
+            _EXTENDED[key] = template
+        return template
+
+    def render(self, data: Dict[str, Any]) -> str:
+        return f"{self.prefix}\n\n{DATA_HEADER}\n{canonical_json(data)}"
+
+
+def record_prompt(agent: str, template: PromptTemplate, prompt: str) -> None:
+    METRICS.observe("agent.prompt_chars", len(prompt), agent=agent)
+    METRICS.observe("agent.prompt_static_ratio", len(template.prefix) / len(prompt), agent=agent)
+
+
+def record_input_tokens(agent: str, usage: Any) -> None:
+    """Count input and provider-cached input tokens from an SDK ``Usage``."""
+    METRICS.increment("agent.input_tokens", usage.input_tokens, agent=agent)
+    details = getattr(usage, "input_tokens_details", None)
+    METRICS.increment("agent.cached_input_tokens", getattr(details, "cached_tokens", 0) or 0, agent=agent)
+
+
+def cached_token_ratio(agent: str) -> float:
+    input_tokens = METRICS.counter("agent.input_tokens", agent=agent)
+    return METRICS.counter("agent.cached_input_tokens", agent=agent) / input_tokens if input_tokens else 0.0
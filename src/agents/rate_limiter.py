@@ -0,0 +1,170 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import time
+from typing import Callable, List, Optional, Tuple
+from src.utils.metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+# Lower runs sooner. Each step is worth PRIORITY_STEP_SECONDS of queueing time,
+# so a customer service call waits behind newer payment calls but cannot starve.
+AGENT_PRIORITIES = {
+    "payment": 0,
+    "order_intake": 1,
+    "fulfillment": 2,
+    "customer_service": 3,
+}
+PRIORITY_STEP_SECONDS = 5.0
+
+COMPLETION_TOKENS_ESTIMATE = 300
+
+
+class TokenBucket:
+    """Bucket holding up to one minute of budget, refilled continuously."""
+
+    def __init__(self, per_minute: float, clock: Callable[[], float]):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.tokens = per_minute
+        self._clock = clock
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def seconds_until(self, amount: float) -> float:
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount: float) -> None:
+        """Take ``amount``; a negative amount refunds, up to the bucket's capacity."""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens - amount)
+
+
+class Permit:
+    def __init__(self, requests: int, tokens: int, waited: float):
+        self.requests = requests
+        self.tokens = tokens
+        self.waited = waited
+
+
+class ModelRateLimiter:
+    """Shared requests-per-minute and tokens-per-minute limiter for model calls.
+
+    Callers queue in order of arrival time offset by their priority, and each is
+    admitted once both buckets can cover its estimate. ``reconcile`` charges or
+    refunds the difference once actual usage is known, so estimates only need to
+    be roughly right. A limit of 0 disables that bucket.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = 0,
+        tokens_per_minute: float = 0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self._clock = clock
+        self._requests = TokenBucket(requests_per_minute, clock) if requests_per_minute else None
+        self._tokens = TokenBucket(tokens_per_minute, clock) if tokens_per_minute else None
+        self._waiters: List[Tuple[float, int, asyncio.Future, int, int, float]] = []
+        self._seq = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._requests is not None or self._tokens is not None
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self, requests: int, tokens: int, priority: int = 0) -> Permit:
+        if not self.enabled:
+            return Permit(requests, tokens, 0.0)
+        
+        enqueued = self._clock()
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(
+            self._waiters,
+            (enqueued + priority * PRIORITY_STEP_SECONDS, next(self._seq), future, requests, tokens, enqueued)
+        )
+        METRICS.observe("rate_limiter.queue_depth", len(self._waiters))
+        self._dispatch()
+        
+        try:
+            waited = await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.reconcile(Permit(requests, tokens, 0.0), 0, 0)
+            else:
+                # This waiter may have been the head of the queue holding everyone behind it.
+                future.cancel()
+                self._dispatch()
+            raise
+        METRICS.observe("rate_limiter.wait_ms", waited * 1000, priority=priority)
+        return Permit(requests, tokens, waited)
+
+    def reconcile(self, permit: Permit, actual_requests: int, actual_tokens: int) -> None:
+        """Adjust the buckets by the difference between the estimate and actual usage."""
+        if self._requests is not None:
+            self._requests.take(actual_requests - permit.requests)
+        if self._tokens is not None:
+            self._tokens.take(actual_tokens - permit.tokens)
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        
+        while self._waiters:
+            _, _, future, requests, tokens, enqueued = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            delay = max(
+                self._requests.seconds_until(requests) if self._requests else 0.0,
+                self._tokens.seconds_until(tokens) if self._tokens else 0.0
+            )
+            if delay > 0:
+                self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+                return
+            heapq.heappop(self._waiters)
+            if self._requests is not None:
+                self._requests.take(requests)
+            if self._tokens is not None:
+                self._tokens.take(tokens)
+            future.set_result(self._clock() - enqueued)
+
+
+def estimate_tokens(text: str, requests: int) -> int:
+    """Rough token estimate: ~4 characters per token, resent on every request of the run."""
+    return requests * (len(text) // 4 + COMPLETION_TOKENS_ESTIMATE)
+
+
+_limiter: Optional[ModelRateLimiter] = None
+
+
+def get_rate_limiter() -> ModelRateLimiter:
+    """The process-wide limiter, configured from ``MODEL_RPM_LIMIT`` / ``MODEL_TPM_LIMIT``."""
+    global _limiter
+    if _limiter is None:
+        _limiter = ModelRateLimiter(
+            requests_per_minute=float(os.getenv("MODEL_RPM_LIMIT", "0")),
+            tokens_per_minute=float(os.getenv("MODEL_TPM_LIMIT", "0"))
+        )
+        if _limiter.enabled:
+            logger.info(
+                f"Model rate limiter enabled: {os.getenv('MODEL_RPM_LIMIT', '0')} RPM, "
+                f"{os.getenv('MODEL_TPM_LIMIT', '0')} TPM"
+            )
+    return _limiter
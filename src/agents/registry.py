@@ -0,0 +1,24 @@
+import importlib
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, Type
+from src.agents.http_client import install_openai_client
+
+if TYPE_CHECKING:
+    from src.agents.base import BaseEcommerceAgent
+
+# Agent modules pull in the OpenAI Agents SDK and build tool schemas on import,
+# so they are only loaded the first time an activity needs them.
+AGENT_CLASSES: Dict[str, str] = {
+    "order_intake": "src.agents.order_intake:OrderIntakeAgent",
+    "payment": "src.agents.payment:PaymentAgent",
+    "fulfillment": "src.agents.fulfillment:FulfillmentAgent",
+    "customer_service": "src.agents.customer_service:CustomerServiceAgent",
+}
+
+
+@lru_cache(maxsize=None)
+def load_agent_class(key: str) -> Type["BaseEcommerceAgent"]:
+    module_name, class_name = AGENT_CLASSES[key].split(":")
+    agent_class = getattr(importlib.import_module(module_name), class_name)
+    install_openai_client()
+    return agent_class
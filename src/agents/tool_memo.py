@@ -0,0 +1,128 @@
+import functools
+import inspect
+import os
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Hashable, Iterator, Optional, Tuple
+from src.utils.metrics import METRICS
+from src.utils.sharding import record_memo_lookup
+
+# Order and customer id of the agent run the current tool call belongs to.
+_current_scope: ContextVar[Tuple[Optional[str], Optional[str]]] = ContextVar("tool_memo_scope", default=(None, None))
+
+
+class ToolMemo:
+    """Tool results keyed by order id (or customer, for per-customer tools), kept for the most recent scopes only.
+
+    Retries of the same order (activity retries and the workflow's own payment
+    retries) usually land on the same worker, so a process-local memo is enough
+    to skip repeated tool calls; a miss just runs the tool again.
+    """
+    
+    def __init__(self, max_scopes: int = 1000, ttl_seconds: float = 3600.0, clock: Callable[[], float] = time.monotonic):
+        self.max_scopes = max_scopes
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self._scopes: "OrderedDict[str, Tuple[float, Dict[Hashable, Any]]]" = OrderedDict()
+    
+    def _entries(self, scope: str, create: bool) -> Optional[Dict[Hashable, Any]]:
+        now = self.clock()
+        stored = self._scopes.get(scope)
+        if stored is not None and now - stored[0] > self.ttl_seconds:
+            del self._scopes[scope]
+            stored = None
+        if stored is None:
+            if not create:
+                return None
+            stored = (now, {})
+            self._scopes[scope] = stored
+            while len(self._scopes) > self.max_scopes:
+                self._scopes.popitem(last=False)
+        self._scopes.move_to_end(scope)
+        return stored[1]
+    
+    def get(self, scope: str, key: Hashable) -> Tuple[bool, Any]:
+        entries = self._entries(scope, create=False)
+        if entries is None or key not in entries:
+            return False, None
+        return True, entries[key]
+    
+    def put(self, scope: str, key: Hashable, value: Any) -> None:
+        self._entries(scope, create=True)[key] = value
+    
+    def clear(self, scope: str) -> None:
+        self._scopes.pop(scope, None)
+    
+    def __len__(self) -> int:
+        return len(self._scopes)
+
+
+_memo: Optional[ToolMemo] = None
+
+
+def get_tool_memo() -> ToolMemo:
+    global _memo
+    if _memo is None:
+        _memo = ToolMemo(
+            max_scopes=int(os.getenv("TOOL_MEMO_MAX_ORDERS", "1000")),
+            ttl_seconds=float(os.getenv("TOOL_MEMO_TTL_SECONDS", "3600"))
+        )
+    return _memo
+
+
+@contextmanager
+def memo_scope(order_id: Optional[str], customer_id: Optional[str] = None) -> Iterator[None]:
+    """Scope tool memoization to one order (and its customer) for the duration of an agent run."""
+    token = _current_scope.set((order_id, customer_id))
+    try:
+        yield
+    finally:
+        _current_scope.reset(token)
+
+
+def _enabled() -> bool:
+    return os.getenv("TOOL_MEMO_ENABLED", "true").lower() == "true"
+
+
+def _wrap(fn: Callable[..., Any], per_customer: bool = False) -> Callable[..., Any]:
+    signature = inspect.signature(fn)
+    
+    @functools.wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        order_id, customer_id = _current_scope.get()
+        scope = f"customer:{customer_id}" if per_customer and customer_id else order_id
+        if scope is None or not _enabled():
+            return fn(*args, **kwargs)
+        
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        key = (fn.__name__, tuple(sorted(bound.arguments.items())))
+        memo = get_tool_memo()
+        found, value = memo.get(scope, key)
+        record_memo_lookup(found)
+        if found:
+            METRICS.increment("tool_memo.hits", tool=fn.__name__)
+            return value
+        
+        METRICS.increment("tool_memo.misses", tool=fn.__name__)
+        value = fn(*args, **kwargs)
+        memo.put(scope, key, value)
+        return value
+    
+    return wrapper
+
+
+def memoized(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Cache a deterministic tool's result per order and arguments."""
+    return _wrap(fn)
+
+
+def memoized_per_customer(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Cache a deterministic tool's result per customer and arguments, shared by the customer's orders.
+
+    Falls back to the order scope when the run has no customer id.
+    """
+    return _wrap(fn, per_customer=True)
+
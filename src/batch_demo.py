@@ -0,0 +1,94 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import uuid
+from dotenv import load_dotenv
+from temporalio.client import Client
+from src.demo import (
+    create_sample_order,
+    create_suspicious_order,
+    create_inventory_issue_order,
+    create_payment_issue_order
+)
+from src.workflows.batch_processing import BatchOrderWorkflow
+from src.utils.json_encoder import serialize_for_temporal
+from src.utils.lanes import LanePolicy
+from src.utils.sharding import configured_shards
+
+load_dotenv()
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def write_batch_file(path: str, count: int) -> None:
+    """Write ``count`` demo orders to a JSON-lines file, cycling through the demo scenarios."""
+    factories = [
+        create_sample_order,
+        create_suspicious_order,
+        create_inventory_issue_order,
+        create_payment_issue_order
+    ]
+    with open(path, "w") as f:
+        for i in range(count):
+            order = factories[i % len(factories)]()
+            order.id = f"{order.id}-{i}"
+            f.write(serialize_for_temporal(order.to_dict()) + "\n")
+
+
+async def run_batch_demo(
+    count: int,
+    max_concurrent_children: int,
+    continue_as_new_after: int,
+    source: str
+):
+    client = await Client.connect(
+        os.getenv("TEMPORAL_HOST", "localhost:7233"),
+        namespace=os.getenv("TEMPORAL_NAMESPACE", "default")
+    )
+    
+    write_batch_file(source, count)
+    batch_id = f"BATCH-{uuid.uuid4().hex[:8].upper()}"
+    logger.info(f"Submitting batch {batch_id} with {count} orders from {source}")
+    shard_count, virtual_nodes = configured_shards()
+    
+    handle = await client.start_workflow(
+        BatchOrderWorkflow.run,
+        {
+            "batch_id": batch_id,
+            "source": os.path.abspath(source),
+            "max_concurrent_children": max_concurrent_children,
+            "continue_as_new_after": continue_as_new_after,
+            "shard_count": shard_count,
+            "shard_virtual_nodes": virtual_nodes,
+            "lane_policy": LanePolicy.from_env().model_dump()
+        },
+        id=f"batch-processing-{batch_id}",
+        task_queue=os.getenv("TEMPORAL_TASK_QUEUE", "ecommerce-order-processing")
+    )
+    
+    result_task = asyncio.ensure_future(handle.result())
+    while not result_task.done():
+        await asyncio.wait([result_task], timeout=5)
+        if not result_task.done():
+            progress = await handle.query(BatchOrderWorkflow.get_progress)
+            logger.info(f"Batch progress: {json.dumps(progress)}")
+    
+    logger.info(f"Batch {batch_id} result: {json.dumps(result_task.result())}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Submit a batch of demo orders as one BatchOrderWorkflow")
+    parser.add_argument("--count", type=int, default=100)
+    parser.add_argument("--max-concurrent", type=int, default=20)
+    parser.add_argument("--continue-as-new-after", type=int, default=1000)
+    parser.add_argument("--source", default="batch_orders.jsonl")
+    args = parser.parse_args()
+    
+    asyncio.run(run_batch_demo(args.count, args.max_concurrent, args.continue_as_new_after, args.source))
+
+
+if __name__ == "__main__":
+    main()
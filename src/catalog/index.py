@@ -0,0 +1,157 @@
+import json
+import math
+import os
+import re
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from pydantic import BaseModel
+from src.models.order import Order, Product
+
+DEFAULT_CATALOG_PATH = Path(__file__).with_name("products.json")
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+class CatalogItem(BaseModel):
+    sku: str
+    name: str
+    category: str
+    price: float
+    in_stock: bool = True
+
+    def to_product(self, quantity: int = 1) -> Product:
+        return Product(id=self.sku, name=self.name, price=self.price, quantity=quantity, sku=self.sku)
+
+
+def tokenize(text: str) -> Set[str]:
+    return set(TOKEN_PATTERN.findall(text.lower()))
+
+
+def price_band(price: float) -> int:
+    """Bands double in width: 0-2, 2-4, 4-8, ... so "similar price" scales with price."""
+    return int(math.log2(max(price, 1.0)))
+
+
+class ProductCatalog:
+    """In-memory catalog with an inverted index and precomputed alternatives per SKU.
+
+    Name tokens, category and price band each map to the SKUs that have them.
+    The ``top_k`` closest alternatives of every SKU are ranked once at load time,
+    so lookups at order time are dictionary reads; stock is checked at lookup.
+    """
+
+    def __init__(self, items: Iterable[CatalogItem], top_k: int = 5):
+        self.top_k = top_k
+        self.items: Dict[str, CatalogItem] = {item.sku: item for item in items}
+        self._tokens: Dict[str, Set[str]] = {sku: tokenize(item.name) for sku, item in self.items.items()}
+        self._by_token: Dict[str, Set[str]] = defaultdict(set)
+        self._by_category: Dict[str, Set[str]] = defaultdict(set)
+        self._by_band: Dict[int, Set[str]] = defaultdict(set)
+        for sku, item in self.items.items():
+            for token in self._tokens[sku]:
+                self._by_token[token].add(sku)
+            self._by_category[item.category].add(sku)
+            self._by_band[price_band(item.price)].add(sku)
+
+        # Keep spare candidates so out-of-stock ones can be skipped at lookup.
+        self._alternatives: Dict[str, List[str]] = {
+            sku: self._rank(self._tokens[sku], item.category, item.price, exclude=sku)[:top_k * 2]
+            for sku, item in self.items.items()
+        }
+
+    def _rank(self, tokens: Set[str], category: Optional[str], price: float, exclude: Optional[str] = None) -> List[str]:
+        candidates: Set[str] = set()
+        for token in tokens:
+            candidates |= self._by_token.get(token, set())
+        if category:
+            candidates |= self._by_category.get(category, set())
+        candidates.discard(exclude)
+
+        band = price_band(price)
+        scored: List[Tuple[float, float, str]] = []
+        for sku in candidates:
+            item = self.items[sku]
+            other = self._tokens[sku]
+            score = 2.0 * len(tokens & other) / len(tokens | other) if tokens else 0.0
+            if item.category == category:
+                score += 1.0
+            distance = abs(price_band(item.price) - band)
+            score += 0.5 if distance == 0 else 0.25 if distance == 1 else 0.0
+            scored.append((-score, abs(item.price - price), sku))
+        return [sku for _, _, sku in sorted(scored)]
+
+    def search(self, query: str = "", category: Optional[str] = None, max_price: Optional[float] = None) -> List[CatalogItem]:
+        """Items whose name contains every query token, optionally filtered by category and price."""
+        skus = set(self.items)
+        for token in tokenize(query):
+            skus &= self._by_token.get(token, set())
+        if category:
+            skus &= self._by_category.get(category, set())
+        if max_price is not None:
+            bands = [band for band in self._by_band if band <= price_band(max_price)]
+            skus &= set().union(*(self._by_band[band] for band in bands))
+            skus = {sku for sku in skus if self.items[sku].price <= max_price}
+        return sorted((self.items[sku] for sku in skus), key=lambda item: item.price)
+
+    def alternatives(self, sku: str, name: Optional[str] = None, price: float = 0.0) -> List[CatalogItem]:
+        """In-stock alternatives for ``sku``; unknown SKUs are matched by ``name`` and ``price``."""
+        if sku in self.items:
+            ranked = self._alternatives[sku]
+        elif name:
+            ranked = self._rank(tokenize(name), None, price, exclude=sku)
+        else:
+            return []
+        return [self.items[s] for s in ranked if self.items[s].in_stock][:self.top_k]
+
+    def alternatives_batch(self, skus: List[str]) -> Dict[str, List[CatalogItem]]:
+        return {sku: self.alternatives(sku) for sku in skus}
+
+    def unavailable_products(self, order: Order) -> List[Product]:
+        """Products in the order that the catalog does not have in stock, or does not list at all."""
+        return [p for p in order.products if p.sku not in self.items or not self.items[p.sku].in_stock]
+
+    def suggest_for_order(
+        self,
+        order: Order,
+        per_product: int = 3,
+        products: Optional[List[Product]] = None
+    ) -> List[Product]:
+        """Alternatives for ``products`` (default: every product in the order), at the quantity asked for."""
+        ordered = {product.sku for product in order.products}
+        suggestions: Dict[str, Product] = {}
+        for product in order.products if products is None else products:
+            for item in self.alternatives(product.sku, product.name, product.price)[:per_product]:
+                if item.sku not in ordered and item.sku not in suggestions:
+                    suggestions[item.sku] = item.to_product(product.quantity)
+        return list(suggestions.values())
+
+    def set_stock(self, sku: str, in_stock: bool) -> None:
+        self.items[sku].in_stock = in_stock
+
+
+def load_catalog(path: Optional[str] = None, top_k: Optional[int] = None) -> ProductCatalog:
+    with open(path or DEFAULT_CATALOG_PATH) as f:
+        items = [CatalogItem(**entry) for entry in json.load(f)]
+    return ProductCatalog(items, top_k=top_k or int(os.getenv("CATALOG_TOP_K", "5")))
+
+
+_catalog: Optional[ProductCatalog] = None
+
+
+def get_catalog() -> ProductCatalog:
+    global _catalog
+    if _catalog is None:
+        _catalog = load_catalog(os.getenv("PRODUCT_CATALOG_PATH") or None)
+    return _catalog
+
+
+def find_alternatives(skus: List[str]) -> str:
+    """Look up in-stock alternatives for one or more product SKUs in the catalog."""
+    lines = []
+    for sku, items in get_catalog().alternatives_batch(skus).items():
+        if items:
+            lines.append(f"{sku}: " + "; ".join(f"{i.name} ({i.sku}, ${i.price:.2f})" for i in items))
+        else:
+            lines.append(f"{sku}: no alternatives in stock")
+    return "\n".join(lines)
@@ -0,0 +1,194 @@
+"""Sorted binary price file, memory-mapped for SKU lookups without loading the catalog.
+
+    python -m src.catalog.prices build prices.csv prices.bin   # CSV with "sku" and "price" columns
+    python -m src.catalog.prices lookup prices.bin WH-001 SC-002
+
+Layout: a 16-byte header (magic, version, price scale, SKU width, record count)
+followed by fixed-width records sorted by SKU: the SKU padded with NUL bytes and
+the price as a signed 64-bit count of 10^-scale units. Lookups binary-search the
+mapping, so only the pages they touch become resident.
+"""
+import argparse
+import csv
+import mmap
+import os
+import struct
+from decimal import Decimal, InvalidOperation
+from typing import Dict, List, Optional
+from pydantic import BaseModel
+from src.models.order import Order
+
+MAGIC = b"PRCF"
+VERSION = 1
+HEADER = struct.Struct("<4sHBBQ")
+PRICE = struct.Struct("<q")
+
+
+class PriceFile:
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.scale, self.sku_width, self.count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a version {VERSION} price file")
+        self.record_size = self.sku_width + PRICE.size
+        self._unit = Decimal(1).scaleb(-self.scale)
+
+    def _sku_at(self, index: int) -> bytes:
+        offset = HEADER.size + index * self.record_size
+        return self._map[offset:offset + self.sku_width]
+
+    def price(self, sku: str) -> Optional[Decimal]:
+        key = sku.encode()
+        if len(key) > self.sku_width:
+            return None
+        key = key.ljust(self.sku_width, b"\0")
+
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._sku_at(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == self.count or self._sku_at(lo) != key:
+            return None
+        (units,) = PRICE.unpack_from(self._map, HEADER.size + lo * self.record_size + self.sku_width)
+        return units * self._unit
+
+    def __len__(self) -> int:
+        return self.count
+
+    def close(self) -> None:
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self) -> "PriceFile":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def build_price_file(csv_path: str, out_path: str, scale: int = 2) -> int:
+    """Write a price file from a CSV with ``sku`` and ``price`` columns; returns the record count."""
+    unit = Decimal(1).scaleb(-scale)
+    prices: Dict[bytes, int] = {}
+    with open(csv_path, newline="") as f:
+        reader = csv.DictReader(f)
+        missing = [c for c in ("sku", "price") if c not in (reader.fieldnames or [])]
+        if missing:
+            raise ValueError(f"{csv_path}: missing column {', '.join(missing)}; expected a header with sku and price")
+        for line, row in enumerate(reader, start=2):
+            try:
+                price = Decimal(row["price"].strip())
+            except (InvalidOperation, AttributeError):
+                raise ValueError(f"{csv_path}:{line}: invalid price {row.get('price')!r}")
+            if price != price.quantize(unit):
+                raise ValueError(f"{csv_path}:{line}: price {price} has more than {scale} decimal places")
+            sku = (row["sku"] or "").strip().encode()
+            if not sku:
+                raise ValueError(f"{csv_path}:{line}: missing SKU")
+            if sku in prices:
+                raise ValueError(f"{csv_path}:{line}: duplicate SKU {row['sku']}")
+            prices[sku] = int(price.scaleb(scale))
+
+    sku_width = max((len(sku) for sku in prices), default=1)
+    if sku_width > 255:
+        raise ValueError("SKUs longer than 255 bytes are not supported")
+
+    tmp_path = out_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, scale, sku_width, len(prices)))
+        for sku in sorted(prices):
+            f.write(sku.ljust(sku_width, b"\0"))
+            f.write(PRICE.pack(prices[sku]))
+    os.replace(tmp_path, out_path)
+    return len(prices)
+
+
+class PriceCheck(BaseModel):
+    declared_total: str = "0"
+    catalog_total: str = "0"
+    mismatches: List[str] = []
+
+    @property
+    def ok(self) -> bool:
+        return not self.mismatches
+
+
+def _money(value: float, unit: Decimal) -> Decimal:
+    # Floats are converted through their shortest repr, so 19.99 stays 19.99.
+    return Decimal(repr(value)).quantize(unit)
+
+
+def verify_order_total(order: Order, prices: PriceFile) -> PriceCheck:
+    """Recompute the order total from catalog prices in exact decimal and list every discrepancy."""
+    unit = Decimal(1).scaleb(-prices.scale)
+    mismatches = []
+    catalog_total = Decimal(0)
+
+    for product in order.products:
+        catalog_price = prices.price(product.sku)
+        if catalog_price is None:
+            mismatches.append(f"{product.sku}: not in price catalog")
+            continue
+        if _money(product.price, unit) != catalog_price:
+            mismatches.append(f"{product.sku}: unit price {product.price} but catalog price is {catalog_price}")
+        catalog_total += catalog_price * product.quantity
+
+    declared_total = _money(order.total_amount, unit)
+    if not mismatches and declared_total != catalog_total:
+        mismatches.append(f"order total {declared_total} but catalog prices add up to {catalog_total}")
+
+    return PriceCheck(
+        declared_total=str(declared_total),
+        catalog_total=str(catalog_total),
+        mismatches=mismatches
+    )
+
+
+_price_file: Optional[PriceFile] = None
+
+
+def get_price_file() -> Optional[PriceFile]:
+    """The price file named by ``PRICE_FILE_PATH``, opened on first use; None when not configured."""
+    global _price_file
+    path = os.getenv("PRICE_FILE_PATH")
+    if not path:
+        return None
+    if _price_file is None or _price_file.path != path:
+        previous, _price_file = _price_file, PriceFile(path)
+        # Activities only use the file synchronously, so none is still reading the old map.
+        if previous is not None:
+            previous.close()
+    return _price_file
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build or query a binary price file")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="Build a price file from CSV")
+    build.add_argument("csv_path")
+    build.add_argument("out_path")
+    build.add_argument("--scale", type=int, default=2, help="Decimal places stored per price")
+    lookup = commands.add_parser("lookup", help="Look up SKU prices")
+    lookup.add_argument("path")
+    lookup.add_argument("skus", nargs="+")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        count = build_price_file(args.csv_path, args.out_path, args.scale)
+        print(f"Wrote {count} prices to {args.out_path}")
+        return
+
+    with PriceFile(args.path) as prices:
+        for sku in args.skus:
+            price = prices.price(sku)
+            print(f"{sku}\t{price if price is not None else 'not found'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,7 +10,11 @@ from src.models.order import (
     OrderStatus, PaymentStatus, ShippingStatus
 )
 from src.workflows.order_processing import OrderProcessingWorkflow
+from src.workflows.order_state_board import ORDER_STATE_BOARD_WORKFLOW_ID
+from src.order_states import start_state_board
 from src.utils.json_encoder import serialize_for_temporal
+from src.utils.lanes import LanePolicy
+from src.utils.sharding import configured_shards, order_task_queue
 
 load_dotenv()
 
@@ -107,6 +111,19 @@ async def run_demo():
         ("Payment Issue Order", create_payment_issue_order())
     ]
     
+    options = {
+        "use_escalation_queue": os.getenv("ESCALATION_QUEUE_ENABLED", "false").lower() == "true",
+        "escalation_timeout_seconds": float(os.getenv("ESCALATION_TIMEOUT_SECONDS", "1800")),
+        "speculative_fulfillment": os.getenv("SPECULATIVE_FULFILLMENT", "false").lower() == "true",
+        "batch_shipments": os.getenv("SHIPMENT_BATCHING", "false").lower() == "true",
+        "tracking_timeout_seconds": float(os.getenv("TRACKING_TIMEOUT_SECONDS", "900")),
+        "step_mode": os.getenv("ORDER_STEP_MODE", "inline")
+    }
+    if os.getenv("ORDER_STATE_BOARD_ENABLED", "false").lower() == "true":
+        await start_state_board(client, os.getenv("TEMPORAL_TASK_QUEUE", "ecommerce-order-processing"))
+        options["state_subscriber_workflow_id"] = ORDER_STATE_BOARD_WORKFLOW_ID
+    
+    lanes = LanePolicy.from_env()
     for order_name, order in demo_orders:
         logger.info(f"\nProcessing {order_name}")
         logger.info(f"   Order ID: {order.id}")
@@ -117,9 +134,14 @@ async def run_demo():
         try:
             result = await client.execute_workflow(
                 OrderProcessingWorkflow.run,
-                order.to_dict(),
+                args=[order.to_dict(), options],
                 id=f"order-processing-{order.id}",
-                task_queue=os.getenv("TEMPORAL_TASK_QUEUE", "ecommerce-order-processing")
+                task_queue=order_task_queue(
+                    os.getenv("TEMPORAL_TASK_QUEUE", "ecommerce-order-processing"),
+                    order.customer.id,
+                    *configured_shards()
+                ),
+                priority=lanes.priority(order.to_dict())
             )
             
             logger.info(f"{order_name} Result: {result['status']}")
@@ -0,0 +1,163 @@
+import heapq
+import math
+from typing import Any, Dict, List, Optional, Tuple
+from pydantic import BaseModel, Field
+
+
+ISSUE_TYPE_WEIGHTS = {
+    "workflow_error": 2.5,
+    "payment": 2.0,
+    "fulfillment": 1.5,
+    "order_intake": 1.0,
+}
+
+CUSTOMER_TIER_WEIGHTS = {
+    "vip": 2.0,
+    "standard": 1.0,
+}
+
+
+class EscalationRequest(BaseModel):
+    workflow_id: str
+    order: Dict[str, Any]
+    issue_type: str
+    reason: str
+    enqueued_at: float = 0.0
+
+    @property
+    def customer_id(self) -> str:
+        return self.order["customer"]["id"]
+
+    @property
+    def dedup_key(self) -> str:
+        return f"{self.customer_id}:{self.issue_type}"
+
+
+class EscalationGroup(BaseModel):
+    key: str
+    seq: int
+    created_at: float
+    priority: float
+    requests: List[EscalationRequest] = Field(default_factory=list)
+    status: str = "pending"
+    result: Optional[Dict[str, Any]] = None
+
+    @property
+    def primary(self) -> EscalationRequest:
+        """The highest-value order in the group, handed to the customer service agent."""
+        return max(self.requests, key=lambda r: r.order.get("total_amount", 0.0))
+
+    def combined_reason(self) -> str:
+        primary = self.primary
+        others = [r.order["id"] for r in self.requests if r is not primary]
+        if not others:
+            return primary.reason
+        return f"{primary.reason} (same issue also affects orders: {', '.join(others)})"
+
+
+def escalation_priority(request: EscalationRequest) -> float:
+    """Higher is more urgent: issue severity x customer tier x log-scaled order value."""
+    issue_weight = ISSUE_TYPE_WEIGHTS.get(request.issue_type, 1.0)
+    tier = request.order["customer"].get("tier", "standard")
+    tier_weight = CUSTOMER_TIER_WEIGHTS.get(tier, 1.0)
+    value = max(request.order.get("total_amount", 0.0), 0.0)
+    return issue_weight * tier_weight * (1.0 + math.log10(1.0 + value))
+
+
+class EscalationQueue:
+    """Priority queue of escalations that merges duplicates per customer and issue.
+
+    A request joins an existing group for the same customer and issue type while
+    that group is still pending or being handled, and joins a resolved group if
+    it was opened less than ``dedup_window_seconds`` ago. Time is passed in by
+    the caller so the queue stays deterministic inside a workflow.
+    """
+
+    def __init__(self, dedup_window_seconds: float = 300.0):
+        self.dedup_window_seconds = dedup_window_seconds
+        self._groups: Dict[str, EscalationGroup] = {}
+        self._heap: List[Tuple[float, int, str]] = []
+        self._next_seq = 0
+        self.merged_count = 0
+
+    def __len__(self) -> int:
+        return sum(1 for g in self._groups.values() if g.status == "pending")
+
+    def enqueue(self, request: EscalationRequest, now: float) -> EscalationGroup:
+        """Add a request, returning the group it now belongs to."""
+        request.enqueued_at = now
+        group = self._groups.get(request.dedup_key)
+        
+        # A group that has not been resolved yet is never replaced: its heap entry
+        # or running task is keyed on it, and its waiters would be orphaned.
+        if group is not None and (group.status != "done" or now - group.created_at < self.dedup_window_seconds):
+            group.requests.append(request)
+            self.merged_count += 1
+            priority = escalation_priority(request)
+            if group.status == "pending" and priority > group.priority:
+                group.priority = priority
+                heapq.heappush(self._heap, (-priority, group.seq, group.key))
+            return group
+        
+        group = EscalationGroup(
+            key=request.dedup_key,
+            seq=self._next_seq,
+            created_at=now,
+            priority=escalation_priority(request),
+            requests=[request]
+        )
+        self._next_seq += 1
+        self._groups[group.key] = group
+        heapq.heappush(self._heap, (-group.priority, group.seq, group.key))
+        return group
+
+    def pop(self) -> Optional[EscalationGroup]:
+        """Take the most urgent pending group and mark it in flight."""
+        while self._heap:
+            neg_priority, seq, key = heapq.heappop(self._heap)
+            group = self._groups.get(key)
+            if group is None or group.seq != seq or group.status != "pending":
+                continue
+            if -neg_priority != group.priority:
+                continue
+            group.status = "in_flight"
+            return group
+        return None
+
+    def complete(self, group: EscalationGroup, result: Dict[str, Any]) -> List[EscalationRequest]:
+        """Record the result for a group, returning every request waiting on it."""
+        group.status = "done"
+        group.result = result
+        return list(group.requests)
+
+    def expire(self, now: float) -> None:
+        """Forget resolved groups whose dedup window has passed."""
+        for key in [
+            k for k, g in self._groups.items()
+            if g.status == "done" and now - g.created_at >= self.dedup_window_seconds
+        ]:
+            del self._groups[key]
+
+    def in_flight_count(self) -> int:
+        return sum(1 for g in self._groups.values() if g.status == "in_flight")
+
+    def to_state(self) -> Dict[str, Any]:
+        """Serializable state for continue-as-new; in-flight groups must be drained first."""
+        return {
+            "dedup_window_seconds": self.dedup_window_seconds,
+            "next_seq": self._next_seq,
+            "merged_count": self.merged_count,
+            "groups": [g.model_dump() for g in self._groups.values() if g.status != "in_flight"],
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "EscalationQueue":
+        queue = cls(state.get("dedup_window_seconds", 300.0))
+        queue._next_seq = state.get("next_seq", 0)
+        queue.merged_count = state.get("merged_count", 0)
+        for data in state.get("groups", []):
+            group = EscalationGroup(**data)
+            queue._groups[group.key] = group
+            if group.status == "pending":
+                heapq.heappush(queue._heap, (-group.priority, group.seq, group.key))
+        return queue
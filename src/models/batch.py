@@ -0,0 +1,48 @@
+from typing import Any, Dict, Optional
+from pydantic import BaseModel, Field
+from src.utils.lanes import LanePolicy
+
+
+class BatchProgress(BaseModel):
+    started: int = 0
+    completed: int = 0
+    escalated: int = 0
+    rejected: int = 0
+    failed: int = 0
+    in_flight: int = 0
+    continued_as_new: int = 0
+
+    @property
+    def finished(self) -> int:
+        return self.completed + self.escalated + self.rejected + self.failed
+
+    def record_started(self) -> None:
+        self.started += 1
+        self.in_flight += 1
+
+    def record_result(self, result: Optional[Dict[str, Any]]) -> None:
+        """Count a finished child order; ``None`` means the child workflow failed."""
+        self.in_flight -= 1
+        status = (result or {}).get("status")
+        if status == "completed":
+            self.completed += 1
+        elif status == "escalated":
+            self.escalated += 1
+        elif status == "rejected":
+            self.rejected += 1
+        else:
+            self.failed += 1
+
+
+class BatchReference(BaseModel):
+    batch_id: str
+    source: str
+    max_concurrent_children: int = 50
+    page_size: int = 100
+    continue_as_new_after: int = 1000
+    cursor: int = 0
+    # Customer-affinity routing of child orders; see src/utils/sharding.py.
+    shard_count: int = 0
+    shard_virtual_nodes: int = 64
+    lane_policy: LanePolicy = Field(default_factory=LanePolicy)
+    progress: BatchProgress = Field(default_factory=BatchProgress)
@@ -1,6 +1,6 @@
 from datetime import datetime
 from enum import Enum
-from typing import List, Optional, Dict, Any
+from typing import List, Literal, Optional, Dict, Any
 from pydantic import BaseModel, Field, ConfigDict
 
 
@@ -34,6 +34,18 @@ class ShippingStatus(str, Enum):
     FAILED = "failed"
 
 
+class OrderStage(str, Enum):
+    RECEIVED = "received"
+    INTAKE = "intake"
+    PAYMENT = "payment"
+    FULFILLMENT = "fulfillment"
+    ESCALATION = "escalation"
+    COMPLETED = "completed"
+    REJECTED = "rejected"
+    ESCALATED = "escalated"
+    FAILED = "failed"
+
+
 class Product(BaseModel):
     id: str
     name: str
@@ -56,6 +68,7 @@ class Customer(BaseModel):
     email: str
     phone: Optional[str] = None
     address: Address
+    tier: str = "standard"
 
 
 class PaymentMethod(BaseModel):
@@ -80,6 +93,8 @@ class Order(BaseModel):
     payment_method: Optional[PaymentMethod] = None
     tracking_number: Optional[str] = None
     notes: Optional[str] = None
+    # Explicit priority lane ("high", "normal" or "bulk"); see src/utils/lanes.py.
+    priority: Optional[str] = None
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary without datetime fields."""
@@ -112,6 +127,39 @@ class FulfillmentResult(BaseModel):
     error_message: Optional[str] = None
 
 
+class OrderProcessingOptions(BaseModel):
+    use_escalation_queue: bool = False
+    # How long to wait for the escalation queue before handling the escalation directly.
+    escalation_timeout_seconds: float = 1800.0
+    speculative_fulfillment: bool = False
+    # Tracking numbers come from a batched carrier manifest instead of the fulfillment agent.
+    batch_shipments: bool = False
+    # How long to wait for the manifest's tracking number before escalating the order.
+    tracking_timeout_seconds: float = 900.0
+    # How status updates, notifications and event logs run: in the workflow body,
+    # as local activities, or as regular activities.
+    step_mode: Literal["inline", "local", "activity"] = "inline"
+    # Workflow that receives ``order_state_updated`` signals as the stage changes.
+    state_subscriber_workflow_id: Optional[str] = None
+
+
+class OrderState(BaseModel):
+    """Compact live view of an order workflow, returned by its ``get_state`` query."""
+    order_id: str
+    stage: OrderStage = OrderStage.RECEIVED
+    order_status: OrderStatus = OrderStatus.PENDING
+    payment_status: PaymentStatus = PaymentStatus.PENDING
+    shipping_status: ShippingStatus = ShippingStatus.PENDING
+    tracking_number: Optional[str] = None
+    last_agent: Optional[str] = None
+    last_decision: Optional[str] = None
+    last_confidence: Optional[float] = None
+    retry_count: int = 0
+    started_at: datetime
+    stage_started_at: datetime
+    updated_at: datetime
+
+
 class AgentDecision(BaseModel):
     agent_name: str
     decision: str
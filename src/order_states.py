@@ -0,0 +1,81 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional
+from dotenv import load_dotenv
+from temporalio.client import Client, WorkflowQueryFailedError
+from temporalio.exceptions import WorkflowAlreadyStartedError
+from temporalio.service import RPCError
+from src.workflows.order_processing import OrderProcessingWorkflow
+from src.workflows.order_state_board import ORDER_STATE_BOARD_WORKFLOW_ID, OrderStateBoardWorkflow
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+
+async def query_order_states(
+    client: Client,
+    order_ids: List[str],
+    concurrency: int = 20
+) -> Dict[str, Optional[Dict[str, Any]]]:
+    """Query the live state of many order workflows, at most ``concurrency`` at a time.
+
+    Orders whose workflow cannot be found or queried map to ``None``.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def query(order_id: str) -> Optional[Dict[str, Any]]:
+        async with semaphore:
+            handle = client.get_workflow_handle(f"order-processing-{order_id}")
+            try:
+                return await handle.query(OrderProcessingWorkflow.get_state)
+            except (RPCError, WorkflowQueryFailedError) as e:
+                logger.warning(f"Could not query order {order_id}: {e}")
+                return None
+    
+    states = await asyncio.gather(*(query(order_id) for order_id in order_ids))
+    return dict(zip(order_ids, states))
+
+
+async def start_state_board(client: Client, task_queue: str, max_finished: int = 1000) -> None:
+    """Start the board that order workflows publish to, if it is not already running."""
+    try:
+        await client.start_workflow(
+            OrderStateBoardWorkflow.run,
+            {"max_finished": max_finished},
+            id=ORDER_STATE_BOARD_WORKFLOW_ID,
+            task_queue=task_queue
+        )
+    except WorkflowAlreadyStartedError:
+        pass
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Show the live state of order workflows")
+    parser.add_argument("order_ids", nargs="*", help="Orders to query directly")
+    parser.add_argument("--board", action="store_true", help="Read all published states from the state board")
+    parser.add_argument("--stage", help="With --board, only show orders in this stage")
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+    
+    client = await Client.connect(
+        os.getenv("TEMPORAL_HOST", "localhost:7233"),
+        namespace=os.getenv("TEMPORAL_NAMESPACE", "default")
+    )
+    
+    if args.board:
+        handle = client.get_workflow_handle(ORDER_STATE_BOARD_WORKFLOW_ID)
+        print(json.dumps({
+            "summary": await handle.query(OrderStateBoardWorkflow.get_summary),
+            "orders": await handle.query(OrderStateBoardWorkflow.get_states, args.stage)
+        }, indent=2))
+        return
+    
+    print(json.dumps(await query_order_states(client, args.order_ids, args.concurrency), indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
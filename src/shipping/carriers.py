@@ -0,0 +1,116 @@
+"""Carrier integrations used to submit shipment manifests.
+
+A carrier reserves tracking numbers and accepts manifests. Both calls are
+priced and rate-limited per request by real carriers, so tracking numbers are
+reserved ``MANIFEST_TRACKING_BLOCK_SIZE`` at a time and handed out from a
+process-local pool. Carriers are looked up by name in ``CARRIERS``; integrations
+register themselves with ``register_carrier``.
+"""
+import asyncio
+import os
+import random
+import string
+from collections import OrderedDict
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional
+from pydantic import BaseModel
+from src.shipping.manifest import Manifest
+from src.utils.metrics import METRICS
+
+
+class ManifestReceipt(BaseModel):
+    confirmation: str
+    # Order id -> tracking number as the carrier recorded it for the manifest.
+    tracking_numbers: Dict[str, str]
+
+
+class Carrier(ABC):
+    name: str
+
+    @abstractmethod
+    async def reserve_tracking_numbers(self, count: int) -> List[str]:
+        """Reserve ``count`` tracking numbers in one request."""
+
+    @abstractmethod
+    async def submit_manifest(self, manifest: Manifest, tracking_numbers: Dict[str, str]) -> ManifestReceipt:
+        """Submit a manifest (order id -> tracking number) and return the carrier's receipt.
+
+        ``manifest.manifest_id`` is stable across activity retries. A manifest
+        submitted twice must be ignored, and its receipt must carry the tracking
+        numbers of the first submission, not the ones passed in again.
+        """
+
+
+class LocalCarrier(Carrier):
+    """Stand-in carrier that issues tracking numbers locally and keeps recent manifests in memory.
+
+    Only the last ``max_manifests`` are kept, which covers any retry of a
+    submission while keeping memory bounded.
+    """
+
+    name = "local"
+
+    def __init__(self, max_manifests: int = 1000) -> None:
+        self.max_manifests = max_manifests
+        self.manifests: "OrderedDict[str, Dict[str, str]]" = OrderedDict()
+
+    async def reserve_tracking_numbers(self, count: int) -> List[str]:
+        METRICS.increment("carrier.requests", carrier=self.name, call="reserve")
+        block = "".join(random.choices(string.digits, k=6))
+        return [f"TRK{block}{i:04d}" for i in range(count)]
+
+    async def submit_manifest(self, manifest: Manifest, tracking_numbers: Dict[str, str]) -> ManifestReceipt:
+        METRICS.increment("carrier.requests", carrier=self.name, call="manifest")
+        recorded = self.manifests.setdefault(manifest.manifest_id, dict(tracking_numbers))
+        while len(self.manifests) > self.max_manifests:
+            self.manifests.popitem(last=False)
+        return ManifestReceipt(confirmation=f"CONF-{manifest.manifest_id}", tracking_numbers=recorded)
+
+
+class TrackingNumberPool:
+    """Tracking numbers reserved from a carrier in blocks and handed out as manifests need them."""
+
+    def __init__(self, carrier: Carrier, block_size: int = 100):
+        self.carrier = carrier
+        self.block_size = block_size
+        self._available: List[str] = []
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def take(self, count: int) -> List[str]:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if len(self._available) < count:
+                needed = max(self.block_size, count - len(self._available))
+                self._available.extend(await self.carrier.reserve_tracking_numbers(needed))
+                METRICS.increment("carrier.tracking_blocks", carrier=self.carrier.name)
+            taken, self._available = self._available[:count], self._available[count:]
+            return taken
+
+    def __len__(self) -> int:
+        return len(self._available)
+
+
+CARRIERS: Dict[str, Callable[[], Carrier]] = {
+    "local": LocalCarrier,
+}
+
+_pools: Dict[str, TrackingNumberPool] = {}
+
+
+def register_carrier(name: str, factory: Callable[[], Carrier]) -> None:
+    CARRIERS[name] = factory
+    _pools.pop(name, None)
+
+
+def get_tracking_pool(name: str) -> TrackingNumberPool:
+    """The carrier named ``name`` with its tracking number pool, created on first use."""
+    pool = _pools.get(name)
+    if pool is None:
+        if name not in CARRIERS:
+            raise ValueError(f"Unknown carrier {name!r}; registered: {', '.join(sorted(CARRIERS))}")
+        pool = _pools[name] = TrackingNumberPool(
+            CARRIERS[name](),
+            block_size=int(os.getenv("MANIFEST_TRACKING_BLOCK_SIZE", "100"))
+        )
+    return pool
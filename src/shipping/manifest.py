@@ -0,0 +1,116 @@
+from typing import Any, Dict, List, Optional, Tuple
+from pydantic import BaseModel, Field
+
+
+def destination_zone(address: Dict[str, Any]) -> str:
+    """Carrier zone of an address: its country and the first digit of its postal code."""
+    zip_code = str(address.get("zip_code", "")).strip()
+    return f"{address.get('country', '')}-{zip_code[:1] or '0'}"
+
+
+class ShipmentRequest(BaseModel):
+    workflow_id: str
+    order_id: str
+    carrier: str
+    zone: str
+    shipping_method: str = "standard"
+    weight_lbs: float = 0.0
+    destination: str = ""
+    requested_at: float = 0.0
+
+
+class Manifest(BaseModel):
+    manifest_id: str
+    carrier: str
+    zone: str
+    opened_at: float
+    shipments: List[ShipmentRequest] = Field(default_factory=list)
+
+    @property
+    def total_weight_lbs(self) -> float:
+        return sum(s.weight_lbs for s in self.shipments)
+
+
+class ManifestBuilder:
+    """Groups approved shipments into one manifest per carrier and destination zone.
+
+    A manifest closes when it reaches ``max_shipments`` or ``window_seconds``
+    after its first shipment, whichever comes first. Time is passed in by the
+    caller so the builder stays deterministic inside a workflow.
+
+    An order already on an open manifest, or on a closed one that has not been
+    ``release``d after submission, is not added again, so a retried
+    ``enqueue_shipment`` whose signal already arrived cannot put the order on a
+    second manifest. Once its manifest is released the order can be added anew.
+    """
+
+    def __init__(self, max_shipments: int = 50, window_seconds: float = 30.0):
+        self.max_shipments = max_shipments
+        self.window_seconds = window_seconds
+        self._open: Dict[Tuple[str, str], Manifest] = {}
+        self._next_seq = 0
+        # Order id -> manifest id for every open or not yet released manifest.
+        self._members: Dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return sum(len(m.shipments) for m in self._open.values())
+
+    def add(self, request: ShipmentRequest, now: float) -> Optional[Manifest]:
+        """Add a shipment, returning its manifest if that filled it up."""
+        if request.order_id in self._members:
+            return None
+        
+        request.requested_at = now
+        key = (request.carrier, request.zone)
+        manifest = self._open.get(key)
+        if manifest is None:
+            manifest = Manifest(
+                manifest_id=f"MAN-{request.carrier}-{request.zone}-{self._next_seq}",
+                carrier=request.carrier,
+                zone=request.zone,
+                opened_at=now
+            )
+            self._next_seq += 1
+            self._open[key] = manifest
+        
+        manifest.shipments.append(request)
+        self._members[request.order_id] = manifest.manifest_id
+        if len(manifest.shipments) >= self.max_shipments:
+            return self._open.pop(key)
+        return None
+
+    def release(self, manifest: Manifest) -> None:
+        """Forget a submitted (or abandoned) manifest's orders."""
+        for shipment in manifest.shipments:
+            if self._members.get(shipment.order_id) == manifest.manifest_id:
+                del self._members[shipment.order_id]
+
+    def due(self, now: float) -> List[Manifest]:
+        """Close and return every manifest whose window has passed."""
+        keys = [k for k, m in self._open.items() if now - m.opened_at >= self.window_seconds]
+        return [self._open.pop(k) for k in keys]
+
+    def next_deadline(self) -> Optional[float]:
+        """When the oldest open manifest's window ends; None with nothing open."""
+        if not self._open:
+            return None
+        return min(m.opened_at for m in self._open.values()) + self.window_seconds
+
+    def to_state(self) -> Dict[str, Any]:
+        return {
+            "max_shipments": self.max_shipments,
+            "window_seconds": self.window_seconds,
+            "next_seq": self._next_seq,
+            "manifests": [m.model_dump() for m in self._open.values()],
+            "members": self._members,
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "ManifestBuilder":
+        builder = cls(state.get("max_shipments", 50), state.get("window_seconds", 30.0))
+        builder._next_seq = state.get("next_seq", 0)
+        builder._members = dict(state.get("members", {}))
+        for data in state.get("manifests", []):
+            manifest = Manifest(**data)
+            builder._open[(manifest.carrier, manifest.zone)] = manifest
+        return builder
@@ -0,0 +1,233 @@
+"""Break down OrderProcessingWorkflow history size by activity type, order path and payload field.
+
+    python -m src.utils.history_size --limit 200                      # fetch closed runs from the server
+    python -m src.utils.history_size exported/*.json                  # histories exported with `temporal workflow show -o json`
+"""
+import argparse
+import asyncio
+import json
+import os
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from temporalio.api.common.v1 import Payload
+from temporalio.api.enums.v1 import EventType
+from temporalio.client import Client, WorkflowHistory
+
+DEFAULT_QUERY = "WorkflowType = 'OrderProcessingWorkflow' AND ExecutionStatus != 'Running'"
+
+# Nested fields below this depth are counted towards their parent.
+FIELD_DEPTH = 2
+
+# Marker sdk-core records for a completed local activity.
+LOCAL_ACTIVITY_MARKER = "core_local_activity"
+
+
+def _decode(payload: Payload) -> Any:
+    if payload.metadata.get("encoding") != b"json/plain":
+        return None
+    try:
+        return json.loads(payload.data)
+    except ValueError:
+        return None
+
+
+def _field_sizes(value: Any, prefix: str, depth: int = 0) -> Iterable[Tuple[str, int]]:
+    """Serialized size of ``value`` and of its fields down to FIELD_DEPTH."""
+    yield prefix, len(json.dumps(value, separators=(",", ":")))
+    if depth >= FIELD_DEPTH:
+        return
+    if isinstance(value, dict):
+        for key, item in value.items():
+            yield from _field_sizes(item, f"{prefix}.{key}", depth + 1)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _field_sizes(item, f"{prefix}[]", depth + 1)
+
+
+def _bucket(event: Any, scheduled: Dict[int, str], attrs_name: str, attrs: Any) -> str:
+    if event.event_type == EventType.EVENT_TYPE_ACTIVITY_TASK_SCHEDULED:
+        scheduled[event.event_id] = attrs.activity_type.name
+        return attrs.activity_type.name
+    if hasattr(attrs, "scheduled_event_id") and attrs.scheduled_event_id in scheduled:
+        return scheduled[attrs.scheduled_event_id]
+    if event.event_type == EventType.EVENT_TYPE_MARKER_RECORDED and attrs.marker_name == LOCAL_ACTIVITY_MARKER:
+        data = attrs.details["data"].payloads if "data" in attrs.details else []
+        marker = _decode(data[0]) if data else None
+        if isinstance(marker, dict) and marker.get("activity_type"):
+            return marker["activity_type"]
+    if event.event_type == EventType.EVENT_TYPE_WORKFLOW_EXECUTION_SIGNALED:
+        return f"signal:{attrs.signal_name}"
+    if attrs_name.startswith(("start_child_workflow", "child_workflow")):
+        return f"child:{attrs.workflow_type.name}"
+    return "workflow"
+
+
+def _payloads(attrs: Any) -> Iterable[Tuple[str, Payload]]:
+    for name in ("input", "result", "details"):
+        field = attrs.DESCRIPTOR.fields_by_name.get(name)
+        if field is None:
+            continue
+        if field.message_type.GetOptions().map_entry:
+            # Marker details map names (a local activity's "data" and "result") to payload lists.
+            for key, payloads in getattr(attrs, name).items():
+                for payload in payloads.payloads:
+                    yield key, payload
+        elif field.has_presence and attrs.HasField(name):
+            for payload in getattr(attrs, name).payloads:
+                yield name, payload
+
+
+def _path(events: Sequence[Any]) -> str:
+    last = events[-1] if events else None
+    if last is None:
+        return "empty"
+    if last.event_type == EventType.EVENT_TYPE_WORKFLOW_EXECUTION_COMPLETED:
+        payloads = last.workflow_execution_completed_event_attributes.result.payloads
+        result = _decode(payloads[0]) if payloads else None
+        if isinstance(result, dict) and result.get("status"):
+            return str(result["status"])
+        return "completed"
+    if last.event_type == EventType.EVENT_TYPE_WORKFLOW_EXECUTION_FAILED:
+        return "failed"
+    if last.event_type == EventType.EVENT_TYPE_WORKFLOW_EXECUTION_TIMED_OUT:
+        return "timed_out"
+    if last.event_type in (
+        EventType.EVENT_TYPE_WORKFLOW_EXECUTION_TERMINATED,
+        EventType.EVENT_TYPE_WORKFLOW_EXECUTION_CANCELED
+    ):
+        return "terminated"
+    return "running"
+
+
+def analyze_history(events: Sequence[Any]) -> Dict[str, Any]:
+    """Event counts and bytes per activity type, plus payload bytes per field, for one history."""
+    scheduled: Dict[int, str] = {}
+    by_activity: Dict[str, Dict[str, int]] = defaultdict(lambda: {"events": 0, "bytes": 0, "payload_bytes": 0})
+    fields: Dict[str, int] = defaultdict(int)
+
+    for event in events:
+        attrs_name = event.WhichOneof("attributes")
+        attrs = getattr(event, attrs_name) if attrs_name else None
+        bucket = _bucket(event, scheduled, attrs_name, attrs) if attrs is not None else "workflow"
+        stats = by_activity[bucket]
+        stats["events"] += 1
+        stats["bytes"] += event.ByteSize()
+        if attrs is None:
+            continue
+        for direction, payload in _payloads(attrs):
+            stats["payload_bytes"] += payload.ByteSize()
+            value = _decode(payload)
+            if value is not None:
+                for field, size in _field_sizes(value, f"{bucket}.{direction}", depth=1):
+                    fields[field] += size
+
+    return {
+        "path": _path(events),
+        "events": len(events),
+        "bytes": sum(e.ByteSize() for e in events),
+        "by_activity": dict(by_activity),
+        "fields": dict(fields),
+    }
+
+
+def aggregate(reports: List[Dict[str, Any]], top: int = 15) -> Dict[str, Any]:
+    paths: Dict[str, Dict[str, Any]] = {}
+    activities: Dict[str, Dict[str, int]] = defaultdict(lambda: {"events": 0, "bytes": 0, "payload_bytes": 0})
+    fields: Dict[str, Dict[str, int]] = defaultdict(lambda: {"bytes": 0, "histories": 0})
+
+    for report in reports:
+        path = paths.setdefault(report["path"], {"histories": 0, "events": 0, "bytes": 0, "max_bytes": 0})
+        path["histories"] += 1
+        path["events"] += report["events"]
+        path["bytes"] += report["bytes"]
+        path["max_bytes"] = max(path["max_bytes"], report["bytes"])
+        for name, stats in report["by_activity"].items():
+            for key, value in stats.items():
+                activities[name][key] += value
+        for field, size in report["fields"].items():
+            fields[field]["bytes"] += size
+            fields[field]["histories"] += 1
+
+    for path in paths.values():
+        path["events_per_history"] = path["events"] / path["histories"]
+        path["bytes_per_history"] = path["bytes"] / path["histories"]
+
+    # Only leaf-most entries are interesting; a parent always outweighs its fields.
+    leaves = {
+        field: stats for field, stats in fields.items()
+        if not any(other.startswith(field + ".") or other.startswith(field + "[]") for other in fields)
+    }
+    return {
+        "histories": len(reports),
+        "total_bytes": sum(r["bytes"] for r in reports),
+        "paths": dict(sorted(paths.items(), key=lambda kv: kv[1]["bytes_per_history"], reverse=True)),
+        "by_activity": dict(sorted(activities.items(), key=lambda kv: kv[1]["bytes"], reverse=True)),
+        "largest_fields": sorted(
+            ({"field": field, **stats} for field, stats in leaves.items()),
+            key=lambda f: f["bytes"],
+            reverse=True
+        )[:top],
+    }
+
+
+def load_histories(paths: List[str]) -> List[WorkflowHistory]:
+    histories = []
+    for path in paths:
+        histories.append(WorkflowHistory.from_json(Path(path).stem, Path(path).read_text()))
+    return histories
+
+
+async def fetch_histories(client: Client, query: str, limit: int, concurrency: int = 10) -> List[WorkflowHistory]:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(workflow_id: str, run_id: Optional[str]) -> WorkflowHistory:
+        async with semaphore:
+            return await client.get_workflow_handle(workflow_id, run_id=run_id).fetch_history()
+
+    executions = []
+    async for execution in client.list_workflows(query, limit=limit):
+        executions.append((execution.id, execution.run_id))
+    return list(await asyncio.gather(*(fetch(wid, rid) for wid, rid in executions)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Report history size of order processing workflows")
+    parser.add_argument("files", nargs="*", help="Exported history JSON files; fetches from the server if omitted")
+    parser.add_argument("--address", default=os.getenv("TEMPORAL_HOST", "localhost:7233"))
+    parser.add_argument("--namespace", default=os.getenv("TEMPORAL_NAMESPACE", "default"))
+    parser.add_argument("--query", default=DEFAULT_QUERY)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    if args.files:
+        histories = load_histories(args.files)
+    else:
+        async def fetch() -> List[WorkflowHistory]:
+            client = await Client.connect(args.address, namespace=args.namespace)
+            return await fetch_histories(client, args.query, args.limit)
+        histories = asyncio.run(fetch())
+
+    report = aggregate([analyze_history(h.events) for h in histories], args.top)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"{report['histories']} histories, {report['total_bytes'] / 1024:.1f} KiB total\n")
+    print("By path:")
+    for path, stats in report["paths"].items():
+        print(f"  {path:20s} {stats['histories']:>6d} runs {stats['events_per_history']:>8.1f} events "
+              f"{stats['bytes_per_history'] / 1024:>9.1f} KiB avg {stats['max_bytes'] / 1024:>9.1f} KiB max")
+    print("\nBy activity type:")
+    for name, stats in report["by_activity"].items():
+        print(f"  {name:40s} {stats['events']:>8d} events {stats['bytes'] / 1024:>9.1f} KiB "
+              f"({stats['payload_bytes'] / 1024:.1f} KiB payload)")
+    print("\nLargest payload fields:")
+    for field in report["largest_fields"]:
+        print(f"  {field['field']:60s} {field['bytes'] / 1024:>9.1f} KiB in {field['histories']} histories")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Break down import-time cost per module using ``python -X importtime``.
+
+    python -m src.utils.import_profile                      # worker startup
+    python -m src.utils.import_profile src.agents.payment   # cost deferred to first payment activity
+"""
+import argparse
+import json
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Any, Dict, List
+
+
+def measure_imports(modules: List[str]) -> List[Dict[str, Any]]:
+    """Import ``modules`` in a fresh interpreter and return one row per imported module."""
+    code = "; ".join(f"import {m}" for m in modules)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return parse_importtime(proc.stderr)
+
+
+def parse_importtime(output: str) -> List[Dict[str, Any]]:
+    rows = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append({
+            "module": name.strip(),
+            "depth": (len(name) - len(name.lstrip()) - 1) // 2,
+            "self_us": int(self_us),
+            "cumulative_us": int(cumulative_us),
+        })
+    return rows
+
+
+def summarize(rows: List[Dict[str, Any]], top: int = 20) -> Dict[str, Any]:
+    by_package: Dict[str, int] = defaultdict(int)
+    for row in rows:
+        by_package[row["module"].split(".")[0]] += row["self_us"]
+    
+    return {
+        "total_us": sum(row["self_us"] for row in rows),
+        "modules_imported": len(rows),
+        "by_package": dict(sorted(by_package.items(), key=lambda kv: kv[1], reverse=True)[:top]),
+        "top_cumulative": sorted(rows, key=lambda r: r["cumulative_us"], reverse=True)[:top],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Report per-module import-time cost")
+    parser.add_argument("modules", nargs="*", default=["src.worker"])
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+    
+    report = summarize(measure_imports(args.modules), args.top)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    
+    print(f"Importing {', '.join(args.modules)}: {report['total_us'] / 1000:.1f} ms "
+          f"across {report['modules_imported']} modules\n")
+    print("Self time by top-level package:")
+    for package, us in report["by_package"].items():
+        print(f"  {package:40s} {us / 1000:>9.1f} ms")
+    print("\nSlowest modules (cumulative):")
+    for row in report["top_cumulative"]:
+        print(f"  {row['module']:60s} {row['cumulative_us'] / 1000:>9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
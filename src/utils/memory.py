@@ -0,0 +1,249 @@
+"""Worker memory instrumentation: RSS and workflow-cache reporting, tracemalloc diffs and a soft budget.
+
+The budget is enforced in two steps. Over ``soft_limit_bytes`` the activity
+slot supplier is halved (down to ``min_concurrency``), so fewer agent runs and
+their prompts, responses and SDK objects are alive at once. If RSS is still over
+budget at the minimum, the worker is asked to restart with half as many cached
+workflows, which drops the sticky cache; running activities get the worker's
+graceful shutdown timeout to finish. Below ``recover_ratio`` of the budget the
+steps are undone in reverse: concurrency is doubled back up, then the cache is
+doubled back to its configured size with another restart.
+"""
+import asyncio
+import logging
+import os
+import resource
+import sys
+import threading
+import tracemalloc
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from temporalio.worker import CustomSlotSupplier, FixedSizeSlotSupplier, SlotPermit, WorkerTuner
+from src.utils.metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+# The SDK's default for each slot type when no tuner is given.
+DEFAULT_SLOTS = 100
+
+
+def rss_bytes() -> int:
+    """Current resident set size; falls back to peak RSS where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def cached_workflow_count(worker: Any) -> Optional[int]:
+    """Number of workflows in the worker's sticky cache.
+
+    The SDK has no public accessor, so this reads the private
+    ``Worker._workflow_worker._running_workflows`` run table (present in
+    temporalio 1.34) and returns None if a later SDK moves it. Only reporting
+    and the log line depend on it; the budget works on RSS alone.
+    """
+    runs = getattr(getattr(worker, "_workflow_worker", None), "_running_workflows", None)
+    return len(runs) if runs is not None else None
+
+
+class AdmissionGate(CustomSlotSupplier):
+    """Activity slot supplier whose limit can be lowered and raised at runtime.
+
+    A slot is reserved before the worker polls for an activity task, so while
+    the gate is full tasks stay queued on the server (in priority order) and
+    their start-to-close timeout has not started yet. ``release_slot`` may be
+    called off the event loop, hence the lock.
+    """
+
+    def __init__(self, limit: int):
+        self.max_limit = limit
+        self.limit = limit
+        self.active = 0
+        self._lock = threading.Lock()
+        self._waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+    def try_reserve_slot(self, ctx: Any = None) -> Optional[SlotPermit]:
+        with self._lock:
+            if self.active >= self.limit:
+                return None
+            self.active += 1
+            return SlotPermit()
+
+    async def reserve_slot(self, ctx: Any = None) -> SlotPermit:
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._lock:
+                if self.active < self.limit:
+                    self.active += 1
+                    return SlotPermit()
+                waiter = (loop, loop.create_future())
+                self._waiters.append(waiter)
+            try:
+                await waiter[1]
+            finally:
+                with self._lock:
+                    if waiter in self._waiters:
+                        self._waiters.remove(waiter)
+
+    def mark_slot_used(self, ctx: Any = None) -> None:
+        pass
+
+    def release_slot(self, ctx: Any = None) -> None:
+        with self._lock:
+            self.active -= 1
+        self._wake()
+
+    async def set_limit(self, limit: int) -> None:
+        self.limit = max(1, min(limit, self.max_limit))
+        self._wake()
+
+    def _wake(self) -> None:
+        with self._lock:
+            waiters, self._waiters = self._waiters, []
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(_resolve, future)
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+ACTIVITY_GATE = AdmissionGate(int(os.getenv("WORKER_MAX_AGENT_ACTIVITIES", "100")))
+
+
+def worker_tuner(gate: AdmissionGate = ACTIVITY_GATE) -> WorkerTuner:
+    """Worker tuner taking activity slots from ``gate``; the other slot types keep the SDK default."""
+    return WorkerTuner.create_composite(
+        workflow_supplier=FixedSizeSlotSupplier(DEFAULT_SLOTS),
+        activity_supplier=gate,
+        local_activity_supplier=FixedSizeSlotSupplier(DEFAULT_SLOTS),
+        nexus_supplier=FixedSizeSlotSupplier(DEFAULT_SLOTS)
+    )
+
+
+def _module_name(filename: str) -> str:
+    best = ""
+    for entry in sys.path:
+        if entry and filename.startswith(entry) and len(entry) > len(best):
+            best = entry
+    relative = filename[len(best):].lstrip(os.sep) if best else filename
+    module = relative.rsplit(".", 1)[0].replace(os.sep, ".")
+    return module[:-len(".__init__")] if module.endswith(".__init__") else module
+
+
+def _snapshot() -> tracemalloc.Snapshot:
+    """A snapshot without tracemalloc's own allocations, so every diff compares like with like."""
+    return tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__)
+    ])
+
+
+class SnapshotDiffer:
+    """Compare tracemalloc snapshots taken on demand, grouped by module."""
+
+    def __init__(self, top: int = 15):
+        self.top = top
+        self._previous: Optional[tracemalloc.Snapshot] = None
+
+    def take(self) -> List[Tuple[str, int, int]]:
+        """Start tracing on the first call; afterwards return (module, size_diff, size) since the last call."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._previous = _snapshot()
+            logger.info("tracemalloc started; the next snapshot is diffed against this baseline")
+            return []
+
+        snapshot = _snapshot()
+        by_module: Dict[str, List[int]] = defaultdict(lambda: [0, 0])
+        for stat in snapshot.compare_to(self._previous, "filename"):
+            totals = by_module[_module_name(stat.traceback[0].filename)]
+            totals[0] += stat.size_diff
+            totals[1] += stat.size
+        self._previous = snapshot
+
+        rows = sorted(((m, d, s) for m, (d, s) in by_module.items()), key=lambda r: abs(r[1]), reverse=True)
+        return rows[:self.top]
+
+    def log(self) -> None:
+        rows = self.take()
+        if rows:
+            lines = [f"  {diff / 1024:+10.1f} KiB {size / 1024:10.1f} KiB  {module}" for module, diff, size in rows]
+            logger.info("Memory growth by module since last snapshot:\n" + "\n".join(lines))
+
+
+class MemoryMonitor:
+    def __init__(
+        self,
+        interval_seconds: float = 60.0,
+        soft_limit_bytes: int = 0,
+        min_concurrency: int = 2,
+        max_cached_workflows: int = 1000,
+        min_cached_workflows: int = 50,
+        recover_ratio: float = 0.8,
+        gate: AdmissionGate = ACTIVITY_GATE,
+        rss: Callable[[], int] = rss_bytes
+    ):
+        self.interval_seconds = interval_seconds
+        self.soft_limit_bytes = soft_limit_bytes
+        self.min_concurrency = min_concurrency
+        self.max_cached_workflows = max_cached_workflows
+        self.configured_cached_workflows = max_cached_workflows
+        self.min_cached_workflows = min_cached_workflows
+        self.recover_ratio = recover_ratio
+        self.gate = gate
+        self.rss = rss
+        self.restart_requested = False
+
+    @classmethod
+    def from_env(cls) -> "MemoryMonitor":
+        return cls(
+            interval_seconds=float(os.getenv("WORKER_MEMORY_REPORT_SECONDS", "60")),
+            soft_limit_bytes=int(float(os.getenv("WORKER_MEMORY_SOFT_LIMIT_MB", "0")) * 1024 * 1024),
+            min_concurrency=int(os.getenv("WORKER_MIN_AGENT_ACTIVITIES", "2")),
+            max_cached_workflows=int(os.getenv("WORKER_MAX_CACHED_WORKFLOWS", "1000")),
+            min_cached_workflows=int(os.getenv("WORKER_MIN_CACHED_WORKFLOWS", "50"))
+        )
+
+    async def check(self, *workers: Any) -> None:
+        """Report memory once and apply the budget; sets ``restart_requested`` to resize the cache."""
+        rss = self.rss()
+        counts = [cached_workflow_count(worker) for worker in workers]
+        cached = None if None in counts else sum(counts)
+        METRICS.observe("worker.rss_mb", rss / 1024 / 1024)
+        if cached is not None:
+            METRICS.observe("worker.cached_workflows", cached)
+        logger.info(
+            f"Worker memory: RSS {rss / 1024 / 1024:.0f} MiB, cached workflows {cached if cached is not None else 'n/a'}"
+            f"/{self.max_cached_workflows}, activity slot limit {self.gate.limit} ({self.gate.active} reserved)"
+        )
+        if not self.soft_limit_bytes:
+            return
+
+        if rss > self.soft_limit_bytes:
+            METRICS.increment("worker.memory_over_budget")
+            if self.gate.limit > self.min_concurrency:
+                await self.gate.set_limit(max(self.gate.limit // 2, self.min_concurrency))
+                logger.warning(f"RSS over budget, lowering activity slot limit to {self.gate.limit}")
+            elif self.max_cached_workflows > self.min_cached_workflows:
+                self.max_cached_workflows = max(self.max_cached_workflows // 2, self.min_cached_workflows)
+                self.restart_requested = True
+                logger.warning(f"RSS over budget at minimum concurrency, evicting workflow cache (new size {self.max_cached_workflows})")
+        elif rss < self.soft_limit_bytes * self.recover_ratio:
+            if self.gate.limit < self.gate.max_limit:
+                await self.gate.set_limit(self.gate.limit * 2)
+                logger.info(f"RSS back under budget, raising activity slot limit to {self.gate.limit}")
+            elif self.max_cached_workflows < self.configured_cached_workflows:
+                self.max_cached_workflows = min(self.max_cached_workflows * 2, self.configured_cached_workflows)
+                self.restart_requested = True
+                logger.info(f"RSS back under budget, restarting with workflow cache size {self.max_cached_workflows}")
+
+    async def run(self, *workers: Any) -> None:
+        """Check periodically; shuts the workers down when the cache has to be resized."""
+        while not self.restart_requested:
+            await asyncio.sleep(self.interval_seconds)
+            await self.check(*workers)
+        await asyncio.gather(*(worker.shutdown() for worker in workers))
@@ -0,0 +1,88 @@
+import statistics
+import threading
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+LabelKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def _key(name: str, labels: Dict[str, Any]) -> LabelKey:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format(key: LabelKey) -> str:
+    name, labels = key
+    if not labels:
+        return name
+    return f"{name}{{{','.join(f'{k}={v}' for k, v in labels)}}}"
+
+
+class Metrics:
+    """In-process counters and timing summaries shared by agents and activities.
+
+    Observations keep the most recent ``window`` samples per series so percentiles
+    reflect current behaviour rather than the whole lifetime of the worker.
+    """
+
+    def __init__(self, window: int = 1024):
+        self.window = window
+        self._lock = threading.Lock()
+        self._counters: Dict[LabelKey, float] = defaultdict(float)
+        self._samples: Dict[LabelKey, Deque[float]] = {}
+        self._totals: Dict[LabelKey, Tuple[int, float]] = defaultdict(lambda: (0, 0.0))
+
+    def increment(self, name: str, value: float = 1, **labels: Any) -> None:
+        with self._lock:
+            self._counters[_key(name, labels)] += value
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        key = _key(name, labels)
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=self.window)
+            samples.append(value)
+            count, total = self._totals[key]
+            self._totals[key] = (count + 1, total + value)
+
+    def counter(self, name: str, **labels: Any) -> float:
+        with self._lock:
+            return self._counters.get(_key(name, labels), 0.0)
+
+    def percentile(self, name: str, pct: float, **labels: Any) -> Optional[float]:
+        """Percentile (0-100) of the recent window, or ``None`` with no samples."""
+        with self._lock:
+            samples = sorted(self._samples.get(_key(name, labels), ()))
+        if not samples:
+            return None
+        index = min(len(samples) - 1, max(0, round(pct / 100 * (len(samples) - 1))))
+        return samples[index]
+
+    def sample_count(self, name: str, **labels: Any) -> int:
+        with self._lock:
+            return len(self._samples.get(_key(name, labels), ()))
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = {_format(k): v for k, v in self._counters.items()}
+            timings = {}
+            for key, samples in self._samples.items():
+                ordered = sorted(samples)
+                count, total = self._totals[key]
+                timings[_format(key)] = {
+                    "count": count,
+                    "mean": total / count,
+                    "p50": statistics.median(ordered),
+                    "p95": ordered[min(len(ordered) - 1, round(0.95 * (len(ordered) - 1)))],
+                    "max": ordered[-1],
+                }
+        return {"counters": counters, "timings": timings}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._samples.clear()
+            self._totals.clear()
+
+
+METRICS = Metrics()
@@ -0,0 +1,149 @@
+"""On-demand CPU profiling of activities and agent runs.
+
+Profiling is off by default and costs one attribute check per call. It is
+switched on for a bounded window (``PROFILE_WINDOW_SECONDS``) or number of calls
+(``PROFILE_MAX_CALLS``), whichever ends first, either at startup with
+``PROFILE_ENABLED=true`` or at runtime by sending the worker ``SIGUSR2``
+(a second signal switches it off early). Each profiled call writes a cProfile
+file to ``PROFILE_DIR`` and logs its top functions by self time.
+
+cProfile sees everything that runs on the event loop thread, so while one call
+is being profiled, other calls are not, and the profile also contains whatever
+interleaved with it during awaits.
+"""
+import cProfile
+import functools
+import itertools
+import logging
+import os
+import pstats
+import signal
+import time
+from asyncio import AbstractEventLoop
+from pathlib import Path
+from typing import Any, Awaitable, Callable, List, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Awaitable[Any]])
+
+
+class ProfilingSwitch:
+    def __init__(
+        self,
+        output_dir: str = "profiles",
+        window_seconds: float = 60.0,
+        max_calls: int = 20,
+        top: int = 10,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.output_dir = Path(output_dir)
+        self.window_seconds = window_seconds
+        self.max_calls = max_calls
+        self.top = top
+        self.clock = clock
+        # None while disabled; checked on every wrapped call.
+        self.deadline: Optional[float] = None
+        self.remaining = 0
+        self._busy = False
+        self._seq = itertools.count(1)
+
+    @classmethod
+    def from_env(cls) -> "ProfilingSwitch":
+        switch = cls(
+            output_dir=os.getenv("PROFILE_DIR", "profiles"),
+            window_seconds=float(os.getenv("PROFILE_WINDOW_SECONDS", "60")),
+            max_calls=int(os.getenv("PROFILE_MAX_CALLS", "20")),
+            top=int(os.getenv("PROFILE_TOP_FUNCTIONS", "10"))
+        )
+        if os.getenv("PROFILE_ENABLED", "false").lower() == "true":
+            switch.enable()
+        return switch
+
+    @property
+    def enabled(self) -> bool:
+        return self.deadline is not None
+
+    def enable(self) -> None:
+        self.deadline = self.clock() + self.window_seconds
+        self.remaining = self.max_calls
+        logger.info(f"CPU profiling enabled for {self.window_seconds:.0f}s or {self.max_calls} calls, writing to {self.output_dir}")
+
+    def disable(self) -> None:
+        if self.deadline is not None:
+            logger.info("CPU profiling disabled")
+        self.deadline = None
+        self.remaining = 0
+
+    def toggle(self) -> None:
+        if self.enabled:
+            self.disable()
+        else:
+            self.enable()
+
+    def _claim(self) -> bool:
+        if self.clock() > self.deadline or self.remaining <= 0:
+            self.disable()
+            return False
+        if self._busy:
+            return False
+        self.remaining -= 1
+        self._busy = True
+        return True
+
+    async def run(self, name: str, fn: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any) -> Any:
+        if not self._claim():
+            return await fn(*args, **kwargs)
+
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            return await fn(*args, **kwargs)
+        finally:
+            profiler.disable()
+            self._busy = False
+            self._report(name, profiler, (time.perf_counter() - started) * 1000)
+
+    def _report(self, name: str, profiler: cProfile.Profile, elapsed_ms: float) -> None:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        path = self.output_dir / f"{name}-{int(time.time())}-{next(self._seq)}.prof"
+        profiler.dump_stats(str(path))
+        lines = [f"  {line}" for line in top_functions(pstats.Stats(profiler), self.top)]
+        logger.info(f"Profiled {name} ({elapsed_ms:.0f} ms wall) -> {path}\n" + "\n".join(lines))
+
+
+def top_functions(stats: pstats.Stats, top: int) -> List[str]:
+    """``top`` functions by self time, one line each."""
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)[:top]
+    lines = []
+    for (filename, line, function), (_, calls, self_time, cumulative, _) in rows:
+        lines.append(
+            f"{self_time * 1000:8.1f} ms self {cumulative * 1000:8.1f} ms cum {calls:>7d} calls  "
+            f"{function} ({os.path.basename(filename)}:{line})"
+        )
+    return lines
+
+
+PROFILER = ProfilingSwitch.from_env()
+
+
+def profiled(name: Optional[str] = None) -> Callable[[F], F]:
+    """Profile calls of an async function while ``PROFILER`` is enabled."""
+    def decorator(fn: F) -> F:
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if PROFILER.deadline is None:
+                return await fn(*args, **kwargs)
+            return await PROFILER.run(label, fn, *args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+    return decorator
+
+
+def install_signal_handler(loop: AbstractEventLoop) -> None:
+    """Toggle profiling when the process receives SIGUSR2 (where the platform has it)."""
+    if hasattr(signal, "SIGUSR2"):
+        loop.add_signal_handler(signal.SIGUSR2, PROFILER.toggle)
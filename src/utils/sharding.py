@@ -0,0 +1,158 @@
+"""Customer-affinity task queue sharding.
+
+With ``TASK_QUEUE_SHARDS=N`` each ``OrderProcessingWorkflow`` is started on
+``<task queue>-shard-<k>``, where ``k`` is the customer id's position on a
+consistent-hash ring of N shards. Activities run on their workflow's task
+queue, so every order for a customer, and its agent runs, lands on the workers
+serving that shard and finds the customer's tool memo entries there.
+
+Each shard owns ``SHARD_VIRTUAL_NODES`` points on the ring. Going from N to
+N + 1 shards moves only about 1/(N + 1) of customers, all to the new shard;
+workflows already running stay on their queue.
+"""
+import asyncio
+import bisect
+import functools
+import hashlib
+import logging
+import os
+import time
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Iterable, List, Optional, Sequence, Tuple, TypeVar
+from temporalio import activity
+from src.utils.metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Awaitable[Any]])
+
+SHARD_SEPARATOR = "-shard-"
+
+# Shard whose task queue the current activity was polled from.
+_current_shard: ContextVar[Optional[int]] = ContextVar("current_shard", default=None)
+
+
+def _hash(value: str) -> int:
+    # Stable across processes and Python versions, unlike hash().
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    def __init__(self, shards: Iterable[int], virtual_nodes: int = 64):
+        self.virtual_nodes = virtual_nodes
+        self._points: List[Tuple[int, int]] = []
+        for shard in shards:
+            self.add(shard)
+
+    @property
+    def shards(self) -> List[int]:
+        return sorted({shard for _, shard in self._points})
+
+    def add(self, shard: int) -> None:
+        points = [(_hash(f"shard-{shard}#{v}"), shard) for v in range(self.virtual_nodes)]
+        self._points = sorted(set(self._points) | set(points))
+
+    def remove(self, shard: int) -> None:
+        self._points = [point for point in self._points if point[1] != shard]
+
+    def shard_for(self, key: str) -> int:
+        if not self._points:
+            raise ValueError("Hash ring has no shards")
+        index = bisect.bisect(self._points, (_hash(key), -1)) % len(self._points)
+        return self._points[index][1]
+
+
+@functools.lru_cache(maxsize=32)
+def get_ring(shard_count: int, virtual_nodes: int = 64) -> HashRing:
+    return HashRing(range(shard_count), virtual_nodes)
+
+
+def configured_shards() -> Tuple[int, int]:
+    """``(TASK_QUEUE_SHARDS, SHARD_VIRTUAL_NODES)``; zero shards means sharding is off."""
+    return int(os.getenv("TASK_QUEUE_SHARDS", "0")), int(os.getenv("SHARD_VIRTUAL_NODES", "64"))
+
+
+def shard_task_queue(base: str, shard: int) -> str:
+    return f"{base}{SHARD_SEPARATOR}{shard}"
+
+
+def shard_of_task_queue(task_queue: str) -> Optional[int]:
+    _, separator, suffix = task_queue.rpartition(SHARD_SEPARATOR)
+    return int(suffix) if separator and suffix.isdigit() else None
+
+
+def base_task_queue(task_queue: str) -> str:
+    """The un-sharded queue a shard queue belongs to; other queues are returned unchanged."""
+    if shard_of_task_queue(task_queue) is None:
+        return task_queue
+    return task_queue.rpartition(SHARD_SEPARATOR)[0]
+
+
+def order_task_queue(base: str, customer_id: str, shard_count: int, virtual_nodes: int = 64) -> str:
+    """Task queue for an order of ``customer_id``; ``base`` itself when sharding is off.
+
+    Pure, so workflows can route child orders with it too.
+    """
+    if shard_count <= 0:
+        return base
+    return shard_task_queue(base, get_ring(shard_count, virtual_nodes).shard_for(customer_id))
+
+
+def parse_shards(spec: str, shard_count: int) -> List[int]:
+    """Shards named by ``spec``: "all", or a list like "0,2,4-6"."""
+    spec = spec.strip().lower()
+    if spec in ("", "all"):
+        return list(range(shard_count))
+    shards = set()
+    for part in spec.split(","):
+        start, _, end = part.strip().partition("-")
+        shards.update(range(int(start), int(end or start) + 1))
+    invalid = sorted(s for s in shards if not 0 <= s < shard_count)
+    if invalid:
+        raise ValueError(f"Shards {invalid} are outside 0..{shard_count - 1}")
+    return sorted(shards)
+
+
+def record_memo_lookup(hit: bool) -> None:
+    """Count a tool memo lookup against the current shard, if any."""
+    shard = _current_shard.get()
+    if shard is not None:
+        METRICS.increment("shard.memo_lookups", shard=shard)
+        if hit:
+            METRICS.increment("shard.memo_hits", shard=shard)
+
+
+def memo_hit_rate(shard: int) -> float:
+    lookups = METRICS.counter("shard.memo_lookups", shard=shard)
+    return METRICS.counter("shard.memo_hits", shard=shard) / lookups if lookups else 0.0
+
+
+def shard_load(shards: Sequence[int]) -> List[Tuple[int, float, float]]:
+    """(shard, activities run, memo hit rate) for each of ``shards``."""
+    return [(s, METRICS.counter("shard.activities", shard=s), memo_hit_rate(s)) for s in shards]
+
+
+async def report_shard_load(shards: Sequence[int], interval_seconds: float) -> None:
+    """Log activities run and tool memo hit rate per served shard every ``interval_seconds``."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        lines = [f"  shard {s}: {count:.0f} activities, memo hit rate {rate:.0%}" for s, count, rate in shard_load(shards)]
+        logger.info("Shard load:\n" + "\n".join(lines))
+
+
+def sharded(fn: F) -> F:
+    """Attribute an activity's load and tool memo lookups to the shard it was polled from."""
+    @functools.wraps(fn)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        shard = shard_of_task_queue(activity.info().task_queue) if activity.in_activity() else None
+        if shard is None:
+            return await fn(*args, **kwargs)
+        token = _current_shard.set(shard)
+        started = time.perf_counter()
+        try:
+            return await fn(*args, **kwargs)
+        finally:
+            _current_shard.reset(token)
+            METRICS.increment("shard.activities", shard=shard)
+            METRICS.observe("shard.activity_ms", (time.perf_counter() - started) * 1000, shard=shard)
+    return wrapper  # type: ignore[return-value]
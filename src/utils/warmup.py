@@ -0,0 +1,171 @@
+"""Worker warm-up before the first task is polled.
+
+The first orders after a start would otherwise pay for importing the agent
+modules, constructing agents, loading the model client's request code, opening
+model connections and the first pass through pydantic validation,
+serialization, prompt rendering and decision parsing. ``warm_up`` does all of
+that up front with a synthetic order that never reaches the model and logs how
+long each step took (also recorded as ``worker.warmup_ms``). When
+``WORKER_READY_FILE`` is set, ``signal_when_running`` writes the report there
+once every worker has started polling.
+
+A failing step is logged and skipped: warm-up only moves work earlier, so the
+worker still starts and the step's cost is paid on first use instead.
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
+from temporalio.converter import DataConverter
+from src.models.order import Address, Customer, Order, OrderStatus, PaymentMethod, PaymentStatus, Product
+from src.utils.metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+
+def synthetic_order() -> Order:
+    return Order(
+        id="WARMUP-0",
+        customer=Customer(
+            id="CUST-WARMUP",
+            name="Warm Up",
+            email="warmup@example.com",
+            address=Address(street="1 Warmup Way", city="New York", state="NY", zip_code="10001", country="USA")
+        ),
+        products=[
+            Product(id="PROD-001", name="Wireless Headphones", price=99.99, quantity=2, sku="WH-001"),
+            Product(id="PROD-002", name="Smartphone Case", price=19.99, quantity=1, sku="SC-002")
+        ],
+        total_amount=219.97,
+        payment_method=PaymentMethod(type="credit_card", last4="4242", expiry_month=12, expiry_year=2099)
+    )
+
+
+class WarmupReport:
+    def __init__(self) -> None:
+        self.steps: List[Dict[str, Any]] = []
+        self.started = time.perf_counter()
+        self.total_ms = 0.0
+
+    @asynccontextmanager
+    async def step(self, name: str) -> AsyncIterator[None]:
+        started = time.perf_counter()
+        error: Optional[str] = None
+        try:
+            yield
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            logger.warning(f"Warm-up step {name} failed, its cost moves to first use: {error}")
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        METRICS.observe("worker.warmup_ms", elapsed_ms, step=name)
+        self.steps.append({"step": name, "ms": round(elapsed_ms, 1), "error": error})
+
+    def finish(self) -> None:
+        self.total_ms = (time.perf_counter() - self.started) * 1000
+        lines = [
+            f"  {s['ms']:8.1f} ms  {s['step']}" + (f"  (failed: {s['error']})" if s["error"] else "")
+            for s in self.steps
+        ]
+        logger.info(f"Worker warm-up took {self.total_ms:.0f} ms:\n" + "\n".join(lines))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"total_ms": round(self.total_ms, 1), "steps": self.steps}
+
+
+async def warm_up(connections: int = 2) -> WarmupReport:
+    """Run every warm-up step in order and return the timing report."""
+    from src.activities.order_activities import quote_fulfillment, update_order_status, update_payment_status
+    from src.agents.http_client import prewarm_connections
+    from src.agents.registry import AGENT_CLASSES, load_agent_class
+    from src.catalog.index import get_catalog
+    from src.catalog.prices import get_price_file, verify_order_total
+
+    report = WarmupReport()
+    agents: Dict[str, Any] = {}
+
+    async with report.step("agents"):
+        for key in AGENT_CLASSES:
+            agents[key] = load_agent_class(key)()
+
+    # The SDK converts tools again on every request, so this only pays for the
+    # converter's imports and first run; there is nothing to cache.
+    async with report.step("model_client"):
+        from agents.models.openai_responses import Converter
+        for agent in agents.values():
+            Converter.convert_tools(list(agent.agent.tools), [])
+
+    async with report.step("model_connections"):
+        opened = await prewarm_connections(connections)
+        logger.info(f"Pre-opened {opened} model connection(s)")
+
+    order = synthetic_order()
+    order_data = order.to_dict()
+
+    async with report.step("serialization"):
+        converter = DataConverter.default.payload_converter
+        decoded = converter.from_payloads(converter.to_payloads([order_data]), [dict])[0]
+        Order(**decoded)
+
+    async with report.step("catalog"):
+        get_catalog().suggest_for_order(order)
+        prices = get_price_file()
+        if prices is not None:
+            verify_order_total(order, prices)
+
+    quote = None
+    async with report.step("quote"):
+        quote = await quote_fulfillment(order_data)
+
+    async with report.step("prompts_and_decisions"):
+        contexts = {
+            "order_intake": {"order": order},
+            "payment": {"order": order, "retry_count": 0},
+            "fulfillment": {"order": order, "quote": quote},
+            "customer_service": {"order": order, "issue_type": "payment", "escalation_reason": "warm-up"},
+        }
+        for key, agent in agents.items():
+            context = contexts.get(key, {"order": order})
+            agent.build_prompt(context)
+            agent.parse_decision(f"DECISION: {next(iter(agent.DECISIONS))}\nwarm-up", context)
+
+    async with report.step("status_updates"):
+        Order(**await update_order_status(dict(order_data), OrderStatus.VALIDATED))
+        Order(**await update_payment_status(dict(order_data), PaymentStatus.COMPLETED))
+
+    report.finish()
+    return report
+
+
+async def signal_when_running(
+    workers: Sequence[Any],
+    report: WarmupReport,
+    task_queues: List[str],
+    poll_seconds: float = 0.1
+) -> None:
+    """Signal readiness once every worker has passed validation and started polling.
+
+    Run it next to the workers and cancel it when they stop; a worker that fails
+    at startup never reports ready.
+    """
+    while not all(worker.is_running for worker in workers):
+        await asyncio.sleep(poll_seconds)
+    signal_ready(report, task_queues)
+
+
+def signal_ready(report: WarmupReport, task_queues: List[str]) -> None:
+    """Log readiness and write the warm-up report to ``WORKER_READY_FILE`` if set."""
+    METRICS.increment("worker.ready")
+    path = os.getenv("WORKER_READY_FILE")
+    if path:
+        with open(path, "w") as f:
+            json.dump({"pid": os.getpid(), "task_queues": task_queues, "warmup": report.to_dict()}, f)
+    logger.info(f"Worker ready, polling {', '.join(task_queues)}")
+
+
+def clear_ready() -> None:
+    path = os.getenv("WORKER_READY_FILE")
+    if path and os.path.exists(path):
+        os.remove(path)
@@ -1,13 +1,17 @@
 import asyncio
 import logging
 import os
+import signal
+from datetime import timedelta
 from dotenv import load_dotenv
 from temporalio.client import Client
 from temporalio.worker import Worker
+from temporalio.worker.workflow_sandbox import SandboxedWorkflowRunner, SandboxRestrictions
 from src.activities.order_activities import (
     process_order_intake,
     process_payment,
     process_fulfillment,
+    quote_fulfillment,
     handle_customer_service,
     update_order_status,
     update_payment_status,
@@ -15,13 +19,55 @@ from src.activities.order_activities import (
     send_notification,
     log_order_event
 )
+from src.activities.batch_activities import load_order_batch
+from src.agents.http_client import close_shared_http_client, open_shared_http_client
+from src.utils.memory import MemoryMonitor, SnapshotDiffer, worker_tuner
+from src.utils.profiling import install_signal_handler
+from src.utils.sharding import configured_shards, parse_shards, report_shard_load, shard_task_queue
+from src.utils.warmup import WarmupReport, clear_ready, signal_when_running, warm_up
+from src.activities.escalation_activities import enqueue_escalation
+from src.activities.shipping_activities import enqueue_shipment, submit_manifest
 from src.workflows.order_processing import OrderProcessingWorkflow
+from src.workflows.batch_processing import BatchOrderWorkflow
+from src.workflows.escalation_queue import EscalationQueueWorkflow
+from src.workflows.order_state_board import OrderStateBoardWorkflow
+from src.workflows.shipment_manifest import ShipmentManifestWorkflow
 
 load_dotenv()
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# pydantic is deterministic and expensive to re-import into every workflow sandbox.
+WORKFLOW_RUNNER = SandboxedWorkflowRunner(
+    restrictions=SandboxRestrictions.default.with_passthrough_modules("pydantic")
+)
+
+WORKFLOWS = [
+    OrderProcessingWorkflow,
+    BatchOrderWorkflow,
+    EscalationQueueWorkflow,
+    OrderStateBoardWorkflow,
+    ShipmentManifestWorkflow
+]
+
+ACTIVITIES = [
+    process_order_intake,
+    process_payment,
+    process_fulfillment,
+    quote_fulfillment,
+    handle_customer_service,
+    update_order_status,
+    update_payment_status,
+    update_shipping_status,
+    send_notification,
+    log_order_event,
+    load_order_batch,
+    enqueue_escalation,
+    enqueue_shipment,
+    submit_manifest
+]
+
 
 async def main():
     client = await Client.connect(
@@ -29,25 +75,73 @@ async def main():
         namespace=os.getenv("TEMPORAL_NAMESPACE", "default")
     )
     
-    worker = Worker(
-        client,
-        task_queue=os.getenv("TEMPORAL_TASK_QUEUE", "ecommerce-order-processing"),
-        workflows=[OrderProcessingWorkflow],
-        activities=[
-            process_order_intake,
-            process_payment,
-            process_fulfillment,
-            handle_customer_service,
-            update_order_status,
-            update_payment_status,
-            update_shipping_status,
-            send_notification,
-            log_order_event
-        ]
+    loop = asyncio.get_running_loop()
+    open_shared_http_client()
+    install_signal_handler(loop)
+    
+    # SIGUSR1 starts tracemalloc, then logs growth by module since the previous signal.
+    snapshots = SnapshotDiffer()
+    if hasattr(signal, "SIGUSR1"):
+        loop.add_signal_handler(signal.SIGUSR1, snapshots.log)
+    if os.getenv("WORKER_TRACEMALLOC", "false").lower() == "true":
+        snapshots.log()
+    
+    # With sharding on, also poll the customer-affinity queues named by WORKER_SHARDS.
+    # Priority lanes need no queues of their own: orders carry a task priority.
+    task_queue = os.getenv("TEMPORAL_TASK_QUEUE", "ecommerce-order-processing")
+    shard_count, _ = configured_shards()
+    shards = parse_shards(os.getenv("WORKER_SHARDS", "all"), shard_count)
+    task_queues = [task_queue] + [shard_task_queue(task_queue, shard) for shard in shards]
+    report_task = (
+        asyncio.create_task(report_shard_load(shards, float(os.getenv("WORKER_MEMORY_REPORT_SECONDS", "60"))))
+        if shards else None
+    )
+    
+    # Pay agent construction, model client loading and connection setup before the
+    # first poll rather than on the first orders.
+    report = (
+        await warm_up(int(os.getenv("WORKER_WARMUP_CONNECTIONS", "2")))
+        if os.getenv("WORKER_WARMUP", "true").lower() == "true" else WarmupReport()
     )
     
-    logger.info("Starting Temporal worker for e-commerce order processing...")
-    await worker.run()
+    monitor = MemoryMonitor.from_env()
+    # Restarts for the memory monitor let running activities, payments included, finish first.
+    graceful_shutdown = timedelta(seconds=float(os.getenv("WORKER_GRACEFUL_SHUTDOWN_SECONDS", "600")))
+    try:
+        while True:
+            # The cache budget and the activity slots are shared by the queues' workers.
+            workers = [
+                Worker(
+                    client,
+                    task_queue=queue,
+                    workflows=WORKFLOWS,
+                    activities=ACTIVITIES,
+                    workflow_runner=WORKFLOW_RUNNER,
+                    max_cached_workflows=max(1, monitor.max_cached_workflows // len(task_queues)),
+                    tuner=worker_tuner(),
+                    graceful_shutdown_timeout=graceful_shutdown
+                )
+                for queue in task_queues
+            ]
+            monitor_task = asyncio.create_task(monitor.run(*workers))
+            ready_task = asyncio.create_task(signal_when_running(workers, report, task_queues))
+            try:
+                await asyncio.gather(*(worker.run() for worker in workers))
+            finally:
+                monitor_task.cancel()
+                ready_task.cancel()
+                # Not ready again until the restarted workers are polling.
+                clear_ready()
+            
+            # The memory monitor shut the worker down to resize its workflow cache.
+            if not monitor.restart_requested:
+                break
+            monitor.restart_requested = False
+    finally:
+        if report_task is not None:
+            report_task.cancel()
+        clear_ready()
+        await close_shared_http_client()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,103 @@
+import asyncio
+from datetime import timedelta
+from typing import Any, Dict, Optional, Set
+from temporalio import workflow
+from temporalio.common import Priority
+from temporalio.exceptions import ChildWorkflowError, WorkflowAlreadyStartedError
+
+with workflow.unsafe.imports_passed_through():
+    from src.models.batch import BatchProgress, BatchReference
+    from src.activities.batch_activities import load_order_batch
+    from src.utils.sharding import order_task_queue
+    from src.workflows.order_processing import OrderProcessingWorkflow
+
+
+@workflow.defn
+class BatchOrderWorkflow:
+    """Fans a batch of orders out to ``OrderProcessingWorkflow`` children.
+
+    At most ``max_concurrent_children`` orders are in flight at once. After
+    ``continue_as_new_after`` children (or when the server suggests it) the
+    workflow drains its children and continues as new with the file cursor and
+    running totals, so history stays bounded regardless of batch size.
+    """
+
+    def __init__(self) -> None:
+        self._progress = BatchProgress()
+        self._batch_id: Optional[str] = None
+
+    @workflow.run
+    async def run(self, batch_data: Dict[str, Any]) -> Dict[str, Any]:
+        batch = BatchReference(**batch_data)
+        self._batch_id = batch.batch_id
+        self._progress = batch.progress
+        
+        workflow.logger.info(f"Processing batch {batch.batch_id} from cursor {batch.cursor}")
+        
+        cursor = batch.cursor
+        started_this_run = 0
+        in_flight: Set[asyncio.Task] = set()
+        
+        while True:
+            page = await workflow.execute_activity(
+                load_order_batch,
+                args=[batch.source, cursor, batch.page_size],
+                start_to_close_timeout=timedelta(minutes=1)
+            )
+            if not page["orders"]:
+                break
+            
+            for order_data in page["orders"]:
+                while len(in_flight) >= batch.max_concurrent_children:
+                    _, in_flight = await workflow.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                self._progress.record_started()
+                task_queue = order_task_queue(
+                    workflow.info().task_queue,
+                    order_data["customer"]["id"],
+                    batch.shard_count,
+                    batch.shard_virtual_nodes
+                )
+                in_flight.add(asyncio.create_task(
+                    self._run_child(order_data, task_queue, batch.lane_policy.priority(order_data))
+                ))
+                started_this_run += 1
+            cursor = page["next_cursor"]
+            
+            if (
+                started_this_run >= batch.continue_as_new_after
+                or workflow.info().is_continue_as_new_suggested()
+            ):
+                if in_flight:
+                    await workflow.wait(in_flight)
+                self._progress.continued_as_new += 1
+                workflow.continue_as_new(
+                    batch.model_copy(update={"cursor": cursor, "progress": self._progress}).model_dump()
+                )
+        
+        if in_flight:
+            await workflow.wait(in_flight)
+        
+        workflow.logger.info(f"Batch {batch.batch_id} finished: {self._progress.model_dump()}")
+        return {"batch_id": batch.batch_id, **self._progress.model_dump()}
+
+    @workflow.query
+    def get_progress(self) -> Dict[str, Any]:
+        return {
+            "batch_id": self._batch_id,
+            "finished": self._progress.finished,
+            **self._progress.model_dump()
+        }
+
+    async def _run_child(self, order_data: Dict[str, Any], task_queue: str, priority: Priority) -> None:
+        try:
+            result = await workflow.execute_child_workflow(
+                OrderProcessingWorkflow.run,
+                order_data,
+                id=f"order-processing-{order_data['id']}",
+                task_queue=task_queue,
+                priority=priority
+            )
+        except (ChildWorkflowError, WorkflowAlreadyStartedError) as e:
+            workflow.logger.warning(f"Order {order_data['id']} failed in batch {self._batch_id}: {e}")
+            result = None
+        self._progress.record_result(result)
@@ -0,0 +1,115 @@
+import asyncio
+from datetime import timedelta
+from typing import Any, Dict, Optional
+from temporalio import workflow
+
+with workflow.unsafe.imports_passed_through():
+    from src.escalation.queue import EscalationGroup, EscalationQueue, EscalationRequest
+    from src.activities.order_activities import handle_customer_service
+
+ESCALATION_QUEUE_WORKFLOW_ID = "escalation-queue"
+
+
+@workflow.defn
+class EscalationQueueWorkflow:
+    """Long-running dispatcher that drains escalations into the customer service agent.
+
+    Order workflows enqueue escalations with the ``enqueue`` signal. Duplicates for
+    the same customer and issue are merged into a single ``handle_customer_service``
+    run, at most ``max_concurrency`` runs are in flight, and every merged order
+    workflow receives the shared result through its ``escalation_resolved`` signal.
+    """
+
+    def __init__(self) -> None:
+        self._queue = EscalationQueue()
+        self._dispatched = 0
+
+    @workflow.run
+    async def run(self, config: Optional[Dict[str, Any]] = None) -> None:
+        config = config or {}
+        max_concurrency = config.get("max_concurrency", 4)
+        if config.get("state"):
+            self._queue = EscalationQueue.from_state(config["state"])
+        else:
+            self._queue.dedup_window_seconds = config.get("dedup_window_seconds", 300.0)
+        self._dispatched = config.get("dispatched", 0)
+        
+        in_flight = set()
+        while True:
+            await workflow.wait_condition(
+                lambda: (len(self._queue) > 0 and len(in_flight) < max_concurrency)
+                or workflow.info().is_continue_as_new_suggested()
+            )
+            
+            if workflow.info().is_continue_as_new_suggested():
+                if in_flight:
+                    await workflow.wait(in_flight)
+                await workflow.wait_condition(workflow.all_handlers_finished)
+                self._queue.expire(workflow.now().timestamp())
+                workflow.continue_as_new({
+                    **config,
+                    "state": self._queue.to_state(),
+                    "dispatched": self._dispatched
+                })
+            
+            group = self._queue.pop()
+            if group is None:
+                continue
+            task = asyncio.create_task(self._dispatch(group))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+
+    @workflow.signal
+    async def enqueue(self, request_data: Dict[str, Any]) -> None:
+        now = workflow.now().timestamp()
+        self._queue.expire(now)
+        request = EscalationRequest(**request_data)
+        group = self._queue.enqueue(request, now)
+        
+        if group.status == "done":
+            workflow.logger.info(f"Reusing escalation result for {group.key} on order {request.order['id']}")
+            await self._notify(request, group.result)
+
+    @workflow.query
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "pending": len(self._queue),
+            "in_flight": self._queue.in_flight_count(),
+            "dispatched": self._dispatched,
+            "merged": self._queue.merged_count
+        }
+
+    async def _dispatch(self, group: EscalationGroup) -> None:
+        primary = group.primary
+        workflow.logger.info(
+            f"Dispatching escalation {group.key} covering {len(group.requests)} order(s), "
+            f"priority {group.priority:.2f}"
+        )
+        self._dispatched += 1
+        
+        try:
+            result = await workflow.execute_activity(
+                handle_customer_service,
+                args=[primary.order, primary.issue_type, group.combined_reason()],
+                start_to_close_timeout=timedelta(minutes=10)
+            )
+        except Exception as e:
+            workflow.logger.error(f"Escalation {group.key} failed: {e}")
+            result = {
+                "decision": "ESCALATE_TO_HUMAN",
+                "confidence": 0.0,
+                "reasoning": f"Customer service agent failed: {e}",
+                "next_action": "assign_to_human_agent",
+                "requires_human_intervention": True
+            }
+        
+        for request in self._queue.complete(group, result):
+            await self._notify(request, result)
+
+    async def _notify(self, request: EscalationRequest, result: Dict[str, Any]) -> None:
+        try:
+            await workflow.get_external_workflow_handle(request.workflow_id).signal(
+                "escalation_resolved", result
+            )
+        except Exception as e:
+            workflow.logger.warning(f"Could not deliver escalation result to {request.workflow_id}: {e}")
@@ -1,18 +1,34 @@
 import asyncio
 import logging
-from datetime import timedelta
-from typing import Dict, Any
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional
 from temporalio import workflow
 from temporalio.common import RetryPolicy
 
 logger = logging.getLogger(__name__)
 
+# Status updates, notifications and event logs are cheap and idempotent.
+STEP_RETRY_POLICY = RetryPolicy(
+    initial_interval=timedelta(milliseconds=200),
+    maximum_interval=timedelta(seconds=5),
+    maximum_attempts=5
+)
+
 with workflow.unsafe.imports_passed_through():
-    from src.models.order import Order, OrderStatus, PaymentStatus, ShippingStatus
+    from src.models.order import (
+        Order,
+        OrderProcessingOptions,
+        OrderStage,
+        OrderState,
+        OrderStatus,
+        PaymentStatus,
+        ShippingStatus
+    )
     from src.activities.order_activities import (
         process_order_intake,
         process_payment,
         process_fulfillment,
+        quote_fulfillment,
         handle_customer_service,
         update_order_status,
         update_payment_status,
@@ -20,79 +36,128 @@ with workflow.unsafe.imports_passed_through():
         send_notification,
         log_order_event
     )
+    from src.activities.escalation_activities import enqueue_escalation
+    from src.activities.shipping_activities import enqueue_shipment
 
 
 @workflow.defn
 class OrderProcessingWorkflow:
+    def __init__(self) -> None:
+        self._options = OrderProcessingOptions()
+        self._escalation_result: Optional[Dict[str, Any]] = None
+        self._tracking_assignment: Optional[Dict[str, Any]] = None
+        self._quote_handle: Optional[workflow.ActivityHandle] = None
+        self._quote_scheduled_at: Optional[datetime] = None
+        self._quote_done_at: Optional[datetime] = None
+        self._state: Optional[OrderState] = None
+        self._state_publisher: Optional[asyncio.Task] = None
+        self._state_dirty = False
+    
     @workflow.run
-    async def run(self, order_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def run(self, order_data: Dict[str, Any], options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        self._options = OrderProcessingOptions(**(options or {}))
+        
         # Remove datetime fields and let Pydantic handle them with defaults
         order_data.pop('created_at', None)
         order_data.pop('updated_at', None)
         
         order = Order(**order_data)
+        now = workflow.now()
+        self._state = OrderState(order_id=order.id, started_at=now, stage_started_at=now, updated_at=now)
         logger.info(f"Starting order processing workflow for order {order.id}")
         
         workflow.logging.info(f"Processing order {order.id} for {order.customer.name}")
         
         try:
-            await log_order_event(order.to_dict(), "workflow_started", "Order processing workflow initiated")
+            await self._step(log_order_event, order.to_dict(), "workflow_started", "Order processing workflow initiated")
             
-            updated_order_data = await update_order_status(order.to_dict(), OrderStatus.PENDING)
+            updated_order_data = await self._step(update_order_status, order.to_dict(), OrderStatus.PENDING)
             order = Order(**updated_order_data)
+            self._advance(order, OrderStage.INTAKE)
             
             intake_result = await workflow.execute_activity(
                 process_order_intake,
                 args=[order.to_dict()],
                 start_to_close_timeout=timedelta(minutes=5)
             )
+            self._record_decision("order_intake", intake_result)
             
             if intake_result["decision"] == "REJECT":
-                updated_order_data = await update_order_status(order.to_dict(), OrderStatus.CANCELLED)
+                updated_order_data = await self._step(update_order_status, order.to_dict(), OrderStatus.CANCELLED)
                 order = Order(**updated_order_data)
-                await send_notification(order.to_dict(), "Order rejected: " + intake_result["reasoning"])
-                await log_order_event(order.to_dict(), "order_rejected", intake_result["reasoning"])
+                message = "Order rejected: " + intake_result["reasoning"]
+                if intake_result.get("suggested_alternatives"):
+                    message += "\nYou may be interested in: " + ", ".join(
+                        p["name"] for p in intake_result["suggested_alternatives"]
+                    )
+                await self._step(send_notification, order.to_dict(), message)
+                await self._step(log_order_event, order.to_dict(), "order_rejected", intake_result["reasoning"])
+                self._advance(order, OrderStage.REJECTED)
                 return {"status": "rejected", "reason": intake_result["reasoning"]}
             
             elif intake_result["decision"] == "ESCALATE":
-                updated_order_data = await update_order_status(order.to_dict(), OrderStatus.ESCALATED)
+                updated_order_data = await self._step(update_order_status, order.to_dict(), OrderStatus.ESCALATED)
                 order = Order(**updated_order_data)
                 await self._handle_escalation(order, "order_intake", intake_result["reasoning"])
+                self._advance(order, OrderStage.ESCALATED)
                 return {"status": "escalated", "reason": intake_result["reasoning"]}
             
-            updated_order_data = await update_order_status(order.to_dict(), OrderStatus.VALIDATED)
+            updated_order_data = await self._step(update_order_status, order.to_dict(), OrderStatus.VALIDATED)
             order = Order(**updated_order_data)
-            await send_notification(order.to_dict(), "Order validated successfully")
+            await self._step(send_notification, order.to_dict(), "Order validated successfully")
+            self._advance(order, OrderStage.PAYMENT)
+            
+            if self._options.speculative_fulfillment:
+                self._start_quote(order)
             
             payment_result = await self._process_payment_with_retry(order)
             
             if payment_result["decision"] == "ESCALATE":
-                updated_order_data = await update_order_status(order.to_dict(), OrderStatus.ESCALATED)
+                await self._discard_quote(order)
+                updated_order_data = await self._step(update_order_status, order.to_dict(), OrderStatus.ESCALATED)
                 order = Order(**updated_order_data)
                 await self._handle_escalation(order, "payment", payment_result["reasoning"])
+                self._advance(order, OrderStage.ESCALATED)
                 return {"status": "escalated", "reason": payment_result["reasoning"]}
             
-            updated_order_data = await update_payment_status(order.to_dict(), PaymentStatus.COMPLETED)
+            updated_order_data = await self._step(update_payment_status, order.to_dict(), PaymentStatus.COMPLETED)
             order = Order(**updated_order_data)
-            await send_notification(order.to_dict(), "Payment processed successfully")
+            await self._step(send_notification, order.to_dict(), "Payment processed successfully")
+            self._advance(order, OrderStage.FULFILLMENT)
+            
+            quote = await self._commit_quote(order)
             
             fulfillment_result = await workflow.execute_activity(
                 process_fulfillment,
-                args=[order.to_dict()],
+                args=[order.to_dict(), quote, self._options.batch_shipments],
                 start_to_close_timeout=timedelta(minutes=5)
             )
+            self._record_decision("fulfillment", fulfillment_result)
             
             if fulfillment_result["decision"] == "ESCALATE":
-                updated_order_data = await update_order_status(order.to_dict(), OrderStatus.ESCALATED)
+                updated_order_data = await self._step(update_order_status, order.to_dict(), OrderStatus.ESCALATED)
                 order = Order(**updated_order_data)
                 await self._handle_escalation(order, "fulfillment", fulfillment_result["reasoning"])
+                self._advance(order, OrderStage.ESCALATED)
                 return {"status": "escalated", "reason": fulfillment_result["reasoning"]}
             
-            updated_order_data = await update_shipping_status(order.to_dict(), ShippingStatus.SHIPPED)
+            if self._options.batch_shipments:
+                tracked = await self._await_tracking_number(order, quote)
+                if tracked is None:
+                    reason = f"No tracking number from the carrier manifest after {self._options.tracking_timeout_seconds:.0f}s"
+                    updated_order_data = await self._step(update_order_status, order.to_dict(), OrderStatus.ESCALATED)
+                    order = Order(**updated_order_data)
+                    await self._handle_escalation(order, "fulfillment", reason)
+                    self._advance(order, OrderStage.ESCALATED)
+                    return {"status": "escalated", "reason": reason}
+                order = tracked
+            
+            updated_order_data = await self._step(update_shipping_status, order.to_dict(), ShippingStatus.SHIPPED)
             order = Order(**updated_order_data)
-            await send_notification(order.to_dict(), "Order shipped successfully")
+            await self._step(send_notification, order.to_dict(), "Order shipped successfully")
             
-            await log_order_event(order.to_dict(), "order_completed", "Order processing completed successfully")
+            await self._step(log_order_event, order.to_dict(), "order_completed", "Order processing completed successfully")
+            self._advance(order, OrderStage.COMPLETED)
             
             return {
                 "status": "completed",
@@ -102,9 +167,156 @@ class OrderProcessingWorkflow:
             
         except Exception as e:
             logger.error(f"Error processing order {order.id}: {str(e)}")
-            await log_order_event(order.to_dict(), "workflow_error", str(e))
+            await self._step(log_order_event, order.to_dict(), "workflow_error", str(e))
+            await self._discard_quote(order)
             await self._handle_escalation(order, "workflow_error", str(e))
+            self._advance(order, OrderStage.FAILED)
             raise
+        finally:
+            await self._flush_state()
+    
+    async def _step(self, fn: Callable[..., Awaitable[Any]], *args: Any) -> Any:
+        """Run a bookkeeping activity the way ``OrderProcessingOptions.step_mode`` says.
+        
+        "inline" calls it in the workflow body (the original behaviour), "local"
+        runs it as a local activity on this worker, recorded as a marker without a
+        task queue round trip, and "activity" schedules a regular activity.
+        """
+        mode = self._options.step_mode
+        if mode == "local":
+            return await workflow.execute_local_activity(
+                fn,
+                args=list(args),
+                start_to_close_timeout=timedelta(seconds=5),
+                retry_policy=STEP_RETRY_POLICY
+            )
+        if mode == "activity":
+            return await workflow.execute_activity(
+                fn,
+                args=list(args),
+                start_to_close_timeout=timedelta(seconds=30),
+                retry_policy=STEP_RETRY_POLICY
+            )
+        return await fn(*args)
+    
+    @workflow.query
+    def get_state(self) -> Optional[Dict[str, Any]]:
+        return self._state.model_dump(mode="json") if self._state else None
+    
+    def _advance(self, order: Order, stage: OrderStage) -> None:
+        """Move the live state to ``stage`` and tell the subscriber, if any, in the background."""
+        now = workflow.now()
+        self._state.stage = stage
+        self._state.stage_started_at = now
+        self._state.updated_at = now
+        self._state.order_status = order.status
+        self._state.payment_status = order.payment_status
+        self._state.shipping_status = order.shipping_status
+        self._state.tracking_number = order.tracking_number
+        
+        if self._options.state_subscriber_workflow_id:
+            self._state_dirty = True
+            if self._state_publisher is None or self._state_publisher.done():
+                self._state_publisher = asyncio.create_task(self._publish_state())
+    
+    async def _publish_state(self) -> None:
+        """Signal the latest state until it is current, one signal in flight at a time.
+        
+        Stage changes made while a signal is outstanding are coalesced into the
+        next one, so the subscriber may skip intermediate stages but always ends
+        up with the latest state, and order processing never waits on it.
+        """
+        subscriber = workflow.get_external_workflow_handle(self._options.state_subscriber_workflow_id)
+        while self._state_dirty:
+            self._state_dirty = False
+            try:
+                await subscriber.signal("order_state_updated", self.get_state())
+            except Exception as e:
+                workflow.logger.warning(f"Could not publish state of order {self._state.order_id}: {e}")
+    
+    async def _flush_state(self) -> None:
+        """Wait for the final state to reach the subscriber before the workflow closes."""
+        if self._state_publisher is not None:
+            await self._state_publisher
+    
+    def _record_decision(self, agent: str, result: Dict[str, Any]) -> None:
+        self._state.last_agent = agent
+        self._state.last_decision = result.get("decision")
+        self._state.last_confidence = result.get("confidence")
+        self._state.updated_at = workflow.now()
+    
+    def _start_quote(self, order: Order) -> None:
+        self._quote_scheduled_at = workflow.now()
+        self._quote_handle = workflow.start_activity(
+            quote_fulfillment,
+            args=[order.to_dict()],
+            start_to_close_timeout=timedelta(minutes=1),
+            cancellation_type=workflow.ActivityCancellationType.TRY_CANCEL
+        )
+        self._quote_handle.add_done_callback(lambda _: setattr(self, "_quote_done_at", workflow.now()))
+    
+    async def _commit_quote(self, order: Order) -> Optional[Dict[str, Any]]:
+        """Use the speculative quote once payment is approved, recording the latency it saved."""
+        quote_handle, self._quote_handle = self._quote_handle, None
+        if quote_handle is None:
+            return None
+        
+        waited_from = workflow.now()
+        try:
+            quote = await quote_handle
+        except Exception as e:
+            workflow.logger.warning(f"Speculative quote for order {order.id} failed, fulfilling without it: {e}")
+            return None
+        
+        # The quote's wall time from scheduling to completion, including queueing
+        # and the task round trip, that overlapped with payment is latency saved.
+        saved_ms = (min(self._quote_done_at or workflow.now(), waited_from) - self._quote_scheduled_at).total_seconds() * 1000
+        workflow.metric_meter().create_counter("speculative_quotes_committed").add(1)
+        workflow.metric_meter().create_histogram_float("speculative_quote_saved_ms").record(saved_ms)
+        await self._step(log_order_event, order.to_dict(), "speculative_quote_committed", f"saved {saved_ms:.0f} ms")
+        return quote
+    
+    async def _discard_quote(self, order: Order) -> None:
+        """Cancel a speculative quote that will not be used, recording the wall time it took."""
+        quote_handle, self._quote_handle = self._quote_handle, None
+        if quote_handle is None:
+            return
+        
+        if not quote_handle.done():
+            quote_handle.cancel()
+        wasted_ms = ((self._quote_done_at or workflow.now()) - self._quote_scheduled_at).total_seconds() * 1000
+        workflow.metric_meter().create_counter("speculative_quotes_wasted").add(1)
+        workflow.metric_meter().create_histogram_float("speculative_quote_wasted_ms").record(wasted_ms)
+        await self._step(log_order_event, order.to_dict(), "speculative_quote_discarded", f"wasted {wasted_ms:.0f} ms")
+    
+    async def _await_tracking_number(self, order: Order, quote: Optional[Dict[str, Any]]) -> Optional[Order]:
+        """Add the shipment to the carrier manifest and wait for its tracking number.
+
+        Returns None if none arrives within ``tracking_timeout_seconds``, e.g.
+        because the manifest workflow failed or its signal was not delivered.
+        """
+        self._tracking_assignment = None
+        await workflow.execute_activity(
+            enqueue_shipment,
+            args=[workflow.info().workflow_id, order.to_dict(), quote["shipping_method"] if quote else "standard"],
+            start_to_close_timeout=timedelta(seconds=30)
+        )
+        try:
+            await workflow.wait_condition(
+                lambda: self._tracking_assignment is not None,
+                timeout=timedelta(seconds=self._options.tracking_timeout_seconds)
+            )
+        except asyncio.TimeoutError:
+            workflow.logger.warning(f"No tracking number for order {order.id} from the carrier manifest, escalating")
+            return None
+        
+        order.tracking_number = self._tracking_assignment["tracking_number"]
+        await self._step(log_order_event, order.to_dict(), "tracking_assigned", f"manifest {self._tracking_assignment['manifest_id']}")
+        return order
+    
+    @workflow.signal
+    def tracking_assigned(self, assignment: Dict[str, Any]) -> None:
+        self._tracking_assignment = assignment
     
     async def _process_payment_with_retry(self, order: Order) -> Dict[str, Any]:
         max_retries = 3
@@ -116,6 +328,7 @@ class OrderProcessingWorkflow:
         )
         
         for attempt in range(max_retries):
+            self._state.retry_count = attempt
             try:
                 payment_result = await workflow.execute_activity(
                     process_payment,
@@ -123,6 +336,7 @@ class OrderProcessingWorkflow:
                     start_to_close_timeout=timedelta(minutes=5),
                     retry_policy=retry_policy
                 )
+                self._record_decision("payment", payment_result)
                 
                 if payment_result["decision"] == "APPROVE":
                     return payment_result
@@ -146,18 +360,56 @@ class OrderProcessingWorkflow:
     
     async def _handle_escalation(self, order: Order, issue_type: str, reason: str) -> None:
         workflow.logging.info(f"Escalating order {order.id} due to {issue_type}: {reason}")
+        self._advance(order, OrderStage.ESCALATION)
         
-        escalation_result = await workflow.execute_activity(
-            handle_customer_service,
-            args=[order.to_dict(), issue_type, reason],
-            start_to_close_timeout=timedelta(minutes=10)
-        )
+        if self._options.use_escalation_queue:
+            escalation_result = await self._enqueue_escalation(order, issue_type, reason)
+        else:
+            escalation_result = await self._handle_escalation_directly(order, issue_type, reason)
+        self._record_decision("customer_service", escalation_result)
         
-        await log_order_event(order.to_dict(), "escalation_handled", escalation_result["reasoning"])
+        await self._step(log_order_event, order.to_dict(), "escalation_handled", escalation_result["reasoning"])
         
         if escalation_result["decision"] == "CANCEL_ORDER":
-            updated_order_data = await update_order_status(order.to_dict(), OrderStatus.CANCELLED)
+            updated_order_data = await self._step(update_order_status, order.to_dict(), OrderStatus.CANCELLED)
             order = Order(**updated_order_data)
-            await send_notification(order.to_dict(), "Order cancelled: " + escalation_result["reasoning"])
+            await self._step(send_notification, order.to_dict(), "Order cancelled: " + escalation_result["reasoning"])
         elif escalation_result["requires_human_intervention"]:
-            await send_notification(order.to_dict(), "Order requires human review: " + escalation_result["reasoning"]) 
\ No newline at end of file
+            await self._step(send_notification, order.to_dict(), "Order requires human review: " + escalation_result["reasoning"])
+    
+    @workflow.signal
+    def escalation_resolved(self, result: Dict[str, Any]) -> None:
+        self._escalation_result = result
+    
+    async def _enqueue_escalation(self, order: Order, issue_type: str, reason: str) -> Dict[str, Any]:
+        self._escalation_result = None
+        await workflow.execute_activity(
+            enqueue_escalation,
+            args=[{
+                "workflow_id": workflow.info().workflow_id,
+                "order": order.to_dict(),
+                "issue_type": issue_type,
+                "reason": reason
+            }],
+            start_to_close_timeout=timedelta(seconds=30)
+        )
+        try:
+            await workflow.wait_condition(
+                lambda: self._escalation_result is not None,
+                timeout=timedelta(seconds=self._options.escalation_timeout_seconds)
+            )
+        except asyncio.TimeoutError:
+            # The dispatcher is down or its signal was lost; don't leave the order waiting.
+            workflow.logger.warning(
+                f"No escalation result for order {order.id} after "
+                f"{self._options.escalation_timeout_seconds:.0f}s, handling it directly"
+            )
+            return await self._handle_escalation_directly(order, issue_type, reason)
+        return self._escalation_result
+    
+    async def _handle_escalation_directly(self, order: Order, issue_type: str, reason: str) -> Dict[str, Any]:
+        return await workflow.execute_activity(
+            handle_customer_service,
+            args=[order.to_dict(), issue_type, reason],
+            start_to_close_timeout=timedelta(minutes=10)
+        )
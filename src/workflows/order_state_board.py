@@ -0,0 +1,53 @@
+from typing import Any, Dict, List, Optional
+from temporalio import workflow
+
+ORDER_STATE_BOARD_WORKFLOW_ID = "order-state-board"
+
+TERMINAL_STAGES = {"completed", "rejected", "escalated", "failed"}
+
+
+@workflow.defn
+class OrderStateBoardWorkflow:
+    """Keeps the latest state of every order workflow that publishes to it.
+
+    Order workflows started with ``state_subscriber_workflow_id`` pointing here
+    signal ``order_state_updated`` as their stage changes (coalescing changes
+    made while a signal is in flight), so a dashboard can read
+    all live orders with a single query. Only the most recent ``max_finished``
+    finished orders are kept.
+    """
+
+    def __init__(self) -> None:
+        self._states: Dict[str, Dict[str, Any]] = {}
+        self._max_finished = 1000
+
+    @workflow.run
+    async def run(self, config: Optional[Dict[str, Any]] = None) -> None:
+        config = config or {}
+        self._max_finished = config.get("max_finished", 1000)
+        self._states.update(config.get("states", {}))
+        
+        await workflow.wait_condition(lambda: workflow.info().is_continue_as_new_suggested())
+        await workflow.wait_condition(workflow.all_handlers_finished)
+        workflow.continue_as_new({**config, "states": self._states})
+
+    @workflow.signal
+    def order_state_updated(self, state: Dict[str, Any]) -> None:
+        # Re-insert so finished orders are dropped oldest first.
+        self._states.pop(state["order_id"], None)
+        self._states[state["order_id"]] = state
+        
+        finished = [order_id for order_id, s in self._states.items() if s["stage"] in TERMINAL_STAGES]
+        for order_id in finished[:max(len(finished) - self._max_finished, 0)]:
+            del self._states[order_id]
+
+    @workflow.query
+    def get_states(self, stage: Optional[str] = None) -> List[Dict[str, Any]]:
+        return [s for s in self._states.values() if stage is None or s["stage"] == stage]
+
+    @workflow.query
+    def get_summary(self) -> Dict[str, int]:
+        summary: Dict[str, int] = {}
+        for state in self._states.values():
+            summary[state["stage"]] = summary.get(state["stage"], 0) + 1
+        return summary
@@ -0,0 +1,108 @@
+import asyncio
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Set
+from temporalio import workflow
+
+with workflow.unsafe.imports_passed_through():
+    from src.shipping.manifest import Manifest, ManifestBuilder, ShipmentRequest
+    from src.activities.shipping_activities import submit_manifest
+
+SHIPMENT_MANIFEST_WORKFLOW_ID = "shipment-manifests"
+
+
+@workflow.defn
+class ShipmentManifestWorkflow:
+    """Long-running builder that batches approved shipments into carrier manifests.
+
+    Order workflows add shipments with the ``add_shipment`` signal. Shipments are
+    grouped per carrier and destination zone; a manifest is submitted with one
+    ``submit_manifest`` activity once it is full or its window has passed, and
+    every order in it receives its tracking number through its
+    ``tracking_assigned`` signal.
+    """
+
+    def __init__(self) -> None:
+        self._builder = ManifestBuilder()
+        self._ready: List[Manifest] = []
+        self._submitted = 0
+
+    @workflow.run
+    async def run(self, config: Optional[Dict[str, Any]] = None) -> None:
+        config = config or {}
+        if config.get("state"):
+            self._builder = ManifestBuilder.from_state(config["state"])
+        else:
+            self._builder = ManifestBuilder(config.get("max_shipments", 50), config.get("window_seconds", 30.0))
+        self._ready.extend(Manifest(**m) for m in config.get("ready", []))
+        self._submitted = config.get("submitted", 0)
+        
+        in_flight: Set[asyncio.Task] = set()
+        while True:
+            deadline = self._builder.next_deadline()
+            timeout = None if deadline is None else max(deadline - workflow.now().timestamp(), 0.0)
+            try:
+                await workflow.wait_condition(
+                    lambda: bool(self._ready) or workflow.info().is_continue_as_new_suggested(),
+                    timeout=timeout
+                )
+            except asyncio.TimeoutError:
+                pass
+            
+            self._ready.extend(self._builder.due(workflow.now().timestamp()))
+            while self._ready:
+                task = asyncio.create_task(self._submit(self._ready.pop(0)))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+            
+            if workflow.info().is_continue_as_new_suggested():
+                if in_flight:
+                    await workflow.wait(in_flight)
+                await workflow.wait_condition(workflow.all_handlers_finished)
+                workflow.continue_as_new({
+                    **config,
+                    "state": self._builder.to_state(),
+                    "ready": [m.model_dump() for m in self._ready],
+                    "submitted": self._submitted
+                })
+
+    @workflow.signal
+    def add_shipment(self, request_data: Dict[str, Any]) -> None:
+        manifest = self._builder.add(ShipmentRequest(**request_data), workflow.now().timestamp())
+        if manifest is not None:
+            self._ready.append(manifest)
+
+    @workflow.query
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "pending_shipments": len(self._builder),
+            "ready_manifests": len(self._ready),
+            "submitted_manifests": self._submitted
+        }
+
+    async def _submit(self, manifest: Manifest) -> None:
+        workflow.logger.info(f"Submitting manifest {manifest.manifest_id} with {len(manifest.shipments)} shipment(s)")
+        try:
+            result = await workflow.execute_activity(
+                submit_manifest,
+                args=[manifest.model_dump()],
+                start_to_close_timeout=timedelta(minutes=2)
+            )
+        finally:
+            # Its orders may be added again from here on, e.g. after this submission failed.
+            self._builder.release(manifest)
+        self._submitted += 1
+        
+        await asyncio.gather(*(
+            self._notify(shipment, {
+                "tracking_number": result["tracking_numbers"][shipment.order_id],
+                "manifest_id": result["manifest_id"],
+                "confirmation": result["confirmation"]
+            })
+            for shipment in manifest.shipments
+        ))
+
+    async def _notify(self, shipment: ShipmentRequest, assignment: Dict[str, Any]) -> None:
+        try:
+            await workflow.get_external_workflow_handle(shipment.workflow_id).signal("tracking_assigned", assignment)
+        except Exception as e:
+            workflow.logger.warning(f"Could not deliver tracking number to {shipment.workflow_id}: {e}")
@@ -0,0 +1,382 @@
+import asyncio
+from types import SimpleNamespace
+import pytest
+from agents import RunContextWrapper
+from src.agents import base
+from src.agents.customer_service import CustomerServiceAgent
+from src.agents.fulfillment import FulfillmentAgent
+from src.agents.order_intake import OrderIntakeAgent
+from src.agents.hedging import HedgePolicy, run_hedged
+from src.agents.model_routing import load_tier_config
+from src.agents.payment import PaymentAgent
+from src.agents.rate_limiter import AGENT_PRIORITIES, ModelRateLimiter, TokenBucket
+from src.models.order import Order, Customer, Address, Product, PaymentMethod
+from src.utils.metrics import METRICS
+
+
+@pytest.fixture
+def sample_order():
+    return Order(
+        id="ORD-RUNTIME",
+        customer=Customer(
+            id="CUST-001",
+            name="Test Customer",
+            email="customer@example.com",
+            address=Address(street="123 Test St", city="Test City", state="TS", zip_code="12345", country="USA")
+        ),
+        products=[Product(id="PROD-001", name="Test Product", price=50.00, quantity=1, sku="TEST-001")],
+        total_amount=50.00,
+        payment_method=PaymentMethod(type="credit_card", last4="1234", expiry_month=12, expiry_year=2030)
+    )
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    METRICS.reset()
+    yield
+    METRICS.reset()
+
+
+class FakeStreamedRun:
+    """Stands in for RunResultStreaming, pausing on ``gate`` after ``pause_after`` chunks."""
+
+    def __init__(self, chunks, gate=None, pause_after=None):
+        self.chunks = chunks
+        self.gate = gate
+        self.pause_after = pause_after
+        self.final_output = None
+        self.context_wrapper = SimpleNamespace(usage=SimpleNamespace(requests=1, input_tokens=80, total_tokens=100))
+
+    async def stream_events(self):
+        yield SimpleNamespace(type="raw_response_event", data=SimpleNamespace(type="response.created"))
+        for i, chunk in enumerate(self.chunks):
+            if self.gate is not None and i == self.pause_after:
+                await self.gate.wait()
+            yield SimpleNamespace(
+                type="raw_response_event",
+                data=SimpleNamespace(type="response.output_text.delta", delta=chunk)
+            )
+        self.final_output = "".join(self.chunks)
+
+
+def use_streamed_run(monkeypatch, run):
+    monkeypatch.setattr(base.Runner, "run_streamed", lambda agent, prompt, **kwargs: run)
+
+
+@pytest.mark.asyncio
+async def test_streaming_returns_decision_before_reasoning_finishes(monkeypatch, sample_order):
+    monkeypatch.setenv("AGENT_STREAMING", "true")
+    events = []
+    
+    async def fake_log_order_event(order_data, event, details):
+        events.append((order_data["id"], event, details))
+    
+    monkeypatch.setattr("src.activities.order_activities.log_order_event", fake_log_order_event)
+    gate = asyncio.Event()
+    run = FakeStreamedRun(["DECI", "SION: APP", "ROVE\n", "Email valid, ", "inventory available."], gate, pause_after=3)
+    use_streamed_run(monkeypatch, run)
+    
+    decision = await asyncio.wait_for(OrderIntakeAgent().process({"order": sample_order}), timeout=1)
+    
+    assert decision.decision == "APPROVE"
+    assert decision.next_action == "proceed_to_payment"
+    assert run.final_output is None
+    assert METRICS.counter("agent.early_decisions", agent="Order Intake Agent") == 1
+    
+    gate.set()
+    await asyncio.gather(*base._background_tasks)
+    assert run.final_output.endswith("inventory available.")
+    assert METRICS.sample_count("agent.stream_total_ms", agent="Order Intake Agent") == 1
+    assert events == [("ORD-RUNTIME", "order_intake_reasoning", run.final_output)]
+
+
+@pytest.mark.asyncio
+async def test_streaming_falls_back_to_full_output_without_verdict_line(monkeypatch, sample_order):
+    monkeypatch.setenv("AGENT_STREAMING", "true")
+    use_streamed_run(monkeypatch, FakeStreamedRun(["This order looks suspicious, ", "please escalate."]))
+    
+    decision = await OrderIntakeAgent().process({"order": sample_order})
+    
+    assert decision.decision == "ESCALATE"
+    assert METRICS.counter("agent.stream_fallbacks", agent="Order Intake Agent") == 1
+
+
+def test_agents_with_side_effecting_tools_do_not_stream(monkeypatch):
+    monkeypatch.setenv("AGENT_STREAMING", "true")
+    
+    assert OrderIntakeAgent().streaming
+    assert not PaymentAgent().streaming
+    assert not CustomerServiceAgent().streaming
+
+
+@pytest.mark.asyncio
+async def test_batched_fulfillment_is_not_offered_the_tracking_number_tool(monkeypatch, sample_order):
+    offered = []
+    
+    async def fake_run(self, prompt, model=None):
+        tools = await self.agent.get_all_tools(RunContextWrapper(context=None))
+        offered.append("generate_tracking_number" in {tool.name for tool in tools})
+        return "DECISION: SHIP, shipping available"
+    
+    monkeypatch.setattr(base.BaseEcommerceAgent, "_run", fake_run)
+    await FulfillmentAgent().process({"order": sample_order, "batched": True})
+    await FulfillmentAgent().process({"order": sample_order})
+    
+    assert offered == [False, True]
+
+
+def test_find_verdict_waits_for_complete_token():
+    agent = PaymentAgent()
+    
+    assert agent.find_verdict("DECISION: RET") is None
+    assert agent.find_verdict("DECISION: RETRY\n") == "RETRY"
+    assert agent.find_verdict("decision: **approve** because") == "APPROVE"
+    assert agent.find_verdict("DECISION: MAYBE\n") is None
+
+
+def test_payment_retry_verdict_escalates_after_retry_limit(sample_order):
+    agent = PaymentAgent()
+    
+    assert agent.decision_from_verdict("RETRY", "", {"order": sample_order, "retry_count": 1}).decision == "RETRY"
+    assert agent.decision_from_verdict("RETRY", "", {"order": sample_order, "retry_count": 3}).decision == "ESCALATE"
+
+
+def stub_models(monkeypatch, outputs):
+    calls = []
+    
+    async def fake_run(self, prompt, model=None):
+        calls.append(model)
+        return outputs[model]
+    
+    monkeypatch.setattr(base.BaseEcommerceAgent, "_run", fake_run)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_tiering_keeps_confident_small_model_decision(monkeypatch, sample_order):
+    monkeypatch.setenv("AGENT_MODEL_TIERS", "small,large")
+    calls = stub_models(monkeypatch, {"small": "All checks passed. APPROVE", "large": "REJECT"})
+    
+    decision = await OrderIntakeAgent().process({"order": sample_order})
+    
+    assert decision.decision == "APPROVE"
+    assert calls == ["small"]
+    assert METRICS.counter("agent.tier_runs", agent="Order Intake Agent") == 1
+    assert METRICS.counter("agent.tier_escalations", agent="Order Intake Agent", from_model="small") == 0
+
+
+@pytest.mark.asyncio
+async def test_tiering_escalates_unparseable_or_low_confidence_output(monkeypatch, sample_order):
+    monkeypatch.setenv("AGENT_MODEL_TIERS", "small,medium,large")
+    monkeypatch.setenv("ORDER_INTAKE_AGENT_CONFIDENCE_THRESHOLD", "0.75")
+    calls = stub_models(monkeypatch, {
+        "small": "I am not sure what to do here.",
+        "medium": "Probably fine, REJECT maybe\nCONFIDENCE: 0.4",
+        "large": "Everything checks out. APPROVE",
+    })
+    
+    decision = await OrderIntakeAgent().process({"order": sample_order})
+    
+    assert decision.decision == "APPROVE"
+    assert calls == ["small", "medium", "large"]
+    assert METRICS.counter("agent.tier_escalations", agent="Order Intake Agent", from_model="small") == 1
+    assert METRICS.counter("agent.tier_escalations", agent="Order Intake Agent", from_model="medium") == 1
+    assert METRICS.sample_count("agent.tier_escalation_cost_ms", agent="Order Intake Agent") == 1
+
+
+@pytest.mark.asyncio
+async def test_tiering_keeps_low_value_verdicts_the_model_is_sure_of(monkeypatch, sample_order):
+    monkeypatch.setenv("AGENT_MODEL_TIERS", "small,large")
+    calls = stub_models(monkeypatch, {"small": "Address invalid. REJECT\nCONFIDENCE: 0.95", "large": "APPROVE"})
+    
+    decision = await OrderIntakeAgent().process({"order": sample_order})
+    
+    assert decision.decision == "REJECT"
+    assert calls == ["small"]
+
+
+def test_agents_with_side_effecting_tools_are_tiered(monkeypatch, sample_order):
+    monkeypatch.setenv("AGENT_MODEL_TIERS", "small,large")
+    
+    assert PaymentAgent().tiers.models == ["small", "large"]
+    assert CustomerServiceAgent().tiers.models == ["small", "large"]
+    assert "CONFIDENCE:" in PaymentAgent().build_prompt({"order": sample_order})
+    assert "CONFIDENCE:" in OrderIntakeAgent().build_prompt({"order": sample_order})
+
+
+def test_tier_config_per_agent_overrides_default(monkeypatch):
+    monkeypatch.setenv("AGENT_MODEL_TIERS", "small,large")
+    monkeypatch.setenv("PAYMENT_AGENT_MODEL_TIERS", "large")
+    monkeypatch.setenv("PAYMENT_AGENT_CONFIDENCE_THRESHOLD", "0.9")
+    
+    assert load_tier_config("order_intake").models == ["small", "large"]
+    assert load_tier_config("payment").models == ["large"]
+    assert load_tier_config("payment").confidence_threshold == 0.9
+    assert load_tier_config("order_intake").confidence_threshold == 0.75
+
+
+def make_calls(*behaviours):
+    """Each call to the returned factory sleeps, then returns or raises, per ``behaviours``."""
+    started = []
+    
+    async def call():
+        delay, outcome = behaviours[len(started)]
+        started.append(delay)
+        await asyncio.sleep(delay)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+    
+    return call, started
+
+
+@pytest.mark.asyncio
+async def test_run_hedged_skips_hedge_when_primary_is_fast():
+    call, started = make_calls((0.0, "primary"), (0.0, "hedge"))
+    
+    assert await run_hedged(call, delay=0.05) == ("primary", False)
+    assert len(started) == 1
+
+
+@pytest.mark.asyncio
+async def test_run_hedged_returns_hedge_and_cancels_slow_primary():
+    call, started = make_calls((5.0, "primary"), (0.0, "hedge"))
+    hedges = []
+    
+    result = await asyncio.wait_for(run_hedged(call, delay=0.01, on_hedge=lambda: hedges.append(1)), timeout=1)
+    
+    assert result == ("hedge", True)
+    assert hedges == [1]
+
+
+@pytest.mark.asyncio
+async def test_run_hedged_survives_one_failed_copy():
+    call, _ = make_calls((0.02, RuntimeError("rate limited")), (0.05, "hedge"))
+    
+    assert await run_hedged(call, delay=0.01) == ("hedge", True)
+    
+    call, _ = make_calls((0.02, RuntimeError("first")), (0.0, RuntimeError("second")))
+    with pytest.raises(RuntimeError):
+        await run_hedged(call, delay=0.01)
+
+
+@pytest.mark.asyncio
+async def test_run_hedged_cancelled_before_hedge_cancels_primary():
+    primary = []
+    
+    async def call():
+        primary.append(asyncio.current_task())
+        await asyncio.sleep(5)
+    
+    caller = asyncio.create_task(run_hedged(call, delay=1.0))
+    await asyncio.sleep(0.01)
+    caller.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await caller
+    
+    await asyncio.sleep(0)
+    assert primary[0].cancelled()
+
+
+def test_hedge_policy_waits_for_samples_and_caps_rate():
+    policy = HedgePolicy(enabled=True, percentile=90, min_samples=10, max_rate=0.1, min_delay_ms=0)
+    
+    for latency in range(1, 10):
+        METRICS.observe("agent.run_latency_ms", latency * 100, agent="A", model="default")
+        METRICS.increment("agent.runs", agent="A")
+    assert policy.delay_seconds("A", "default") is None
+    
+    METRICS.observe("agent.run_latency_ms", 1000, agent="A", model="default")
+    METRICS.increment("agent.runs", agent="A")
+    assert policy.delay_seconds("A", "default") == 0.9
+    
+    METRICS.increment("agent.hedges_issued", agent="A")
+    assert policy.delay_seconds("A", "default") is None
+    assert HedgePolicy(enabled=False).delay_seconds("A", "default") is None
+
+
+def test_only_agents_with_idempotent_tools_are_hedged(monkeypatch):
+    monkeypatch.setenv("AGENT_HEDGING", "true")
+    
+    assert OrderIntakeAgent().hedging.enabled
+    assert PaymentAgent().hedging.enabled
+    assert not CustomerServiceAgent().hedging.enabled
+
+
+def test_token_bucket_refills_per_minute():
+    now = [0.0]
+    bucket = TokenBucket(per_minute=60, clock=lambda: now[0])
+    
+    bucket.take(60)
+    assert bucket.seconds_until(3) == 3.0
+    
+    now[0] = 2.0
+    assert bucket.seconds_until(3) == pytest.approx(1.0)
+    now[0] = 120.0
+    assert bucket.seconds_until(1000) == 0.0
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_disabled_without_limits():
+    limiter = ModelRateLimiter()
+    
+    permit = await limiter.acquire(requests=1000, tokens=10**9)
+    
+    assert not limiter.enabled
+    assert permit.waited == 0.0
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_admits_higher_priority_first_and_reports_wait():
+    limiter = ModelRateLimiter(requests_per_minute=1200)
+    await limiter.acquire(requests=1200, tokens=0)
+    order = []
+    
+    async def caller(name, priority):
+        permit = await limiter.acquire(requests=1, tokens=0, priority=priority)
+        order.append(name)
+        return permit
+    
+    customer_service = asyncio.create_task(caller("customer_service", AGENT_PRIORITIES["customer_service"]))
+    await asyncio.sleep(0)
+    payment = asyncio.create_task(caller("payment", AGENT_PRIORITIES["payment"]))
+    permits = await asyncio.wait_for(asyncio.gather(customer_service, payment), timeout=2)
+    
+    assert order == ["payment", "customer_service"]
+    assert all(p.waited > 0 for p in permits)
+    assert METRICS.sample_count("rate_limiter.wait_ms", priority=AGENT_PRIORITIES["customer_service"]) == 1
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_reconcile_refunds_overestimates():
+    limiter = ModelRateLimiter(tokens_per_minute=6000)
+    permit = await limiter.acquire(requests=1, tokens=6000)
+    
+    limiter.reconcile(permit, actual_requests=1, actual_tokens=1000)
+    
+    assert (await asyncio.wait_for(limiter.acquire(requests=1, tokens=4500), timeout=0.5)).waited < 0.1
+
+
+def test_token_bucket_refunds_stop_at_capacity():
+    bucket = TokenBucket(per_minute=60, clock=lambda: 0.0)
+    
+    bucket.take(10)
+    bucket.take(-50)
+    
+    assert bucket.tokens == 60
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_cancelled_head_does_not_stall_queue():
+    limiter = ModelRateLimiter(tokens_per_minute=600)
+    await limiter.acquire(requests=1, tokens=590)
+    
+    big = asyncio.create_task(limiter.acquire(requests=1, tokens=600))
+    await asyncio.sleep(0)
+    small = asyncio.create_task(limiter.acquire(requests=1, tokens=10))
+    await asyncio.sleep(0)
+    big.cancel()
+    
+    permit = await asyncio.wait_for(small, timeout=0.5)
+    assert permit.waited < 0.1
+
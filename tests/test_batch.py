@@ -0,0 +1,50 @@
+import json
+import pytest
+from src.activities.batch_activities import load_order_batch
+from src.models.batch import BatchProgress, BatchReference
+
+
+def test_batch_progress_counts_child_results():
+    progress = BatchProgress()
+    for _ in range(5):
+        progress.record_started()
+    
+    progress.record_result({"status": "completed", "order_id": "ORD-1"})
+    progress.record_result({"status": "escalated", "reason": "suspicious"})
+    progress.record_result({"status": "rejected", "reason": "invalid"})
+    progress.record_result(None)
+    
+    assert progress.started == 5
+    assert progress.completed == 1
+    assert progress.escalated == 1
+    assert progress.rejected == 1
+    assert progress.failed == 1
+    assert progress.in_flight == 1
+    assert progress.finished == 4
+
+
+def test_batch_reference_round_trips_progress():
+    batch = BatchReference(batch_id="BATCH-1", source="orders.jsonl")
+    batch.progress.record_started()
+    
+    restored = BatchReference(**batch.model_copy(update={"cursor": 42}).model_dump())
+    
+    assert restored.cursor == 42
+    assert restored.progress.started == 1
+    assert BatchReference(batch_id="BATCH-2", source="orders.jsonl").progress.started == 0
+
+
+@pytest.mark.asyncio
+async def test_load_order_batch_pages_by_byte_cursor(tmp_path):
+    source = tmp_path / "orders.jsonl"
+    source.write_text("".join(json.dumps({"id": f"ORD-{i}"}) + "\n" for i in range(5)))
+    
+    first = await load_order_batch(str(source), 0, 2)
+    second = await load_order_batch(str(source), first["next_cursor"], 2)
+    third = await load_order_batch(str(source), second["next_cursor"], 2)
+    done = await load_order_batch(str(source), third["next_cursor"], 2)
+    
+    assert [o["id"] for o in first["orders"]] == ["ORD-0", "ORD-1"]
+    assert [o["id"] for o in second["orders"]] == ["ORD-2", "ORD-3"]
+    assert [o["id"] for o in third["orders"]] == ["ORD-4"]
+    assert done["orders"] == []
@@ -0,0 +1,103 @@
+import pytest
+from temporalio.api.enums.v1 import EventType
+from temporalio.api.history.v1 import HistoryEvent
+from benchmarks.e2e import aggregate, make_orders, stub_run, summarize_history
+from benchmarks.micro import compare, make_order_data, run_benchmarks, time_case
+from src.agents.base import BaseEcommerceAgent
+from src.agents.order_intake import OrderIntakeAgent
+from src.models.order import Order
+
+
+def test_time_case_reports_per_call_timings():
+    result = time_case(lambda: sum(range(10)), repeat=2, min_time=0.001)
+    
+    assert result["loops"] >= 1
+    assert 0 < result["ns_per_op_min"] <= result["ns_per_op_median"]
+
+
+def test_run_benchmarks_selects_cases():
+    current = run_benchmarks(select="parse_decision", repeat=1, min_time=0.001)
+    
+    assert set(current["results"]) == {
+        "parse_decision[intake]",
+        "parse_decision[payment]",
+        "parse_decision[fulfillment]",
+        "parse_decision[customer_service]",
+    }
+
+
+def test_compare_flags_regressions_past_threshold():
+    baseline = {"results": {
+        "fast": {"ns_per_op_median": 100.0},
+        "slow": {"ns_per_op_median": 100.0},
+        "removed": {"ns_per_op_median": 100.0},
+    }}
+    current = {"results": {
+        "fast": {"ns_per_op_median": 105.0},
+        "slow": {"ns_per_op_median": 150.0},
+        "added": {"ns_per_op_median": 1.0},
+    }}
+    
+    rows = {row["name"]: row for row in compare(current, baseline, threshold=0.10)}
+    
+    assert set(rows) == {"fast", "slow"}
+    assert not rows["fast"]["regression"]
+    assert rows["slow"]["regression"]
+    assert rows["slow"]["ratio"] == 1.5
+
+
+def test_benchmark_inputs_exercise_agent_prompt_and_parsing():
+    order = Order(**make_order_data(200))
+    agent = OrderIntakeAgent()
+    
+    prompt = agent.build_prompt({"order": order})
+    decision = agent.parse_decision("Everything checks out. APPROVE", {"order": order})
+    
+    assert order.id in prompt
+    assert "Benchmark Product 199" in prompt
+    assert decision.decision == "APPROVE"
+
+
+@pytest.mark.asyncio
+async def test_e2e_stub_agents_follow_demo_scenarios(monkeypatch):
+    monkeypatch.setattr(BaseEcommerceAgent, "_run", stub_run)
+    orders = {item["scenario"]: Order(**item["order"]) for item in make_orders(4)}
+    intake = OrderIntakeAgent()
+    
+    decisions = {
+        scenario: (await intake.process({"order": order})).decision
+        for scenario, order in orders.items()
+    }
+    
+    assert decisions == {
+        "normal": "APPROVE",
+        "suspicious": "ESCALATE",
+        "inventory_issue": "REJECT",
+        "payment_issue": "APPROVE",
+    }
+
+
+def test_e2e_history_summary_and_aggregation():
+    events = [
+        HistoryEvent(event_id=1, event_type=EventType.EVENT_TYPE_WORKFLOW_EXECUTION_STARTED),
+        HistoryEvent(event_id=2, event_type=EventType.EVENT_TYPE_ACTIVITY_TASK_SCHEDULED),
+        HistoryEvent(event_id=3, event_type=EventType.EVENT_TYPE_ACTIVITY_TASK_SCHEDULED),
+        HistoryEvent(event_id=4, event_type=EventType.EVENT_TYPE_MARKER_RECORDED),
+    ]
+    summary = summarize_history(events)
+    
+    assert summary["events"] == 4
+    assert summary["activities"] == 2
+    assert summary["local_activities"] == 1
+    assert summary["bytes"] > 0
+    
+    runs = [
+        {"scenario": "normal", "status": "completed", "latency_ms": 10.0, **summary},
+        {"scenario": "normal", "status": "completed", "latency_ms": 30.0, **summary},
+    ]
+    report = aggregate(runs, elapsed=0.5)
+    
+    assert report["workflows_per_second"] == 4.0
+    assert report["paths"]["normal:completed"]["activities_per_order"] == 2
+    assert report["paths"]["normal:completed"]["local_activities_per_order"] == 1
+    assert report["paths"]["normal:completed"]["latency_ms_p50"] == 20.0
@@ -0,0 +1,89 @@
+import os
+from types import SimpleNamespace
+import pytest
+from src.agents import cassette
+from src.agents.cassette import Cassette, RECORD, REPLAY, run_agent
+
+
+class FakeRunner:
+    def __init__(self, output):
+        self.output = output
+        self.calls = 0
+
+    async def run(self, agent, prompt, run_config=None):
+        self.calls += 1
+        return SimpleNamespace(
+            final_output=f"{self.output} #{self.calls}",
+            new_items=[
+                SimpleNamespace(type="tool_call_item", raw_item=SimpleNamespace(name="validate_customer_email", arguments='{"email": "a@b.co"}')),
+                SimpleNamespace(type="tool_call_output_item", raw_item=None, output="Email a@b.co is valid"),
+                SimpleNamespace(type="message_output_item", raw_item=None),
+            ],
+            context_wrapper=SimpleNamespace(usage=SimpleNamespace(
+                requests=2, input_tokens=120, input_tokens_details=SimpleNamespace(cached_tokens=64),
+                output_tokens=30, total_tokens=150
+            ))
+        )
+
+
+@pytest.fixture
+def use_cassette(monkeypatch, tmp_path):
+    path = tmp_path / "agents.jsonl"
+
+    def use(mode, scale="0"):
+        monkeypatch.setenv("AGENT_CASSETTE_MODE", mode)
+        monkeypatch.setenv("AGENT_CASSETTE_PATH", str(path))
+        monkeypatch.setenv("AGENT_CASSETTE_TIME_SCALE", scale)
+        monkeypatch.setattr(cassette, "_cassette", None)
+        return path
+    return use
+
+
+@pytest.mark.asyncio
+async def test_record_then_replay_exact_prompt(use_cassette):
+    agent = SimpleNamespace(name="Order Intake Agent")
+    use_cassette(RECORD)
+    runner = FakeRunner("APPROVE")
+    await run_agent(agent, "order ORD-1", None, runner, "gpt-4o-mini")
+    await run_agent(agent, "order ORD-2", None, runner, "gpt-4o-mini")
+
+    use_cassette(REPLAY)
+    replayed = await run_agent(agent, "order ORD-2", None, FakeRunner("unused"), "gpt-4o-mini")
+
+    assert replayed.final_output == "APPROVE #2"
+    assert replayed.tool_calls[0] == {"type": "call", "name": "validate_customer_email", "arguments": '{"email": "a@b.co"}'}
+    assert replayed.tool_calls[1]["output"] == "Email a@b.co is valid"
+    assert len(replayed.tool_calls) == 2
+    usage = replayed.context_wrapper.usage
+    assert (usage.requests, usage.total_tokens, usage.input_tokens_details.cached_tokens) == (2, 150, 64)
+
+
+@pytest.mark.asyncio
+async def test_unrecorded_prompts_cycle_through_agent_runs(use_cassette):
+    agent = SimpleNamespace(name="Payment Agent")
+    use_cassette(RECORD)
+    runner = FakeRunner("APPROVE")
+    for i in range(2):
+        await run_agent(agent, f"order {i}", None, runner)
+
+    use_cassette(REPLAY)
+    outputs = [(await run_agent(agent, "order 99", None, None)).final_output for _ in range(3)]
+
+    assert outputs == ["APPROVE #1", "APPROVE #2", "APPROVE #1"]
+    with pytest.raises(LookupError):
+        await run_agent(SimpleNamespace(name="Fulfillment Agent"), "order 1", None, None)
+
+
+def test_index_is_rebuilt_when_cassette_changes(tmp_path):
+    path = tmp_path / "agents.jsonl"
+    path.write_text('{"key": "k1", "agent": "A", "output": "one"}\n')
+    Cassette(str(path))
+    assert os.path.exists(f"{path}.idx")
+
+    with open(path, "a") as f:
+        f.write('{"key": "k2", "agent": "A", "output": "two"}\n')
+    os.utime(f"{path}.idx", (0, 0))
+    reloaded = Cassette(str(path))
+
+    assert reloaded._read(reloaded._by_key["k2"][0])["output"] == "two"
+    assert reloaded._read(reloaded._by_key["k1"][0])["output"] == "one"
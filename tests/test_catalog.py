@@ -0,0 +1,83 @@
+from src.catalog.index import CatalogItem, ProductCatalog, find_alternatives, load_catalog, price_band
+from src.models.order import Address, Customer, Order, Product
+
+
+def make_catalog():
+    return ProductCatalog([
+        CatalogItem(sku="WH-001", name="Wireless Headphones", category="audio", price=99.99),
+        CatalogItem(sku="WH-002", name="Wireless Headphones Pro", category="audio", price=179.99),
+        CatalogItem(sku="WE-001", name="Wireless Earbuds", category="audio", price=79.99),
+        CatalogItem(sku="HP-001", name="Studio Headphones", category="audio", price=89.99, in_stock=False),
+        CatalogItem(sku="MS-001", name="Wireless Mouse", category="computer", price=29.99),
+    ], top_k=2)
+
+
+def make_order(*products):
+    return Order(
+        id="ORD-1",
+        customer=Customer(
+            id="CUST-1",
+            name="Test Customer",
+            email="test@example.com",
+            address=Address(street="1 Main St", city="Town", state="NY", zip_code="10001", country="USA")
+        ),
+        products=list(products),
+        total_amount=sum(p.price * p.quantity for p in products)
+    )
+
+
+def test_price_bands_double_in_width():
+    assert price_band(3) == price_band(3.9) == 1
+    assert price_band(99) == price_band(120) == 6
+
+
+def test_alternatives_are_ranked_and_skip_out_of_stock():
+    catalog = make_catalog()
+    assert [i.sku for i in catalog.alternatives("WH-001")] == ["WH-002", "WE-001"]
+    
+    catalog.set_stock("WH-002", False)
+    assert [i.sku for i in catalog.alternatives("WH-001")] == ["WE-001", "MS-001"]
+
+
+def test_unknown_sku_falls_back_to_name_match():
+    catalog = make_catalog()
+    assert catalog.alternatives("OUT-OF-STOCK", "Wireless Headphones", 99.99)[0].sku == "WH-001"
+    assert catalog.alternatives("OUT-OF-STOCK") == []
+
+
+def test_search_intersects_postings():
+    catalog = make_catalog()
+    assert [i.sku for i in catalog.search("wireless", category="audio", max_price=100)] == ["WE-001", "WH-001"]
+
+
+def test_suggest_for_order_excludes_ordered_products():
+    catalog = make_catalog()
+    order = make_order(
+        Product(id="P1", name="Wireless Headphones", price=99.99, quantity=2, sku="WH-001"),
+        Product(id="P2", name="Wireless Earbuds", price=79.99, quantity=1, sku="WE-001")
+    )
+    suggestions = catalog.suggest_for_order(order)
+    
+    assert [p.sku for p in suggestions] == ["WH-002"]
+    assert suggestions[0].quantity == 2
+
+
+def test_bundled_catalog_tool_answers_in_batch():
+    catalog = load_catalog()
+    assert "WH-001" in catalog.items
+    output = find_alternatives(["SC-002", "UNKNOWN"])
+    assert output.splitlines()[0].startswith("SC-002: ")
+    assert output.splitlines()[1] == "UNKNOWN: no alternatives in stock"
+
+
+def test_rejection_alternatives_only_for_stock_problems(monkeypatch):
+    from src.activities import order_activities
+    catalog = make_catalog()
+    monkeypatch.setattr(order_activities, "get_catalog", lambda: catalog)
+    in_stock = Product(id="P1", name="Wireless Headphones", price=99.99, quantity=1, sku="WH-001")
+    out_of_stock = Product(id="P2", name="Studio Headphones", price=89.99, quantity=1, sku="HP-001")
+    
+    assert order_activities.stock_alternatives(make_order(in_stock), "Invalid customer email") == []
+    assert order_activities.stock_alternatives(make_order(in_stock), "WH-001 is out of stock")
+    suggestions = order_activities.stock_alternatives(make_order(in_stock, out_of_stock), "Suspicious order")
+    assert [p.sku for p in suggestions] == ["WH-002"]
@@ -0,0 +1,105 @@
+from src.escalation.queue import EscalationQueue, EscalationRequest, escalation_priority
+
+
+def make_request(order_id, customer_id="CUST-001", issue_type="payment", amount=100.0, tier="standard"):
+    return EscalationRequest(
+        workflow_id=f"order-processing-{order_id}",
+        order={
+            "id": order_id,
+            "total_amount": amount,
+            "customer": {"id": customer_id, "tier": tier}
+        },
+        issue_type=issue_type,
+        reason=f"{issue_type} failed for {order_id}"
+    )
+
+
+def test_priority_orders_by_issue_tier_and_value():
+    low = make_request("ORD-1", issue_type="order_intake", amount=10.0)
+    high_value = make_request("ORD-2", issue_type="order_intake", amount=5000.0)
+    vip = make_request("ORD-3", issue_type="order_intake", amount=10.0, tier="vip")
+    payment = make_request("ORD-4", issue_type="payment", amount=10.0)
+    
+    assert escalation_priority(high_value) > escalation_priority(low)
+    assert escalation_priority(vip) > escalation_priority(low)
+    assert escalation_priority(payment) > escalation_priority(low)
+
+
+def test_pop_returns_most_urgent_group_first():
+    queue = EscalationQueue()
+    queue.enqueue(make_request("ORD-1", customer_id="A", amount=10.0), now=0.0)
+    queue.enqueue(make_request("ORD-2", customer_id="B", amount=5000.0), now=1.0)
+    queue.enqueue(make_request("ORD-3", customer_id="C", amount=500.0), now=2.0)
+    
+    assert [queue.pop().primary.order["id"] for _ in range(3)] == ["ORD-2", "ORD-3", "ORD-1"]
+    assert queue.pop() is None
+
+
+def test_duplicates_within_window_are_merged():
+    queue = EscalationQueue(dedup_window_seconds=60.0)
+    first = queue.enqueue(make_request("ORD-1", amount=50.0), now=0.0)
+    second = queue.enqueue(make_request("ORD-2", amount=900.0), now=30.0)
+    other_issue = queue.enqueue(make_request("ORD-3", issue_type="fulfillment"), now=31.0)
+    
+    assert second is first
+    assert other_issue is not first
+    assert len(queue) == 2
+    assert queue.merged_count == 1
+    assert first.primary.order["id"] == "ORD-2"
+    assert "ORD-1" in first.combined_reason()
+
+
+def test_merge_raises_priority_of_pending_group():
+    queue = EscalationQueue()
+    queue.enqueue(make_request("ORD-1", customer_id="A", amount=10.0), now=0.0)
+    queue.enqueue(make_request("ORD-2", customer_id="B", amount=100.0), now=0.0)
+    queue.enqueue(make_request("ORD-3", customer_id="A", amount=9000.0), now=1.0)
+    
+    assert queue.pop().key == "A:payment"
+    assert queue.pop().key == "B:payment"
+    assert queue.pop() is None
+
+
+def test_requests_join_in_flight_and_resolved_groups_until_window_expires():
+    queue = EscalationQueue(dedup_window_seconds=60.0)
+    queue.enqueue(make_request("ORD-1"), now=0.0)
+    group = queue.pop()
+    
+    queue.enqueue(make_request("ORD-2"), now=10.0)
+    waiters = queue.complete(group, {"decision": "RESOLVE"})
+    assert [r.order["id"] for r in waiters] == ["ORD-1", "ORD-2"]
+    
+    late = queue.enqueue(make_request("ORD-3"), now=20.0)
+    assert late.status == "done"
+    assert late.result == {"decision": "RESOLVE"}
+    
+    queue.expire(now=61.0)
+    fresh = queue.enqueue(make_request("ORD-4"), now=61.0)
+    assert fresh.status == "pending"
+    assert len(fresh.requests) == 1
+
+
+def test_request_after_window_joins_group_that_is_still_pending():
+    queue = EscalationQueue(dedup_window_seconds=300.0)
+    queue.enqueue(make_request("ORD-A"), now=0.0)
+    queue.enqueue(make_request("ORD-B"), now=400.0)
+    
+    group = queue.pop()
+    assert [r.order["id"] for r in group.requests] == ["ORD-A", "ORD-B"]
+    assert queue.pop() is None
+    
+    queue.enqueue(make_request("ORD-C"), now=800.0)
+    assert [r.order["id"] for r in queue.complete(group, {"decision": "RESOLVE"})] == ["ORD-A", "ORD-B", "ORD-C"]
+
+
+def test_state_round_trip_keeps_pending_and_resolved_groups():
+    queue = EscalationQueue(dedup_window_seconds=60.0)
+    queue.enqueue(make_request("ORD-1", customer_id="A"), now=0.0)
+    queue.complete(queue.pop(), {"decision": "RESOLVE"})
+    queue.enqueue(make_request("ORD-2", customer_id="B"), now=1.0)
+    
+    restored = EscalationQueue.from_state(queue.to_state())
+    
+    assert len(restored) == 1
+    assert restored.enqueue(make_request("ORD-3", customer_id="A"), now=2.0).status == "done"
+    assert restored.pop().key == "B:payment"
@@ -0,0 +1,62 @@
+import json
+from temporalio.api.common.v1 import Payload
+from temporalio.api.enums.v1 import EventType
+from temporalio.api.history.v1 import HistoryEvent
+from src.utils.history_size import aggregate, analyze_history
+
+
+def payload(value):
+    return Payload(metadata={"encoding": b"json/plain"}, data=json.dumps(value).encode())
+
+
+def history(status, reasoning):
+    order = {"id": "ORD-1", "products": [{"sku": "A", "name": "Widget"}], "customer": {"name": "Jo"}}
+    events = [HistoryEvent(event_id=1, event_type=EventType.EVENT_TYPE_WORKFLOW_EXECUTION_STARTED)]
+    events[0].workflow_execution_started_event_attributes.input.payloads.append(payload(order))
+
+    scheduled = HistoryEvent(event_id=2, event_type=EventType.EVENT_TYPE_ACTIVITY_TASK_SCHEDULED)
+    scheduled.activity_task_scheduled_event_attributes.activity_type.name = "process_payment"
+    scheduled.activity_task_scheduled_event_attributes.input.payloads.append(payload(order))
+    completed = HistoryEvent(event_id=3, event_type=EventType.EVENT_TYPE_ACTIVITY_TASK_COMPLETED)
+    completed.activity_task_completed_event_attributes.scheduled_event_id = 2
+    completed.activity_task_completed_event_attributes.result.payloads.append(payload({"reasoning": reasoning}))
+
+    closed = HistoryEvent(event_id=4, event_type=EventType.EVENT_TYPE_WORKFLOW_EXECUTION_COMPLETED)
+    closed.workflow_execution_completed_event_attributes.result.payloads.append(payload({"status": status}))
+    return events + [scheduled, completed, closed]
+
+
+def test_analyze_history_groups_events_by_activity_and_path():
+    report = analyze_history(history("escalated", "x" * 500))
+
+    assert report["path"] == "escalated"
+    assert report["events"] == 4
+    assert report["by_activity"]["process_payment"]["events"] == 2
+    assert report["by_activity"]["workflow"]["events"] == 2
+    assert report["fields"]["process_payment.result.reasoning"] == 502
+    assert "process_payment.input.products" in report["fields"]
+
+
+def test_aggregate_ranks_paths_and_leaf_fields():
+    report = aggregate([
+        analyze_history(history("completed", "ok")),
+        analyze_history(history("escalated", "x" * 5000)),
+    ], top=3)
+
+    assert list(report["paths"]) == ["escalated", "completed"]
+    assert report["largest_fields"][0] == {"field": "process_payment.result.reasoning", "bytes": 5006, "histories": 2}
+    assert all(not f["field"].endswith(".result") for f in report["largest_fields"])
+
+
+def test_local_activity_markers_are_attributed_to_their_activity():
+    events = history("completed", "ok")
+    marker = HistoryEvent(event_id=5, event_type=EventType.EVENT_TYPE_MARKER_RECORDED)
+    attrs = marker.marker_recorded_event_attributes
+    attrs.marker_name = "core_local_activity"
+    attrs.details["data"].payloads.append(payload({"seq": 1, "activity_type": "update_order_status"}))
+    attrs.details["result"].payloads.append(payload({"id": "ORD-1", "status": "validated"}))
+
+    report = analyze_history(events[:-1] + [marker, events[-1]])
+
+    assert report["by_activity"]["update_order_status"]["events"] == 1
+    assert report["fields"]["update_order_status.result.status"] == len('"validated"')
@@ -0,0 +1,57 @@
+import httpx
+import pytest
+from src.agents import http_client
+from src.utils.metrics import METRICS
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    METRICS.reset()
+    yield
+    METRICS.reset()
+
+
+@pytest.mark.asyncio
+async def test_shared_client_is_reused_until_closed(monkeypatch):
+    monkeypatch.setenv("MODEL_HTTP_MAX_CONNECTIONS", "7")
+    client = http_client.open_shared_http_client()
+    try:
+        assert http_client.open_shared_http_client() is client
+    finally:
+        await http_client.close_shared_http_client()
+    
+    assert client.is_closed
+    assert http_client._shared_client is None
+
+
+def test_install_is_noop_without_shared_client():
+    http_client.install_openai_client()
+    assert not http_client._openai_client_installed
+
+
+@pytest.mark.asyncio
+async def test_install_is_skipped_without_api_key(monkeypatch, caplog):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    http_client.open_shared_http_client()
+    try:
+        http_client.install_openai_client()
+        assert not http_client._openai_client_installed
+        assert "Not installing the shared model HTTP client" in caplog.text
+    finally:
+        await http_client.close_shared_http_client()
+
+
+@pytest.mark.asyncio
+async def test_trace_counts_new_connections():
+    for _ in range(4):
+        await http_client._on_request(httpx.Request("POST", "https://api.example.com/v1/responses"))
+    await http_client._trace("connection.connect_tcp.complete", {})
+    await http_client._trace("connection.start_tls.complete", {})
+    await http_client._trace("http11.send_request_headers.complete", {})
+    
+    stats = http_client.connection_stats()
+    assert stats["requests"] == 4
+    assert stats["new_connections"] == 1
+    assert stats["tls_handshakes"] == 1
+    assert stats["reused"] == 3
+    assert stats["reuse_ratio"] == 0.75
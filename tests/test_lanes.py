@@ -0,0 +1,55 @@
+import dataclasses
+import pytest
+from temporalio.common import Priority
+from temporalio.testing import ActivityEnvironment
+from benchmarks.e2e import aggregate
+from src.utils.lanes import LanePolicy, current_lane, parse_weights
+
+
+def make_order(total, tier="standard", priority=None):
+    return {"id": "ORD-1", "total_amount": total, "priority": priority, "customer": {"id": "CUST-1", "tier": tier}}
+
+
+def test_orders_are_classified_by_flag_tier_and_total():
+    policy = LanePolicy(enabled=True, high_min_total=1000.0, bulk_max_total=25.0)
+
+    assert policy.classify(make_order(5000.0)) == "high"
+    assert policy.classify(make_order(10.0, tier="vip")) == "high"
+    assert policy.classify(make_order(10.0)) == "bulk"
+    assert policy.classify(make_order(200.0)) == "normal"
+    assert policy.classify(make_order(5000.0, priority="bulk")) == "bulk"
+
+
+def test_lane_becomes_the_workflow_fairness_key():
+    policy = LanePolicy(enabled=True, weights={"high": 6, "normal": 3, "bulk": 1})
+
+    assert policy.priority(make_order(5000.0)) == Priority(fairness_key="high", fairness_weight=6.0)
+    assert policy.priority(make_order(10.0)) == Priority(fairness_key="bulk", fairness_weight=1.0)
+    assert LanePolicy().priority(make_order(5000.0)) == Priority.default
+
+
+def test_activities_see_the_lane_inherited_from_their_workflow():
+    env = ActivityEnvironment()
+    env.info = dataclasses.replace(env.info, priority=Priority(fairness_key="high", fairness_weight=6.0))
+
+    assert env.run(current_lane) == "high"
+    assert current_lane() is None
+
+
+def test_parse_weights():
+    assert parse_weights("high:8,bulk:2") == {"high": 8, "normal": 1, "bulk": 2}
+    with pytest.raises(ValueError):
+        parse_weights("urgent:5")
+
+
+def test_benchmark_reports_latency_per_lane():
+    summary = {"events": 10, "bytes": 100, "activities": 4}
+    runs = [
+        {"scenario": "normal", "status": "completed", "latency_ms": 10.0, "lane": "high", **summary},
+        {"scenario": "normal", "status": "completed", "latency_ms": 90.0, "lane": "bulk", **summary},
+        {"scenario": "normal", "status": "completed", "latency_ms": 30.0, "lane": "high", **summary},
+    ]
+    report = aggregate(runs, elapsed=1.0)
+
+    assert report["lanes"]["high"] == {"orders": 2, "latency_ms_p50": 20.0, "latency_ms_p95": 30.0}
+    assert report["lanes"]["bulk"]["orders"] == 1
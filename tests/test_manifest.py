@@ -0,0 +1,111 @@
+import pytest
+from src.activities.shipping_activities import submit_manifest
+from src.shipping.carriers import LocalCarrier, TrackingNumberPool, register_carrier
+from src.shipping.manifest import Manifest, ManifestBuilder, ShipmentRequest, destination_zone
+from src.utils.metrics import METRICS
+
+
+def make_request(order_id, zone="USA-1", carrier="local"):
+    return ShipmentRequest(
+        workflow_id=f"order-processing-{order_id}",
+        order_id=order_id,
+        carrier=carrier,
+        zone=zone,
+        weight_lbs=1.5
+    )
+
+
+def test_destination_zone_uses_country_and_postal_prefix():
+    assert destination_zone({"country": "USA", "zip_code": "10001"}) == "USA-1"
+    assert destination_zone({"country": "USA", "zip_code": ""}) == "USA-0"
+
+
+def test_manifest_closes_when_full():
+    builder = ManifestBuilder(max_shipments=2, window_seconds=30.0)
+
+    assert builder.add(make_request("ORD-1"), now=0.0) is None
+    assert builder.add(make_request("ORD-2", zone="USA-9"), now=1.0) is None
+    full = builder.add(make_request("ORD-3"), now=2.0)
+
+    assert [s.order_id for s in full.shipments] == ["ORD-1", "ORD-3"]
+    assert len(builder) == 1
+
+
+def test_manifests_close_when_window_passes():
+    builder = ManifestBuilder(max_shipments=10, window_seconds=30.0)
+    builder.add(make_request("ORD-1"), now=0.0)
+    builder.add(make_request("ORD-2", zone="USA-9"), now=20.0)
+
+    assert builder.next_deadline() == 30.0
+    assert builder.due(now=29.0) == []
+    assert [m.zone for m in builder.due(now=30.0)] == ["USA-1"]
+    assert builder.next_deadline() == 50.0
+
+
+def test_order_added_twice_stays_on_one_manifest_until_released():
+    builder = ManifestBuilder(max_shipments=2, window_seconds=30.0)
+
+    builder.add(make_request("ORD-1"), now=0.0)
+    assert builder.add(make_request("ORD-1"), now=1.0) is None
+    assert len(builder) == 1
+    manifest = builder.add(make_request("ORD-2"), now=2.0)
+
+    restored = ManifestBuilder.from_state(builder.to_state())
+    assert restored.add(make_request("ORD-1"), now=5.0) is None
+    assert len(restored) == 0
+
+    restored.release(manifest)
+    restored.add(make_request("ORD-1"), now=6.0)
+    assert len(restored) == 1
+    assert restored.to_state()["members"] == {"ORD-1": "MAN-local-USA-1-1"}
+
+
+def test_builder_state_round_trips():
+    builder = ManifestBuilder(max_shipments=5, window_seconds=10.0)
+    builder.add(make_request("ORD-1"), now=3.0)
+    restored = ManifestBuilder.from_state(builder.to_state())
+
+    assert len(restored) == 1
+    assert restored.next_deadline() == 13.0
+    restored.add(make_request("ORD-2", zone="USA-2"), now=4.0)
+    assert len({m.manifest_id for m in restored.due(now=100.0)}) == 2
+
+
+@pytest.mark.asyncio
+async def test_tracking_numbers_are_reserved_in_blocks():
+    METRICS.reset()
+    carrier = LocalCarrier()
+    pool = TrackingNumberPool(carrier, block_size=10)
+
+    first = await pool.take(4)
+    second = await pool.take(4)
+    third = await pool.take(4)
+
+    numbers = first + second + third
+    assert len(set(numbers)) == 12
+    assert all(n.startswith("TRK") and len(n) == 13 for n in numbers)
+    assert METRICS.counter("carrier.requests", carrier="local", call="reserve") == 2
+    assert len(pool) == 8
+
+
+@pytest.mark.asyncio
+async def test_retried_manifest_returns_the_numbers_the_carrier_recorded():
+    register_carrier("retry-test", LocalCarrier)
+    builder = ManifestBuilder(max_shipments=2)
+    builder.add(make_request("ORD-1", carrier="retry-test"), now=0.0)
+    manifest = builder.add(make_request("ORD-2", carrier="retry-test"), now=1.0)
+
+    first = await submit_manifest(manifest.model_dump())
+    retry = await submit_manifest(manifest.model_dump())
+
+    assert retry["tracking_numbers"] == first["tracking_numbers"]
+    assert retry["confirmation"] == first["confirmation"]
+
+
+@pytest.mark.asyncio
+async def test_local_carrier_keeps_only_recent_manifests():
+    carrier = LocalCarrier(max_manifests=2)
+    for i in range(3):
+        await carrier.submit_manifest(Manifest(manifest_id=f"MAN-{i}", carrier="local", zone="USA-1", opened_at=0.0), {})
+
+    assert list(carrier.manifests) == ["MAN-1", "MAN-2"]
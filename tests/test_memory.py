@@ -0,0 +1,105 @@
+import asyncio
+import tracemalloc
+from types import SimpleNamespace
+import pytest
+from src.utils.memory import AdmissionGate, MemoryMonitor, SnapshotDiffer, cached_workflow_count, rss_bytes
+from src.utils.metrics import METRICS
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    METRICS.reset()
+    yield
+    METRICS.reset()
+
+
+class FakeWorker:
+    def __init__(self, cached):
+        self._workflow_worker = SimpleNamespace(_running_workflows={i: None for i in range(cached)})
+        self.shut_down = False
+
+    async def shutdown(self):
+        self.shut_down = True
+
+
+def test_rss_and_cache_size_are_reported():
+    assert rss_bytes() > 0
+    assert cached_workflow_count(FakeWorker(3)) == 3
+    assert cached_workflow_count(object()) is None
+
+
+@pytest.mark.asyncio
+async def test_gate_limits_reserved_slots():
+    gate = AdmissionGate(2)
+    peak = 0
+
+    async def run():
+        nonlocal peak
+        await gate.reserve_slot()
+        peak = max(peak, gate.active)
+        await asyncio.sleep(0.01)
+        gate.release_slot()
+
+    await asyncio.gather(*(run() for _ in range(6)))
+    assert peak == 2 and gate.active == 0
+    
+    await gate.set_limit(1)
+    assert gate.try_reserve_slot() is not None
+    assert gate.try_reserve_slot() is None
+
+
+@pytest.mark.asyncio
+async def test_budget_lowers_concurrency_then_evicts_then_restores_both():
+    rss = [900]
+    gate = AdmissionGate(8)
+    monitor = MemoryMonitor(
+        soft_limit_bytes=1000,
+        min_concurrency=2,
+        max_cached_workflows=100,
+        min_cached_workflows=50,
+        gate=gate,
+        rss=lambda: rss[0]
+    )
+    worker = FakeWorker(10)
+
+    await monitor.check(worker)
+    assert gate.limit == 8 and not monitor.restart_requested
+
+    rss[0] = 1200
+    await monitor.check(worker)
+    await monitor.check(worker)
+    assert gate.limit == 2
+    await monitor.check(worker)
+    assert monitor.restart_requested and monitor.max_cached_workflows == 50
+
+    monitor.restart_requested = False
+    rss[0] = 500
+    await monitor.check(worker)
+    assert gate.limit == 4
+    await monitor.check(worker)
+    assert gate.limit == 8 and not monitor.restart_requested
+    await monitor.check(worker)
+    assert monitor.restart_requested and monitor.max_cached_workflows == 100
+    assert METRICS.counter("worker.memory_over_budget") == 3
+    assert METRICS.percentile("worker.cached_workflows", 50) == 10
+
+
+@pytest.mark.asyncio
+async def test_monitor_run_shuts_worker_down_for_eviction():
+    monitor = MemoryMonitor(interval_seconds=0, soft_limit_bytes=1, min_concurrency=1, gate=AdmissionGate(1), rss=lambda: 2)
+    worker = FakeWorker(1)
+    await asyncio.wait_for(monitor.run(worker), timeout=1)
+    assert worker.shut_down
+
+
+def test_snapshot_diff_groups_by_module():
+    differ = SnapshotDiffer(top=50)
+    try:
+        assert differ.take() == []
+        retained = [bytearray(1024) for _ in range(200)]
+        rows = differ.take()
+        assert any(module.endswith("test_memory") and diff > 100 * 1024 for module, diff, _ in rows)
+        assert not any(module == "tracemalloc" for module, _, _ in rows)
+        del retained
+    finally:
+        tracemalloc.stop()
@@ -0,0 +1,74 @@
+import asyncio
+from datetime import datetime, timezone
+import pytest
+from temporalio.service import RPCError, RPCStatusCode
+from src.models.order import OrderStage, OrderState
+from src.order_states import query_order_states
+from src.workflows.order_state_board import OrderStateBoardWorkflow
+
+
+def state(order_id, stage):
+    now = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return OrderState(
+        order_id=order_id,
+        stage=stage,
+        started_at=now,
+        stage_started_at=now,
+        updated_at=now
+    ).model_dump(mode="json")
+
+
+def test_order_state_serializes_compactly():
+    data = state("ORD-1", OrderStage.PAYMENT)
+    assert data["stage"] == "payment"
+    assert data["payment_status"] == "pending"
+    assert data["started_at"] == "2024-01-01T00:00:00Z"
+
+
+def test_board_keeps_latest_state_and_drops_oldest_finished():
+    board = OrderStateBoardWorkflow()
+    board._max_finished = 2
+    for order_id in ("A", "B", "C"):
+        board.order_state_updated(state(order_id, OrderStage.PAYMENT))
+    board.order_state_updated(state("A", OrderStage.COMPLETED))
+    board.order_state_updated(state("B", OrderStage.REJECTED))
+    board.order_state_updated(state("C", OrderStage.ESCALATED))
+    board.order_state_updated(state("D", OrderStage.INTAKE))
+
+    assert [s["order_id"] for s in board.get_states()] == ["B", "C", "D"]
+    assert board.get_summary() == {"rejected": 1, "escalated": 1, "intake": 1}
+    assert [s["order_id"] for s in board.get_states("intake")] == ["D"]
+
+
+class FakeHandle:
+    def __init__(self, client, workflow_id):
+        self.client = client
+        self.workflow_id = workflow_id
+
+    async def query(self, query):
+        self.client.in_flight += 1
+        self.client.peak = max(self.client.peak, self.client.in_flight)
+        await asyncio.sleep(0.01)
+        self.client.in_flight -= 1
+        if self.workflow_id.endswith("missing"):
+            raise RPCError("not found", RPCStatusCode.NOT_FOUND, b"")
+        return {"order_id": self.workflow_id}
+
+
+class FakeClient:
+    def __init__(self):
+        self.in_flight = 0
+        self.peak = 0
+
+    def get_workflow_handle(self, workflow_id):
+        return FakeHandle(self, workflow_id)
+
+
+@pytest.mark.asyncio
+async def test_query_order_states_bounds_parallelism():
+    client = FakeClient()
+    states = await query_order_states(client, [f"ORD-{i}" for i in range(10)] + ["missing"], concurrency=3)
+
+    assert client.peak == 3
+    assert states["ORD-4"] == {"order_id": "order-processing-ORD-4"}
+    assert states["missing"] is None
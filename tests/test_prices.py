@@ -0,0 +1,92 @@
+import shutil
+import pytest
+from decimal import Decimal
+from src.catalog import prices as prices_module
+from src.catalog.prices import PriceFile, build_price_file, get_price_file, verify_order_total
+from src.demo import create_sample_order, create_suspicious_order
+
+
+@pytest.fixture
+def price_path(tmp_path):
+    csv_path = tmp_path / "prices.csv"
+    csv_path.write_text("sku,price\nWH-001,99.99\nSC-002,19.99\nA,1\nZZ-LONGER-SKU,1234567.50\n")
+    out_path = str(tmp_path / "prices.bin")
+    assert build_price_file(str(csv_path), out_path) == 4
+    return out_path
+
+
+def test_lookup_finds_every_sku_and_misses_cleanly(price_path):
+    with PriceFile(price_path) as prices:
+        assert len(prices) == 4
+        assert prices.price("WH-001") == Decimal("99.99")
+        assert prices.price("A") == Decimal("1.00")
+        assert prices.price("ZZ-LONGER-SKU") == Decimal("1234567.50")
+        assert prices.price("B") is None
+        assert prices.price("WH-0011") is None
+        assert prices.price("X" * 100) is None
+
+
+def test_build_rejects_bad_rows(tmp_path):
+    csv_path = tmp_path / "prices.csv"
+    csv_path.write_text("sku,price\nWH-001,99.999\n")
+    with pytest.raises(ValueError, match="decimal places"):
+        build_price_file(str(csv_path), str(tmp_path / "prices.bin"))
+    
+    csv_path.write_text("sku,price\nWH-001,1\nWH-001,2\n")
+    with pytest.raises(ValueError, match="duplicate"):
+        build_price_file(str(csv_path), str(tmp_path / "prices.bin"))
+
+
+def test_build_rejects_missing_columns(tmp_path):
+    csv_path = tmp_path / "prices.csv"
+    csv_path.write_text("product,price\nWH-001,99.99\n")
+    with pytest.raises(ValueError, match="missing column sku"):
+        build_price_file(str(csv_path), str(tmp_path / "prices.bin"))
+    
+    csv_path.write_text("")
+    with pytest.raises(ValueError, match="missing column sku, price"):
+        build_price_file(str(csv_path), str(tmp_path / "prices.bin"))
+
+
+def test_verify_order_total_uses_exact_decimal(price_path):
+    with PriceFile(price_path) as prices:
+        # 99.99 * 2 + 19.99 is 219.97000000000003 as a float.
+        check = verify_order_total(create_sample_order(), prices)
+        assert check.ok
+        assert check.catalog_total == "219.97"
+        
+        check = verify_order_total(create_suspicious_order(), prices)
+        assert check.mismatches == ["order total 5000.00 but catalog prices add up to 10018.99"]
+        
+        order = create_sample_order()
+        order.products[0].price = 89.99
+        order.products[1].sku = "UNKNOWN"
+        assert verify_order_total(order, prices).mismatches == [
+            "WH-001: unit price 89.99 but catalog price is 99.99",
+            "UNKNOWN: not in price catalog",
+        ]
+
+
+def test_price_file_is_optional(monkeypatch, price_path):
+    monkeypatch.setattr(prices_module, "_price_file", None)
+    monkeypatch.delenv("PRICE_FILE_PATH", raising=False)
+    assert get_price_file() is None
+    
+    monkeypatch.setenv("PRICE_FILE_PATH", price_path)
+    assert get_price_file().price("SC-002") == Decimal("19.99")
+    get_price_file().close()
+
+
+def test_changing_price_file_path_closes_the_old_file(monkeypatch, price_path, tmp_path):
+    monkeypatch.setattr(prices_module, "_price_file", None)
+    other_path = str(tmp_path / "other.bin")
+    shutil.copy(price_path, other_path)
+    
+    monkeypatch.setenv("PRICE_FILE_PATH", price_path)
+    first = get_price_file()
+    monkeypatch.setenv("PRICE_FILE_PATH", other_path)
+    second = get_price_file()
+    
+    assert second is not first
+    assert first._file.closed
+    second.close()
@@ -0,0 +1,58 @@
+import asyncio
+import logging
+import pytest
+from src.utils import profiling
+from src.utils.profiling import ProfilingSwitch, profiled
+
+
+@pytest.fixture
+def switch(monkeypatch, tmp_path):
+    now = [0.0]
+    switch = ProfilingSwitch(output_dir=str(tmp_path), window_seconds=10, max_calls=2, top=3, clock=lambda: now[0])
+    switch.now = now
+    monkeypatch.setattr(profiling, "PROFILER", switch)
+    return switch
+
+
+@profiled("busy")
+async def busy(n):
+    await asyncio.sleep(0)
+    return sum(i * i for i in range(n))
+
+
+@pytest.mark.asyncio
+async def test_disabled_switch_writes_nothing(switch, tmp_path):
+    assert await busy(10) == 285
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_enabled_switch_profiles_bounded_number_of_calls(switch, tmp_path, caplog):
+    switch.enable()
+    with caplog.at_level(logging.INFO, logger="src.utils.profiling"):
+        for _ in range(3):
+            await busy(1000)
+    
+    assert len(list(tmp_path.glob("busy-*.prof"))) == 2
+    assert not switch.enabled
+    assert any("Profiled busy" in r.message and "ms self" in r.message for r in caplog.records)
+
+
+@pytest.mark.asyncio
+async def test_window_expires_and_overlapping_calls_are_skipped(switch, tmp_path):
+    switch.max_calls = 10
+    switch.enable()
+    await asyncio.gather(busy(100), busy(100))
+    assert len(list(tmp_path.glob("*.prof"))) == 1
+    
+    switch.now[0] = 11
+    await busy(100)
+    assert len(list(tmp_path.glob("*.prof"))) == 1
+    assert not switch.enabled
+
+
+def test_toggle(switch):
+    switch.toggle()
+    assert switch.enabled and switch.remaining == 2
+    switch.toggle()
+    assert not switch.enabled
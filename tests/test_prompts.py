@@ -0,0 +1,64 @@
+import weakref
+from types import SimpleNamespace
+import pytest
+from src.agents.customer_service import CustomerServiceAgent
+from src.agents.fulfillment import FulfillmentAgent
+from src.agents.order_intake import OrderIntakeAgent
+from src.agents.payment import PaymentAgent
+from src.agents.prompts import DATA_HEADER, PromptTemplate, cached_token_ratio, canonical_json, record_input_tokens
+from src.demo import create_sample_order, create_suspicious_order
+from src.utils.metrics import METRICS
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    METRICS.reset()
+    yield
+    METRICS.reset()
+
+
+def static_part(prompt):
+    return prompt[:prompt.index(DATA_HEADER)]
+
+
+@pytest.mark.parametrize("agent_class", [OrderIntakeAgent, PaymentAgent, FulfillmentAgent, CustomerServiceAgent])
+def test_order_data_only_changes_the_tail(agent_class):
+    agent = agent_class()
+    first = agent.build_prompt({"order": create_sample_order(), "issue_type": "payment"})
+    second = agent.build_prompt({"order": create_suspicious_order(), "issue_type": "fulfillment", "retry_count": 2})
+    
+    assert first != second
+    assert static_part(first) == static_part(second)
+    assert METRICS.sample_count("agent.prompt_chars", agent=agent.name) == 2
+
+
+def test_canonical_json_is_compact_and_ordered():
+    assert canonical_json({"b": 1, "a": {"d": [1, 2], "c": "é"}}) == '{"a":{"c":"é","d":[1,2]},"b":1}'
+
+
+def test_streaming_instruction_joins_the_static_prefix(monkeypatch):
+    monkeypatch.setenv("AGENT_STREAMING", "true")
+    agent = OrderIntakeAgent()
+    prompt = agent.build_prompt({"order": create_sample_order()})
+    
+    assert "DECISION: <APPROVE|REJECT|ESCALATE>" in static_part(prompt)
+    template = PromptTemplate("Task", choices=["A", "B", "C"])
+    assert template.extend("More") is template.extend("More")
+    assert PromptTemplate("Task", choices=["A", "B", "C"]).extend("More") is template.extend("More")
+    
+    base = PromptTemplate("Other task")
+    base.extend("More")
+    ref = weakref.ref(base)
+    del base
+    assert ref() is None
+    assert template.prefix == "Task\n\nProvide your decision: A, B, or C"
+
+
+def test_cached_token_ratio_per_agent():
+    for cached in (0, 600):
+        usage = SimpleNamespace(input_tokens=1000, input_tokens_details=SimpleNamespace(cached_tokens=cached))
+        record_input_tokens("Payment Agent", usage)
+    record_input_tokens("Payment Agent", SimpleNamespace(input_tokens=1000))
+    
+    assert cached_token_ratio("Payment Agent") == 0.2
+    assert cached_token_ratio("Fulfillment Agent") == 0.0
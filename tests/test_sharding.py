@@ -0,0 +1,81 @@
+from collections import Counter
+import pytest
+from src.agents import tool_memo
+from src.agents.tool_memo import ToolMemo, memo_scope, memoized_per_customer
+from src.utils import sharding
+from src.utils.metrics import METRICS
+from src.utils.sharding import HashRing, base_task_queue, memo_hit_rate, order_task_queue, parse_shards, shard_of_task_queue
+
+CUSTOMERS = [f"CUST-{i:05d}" for i in range(5000)]
+
+
+@pytest.fixture(autouse=True)
+def fresh_metrics(monkeypatch):
+    monkeypatch.setattr(tool_memo, "_memo", ToolMemo())
+    METRICS.reset()
+    yield
+    METRICS.reset()
+
+
+def test_ring_spreads_customers_evenly():
+    ring = HashRing(range(8), virtual_nodes=128)
+    load = Counter(ring.shard_for(c) for c in CUSTOMERS)
+
+    assert set(load) == set(range(8))
+    assert max(load.values()) < 1.3 * len(CUSTOMERS) / 8
+
+
+def test_adding_a_shard_only_moves_customers_to_it():
+    ring = HashRing(range(4))
+    before = {c: ring.shard_for(c) for c in CUSTOMERS}
+    ring.add(4)
+    moved = {c: ring.shard_for(c) for c in CUSTOMERS if ring.shard_for(c) != before[c]}
+
+    assert set(moved.values()) == {4}
+    assert 0.1 < len(moved) / len(CUSTOMERS) < 0.3
+
+    ring.remove(4)
+    assert all(ring.shard_for(c) == before[c] for c in CUSTOMERS)
+
+
+def test_order_task_queue_routing():
+    assert order_task_queue("orders", "CUST-1", 0) == "orders"
+    queue = order_task_queue("orders", "CUST-1", 4)
+
+    assert queue == order_task_queue("orders", "CUST-1", 4)
+    assert shard_of_task_queue(queue) in range(4)
+    assert shard_of_task_queue("orders") is None
+    assert base_task_queue(queue) == "orders"
+    assert base_task_queue("orders") == "orders"
+
+
+def test_parse_shards():
+    assert parse_shards("all", 3) == [0, 1, 2]
+    assert parse_shards("0,2-4", 6) == [0, 2, 3, 4]
+    assert parse_shards("all", 0) == []
+    with pytest.raises(ValueError):
+        parse_shards("5", 4)
+
+
+def test_per_customer_memo_is_shared_by_orders_and_counted_per_shard():
+    calls = []
+
+    @memoized_per_customer
+    def validate_email(email: str) -> str:
+        calls.append(email)
+        return f"{email} is valid"
+
+    token = sharding._current_shard.set(2)
+    try:
+        with memo_scope("ORD-1", "CUST-1"):
+            validate_email("a@b.co")
+        with memo_scope("ORD-2", "CUST-1"):
+            validate_email("a@b.co")
+        with memo_scope("ORD-3", "CUST-2"):
+            validate_email("a@b.co")
+    finally:
+        sharding._current_shard.reset(token)
+
+    assert len(calls) == 2
+    assert METRICS.counter("shard.memo_lookups", shard=2) == 3
+    assert memo_hit_rate(2) == pytest.approx(1 / 3)
@@ -0,0 +1,54 @@
+import pytest
+from src.activities.order_activities import quote_fulfillment
+from src.agents.fulfillment import FulfillmentAgent
+from src.models.order import Order, Customer, Address, Product
+
+
+def make_order(street="123 Main Street"):
+    return Order(
+        id="ORD-QUOTE",
+        customer=Customer(
+            id="CUST-001",
+            name="Test Customer",
+            email="customer@example.com",
+            address=Address(street=street, city="New York", state="NY", zip_code="10001", country="USA")
+        ),
+        products=[Product(id="PROD-001", name="Headphones", price=99.99, quantity=12, sku="WH-001")],
+        total_amount=1199.88
+    )
+
+
+@pytest.mark.asyncio
+async def test_quote_fulfillment_prices_shipment_without_model():
+    quote = await quote_fulfillment(make_order().to_dict())
+    
+    assert quote["available"] is True
+    assert quote["shipping_method"] == "standard"
+    assert quote["shipping_cost"] == "Shipping cost: $15.00"
+    assert quote["estimated_delivery"].startswith("Estimated delivery:")
+    assert quote["elapsed_ms"] >= 0
+
+
+@pytest.mark.asyncio
+async def test_unavailable_quote_escalates_without_model():
+    order = make_order(street="1 Remote_Island Road")
+    quote = await quote_fulfillment(order.to_dict())
+    
+    decision = await FulfillmentAgent().process({"order": order, "quote": quote})
+    
+    assert quote["available"] is False
+    assert decision.decision == "ESCALATE"
+    assert decision.requires_human_intervention
+
+
+@pytest.mark.asyncio
+async def test_committed_quote_is_included_in_prompt():
+    order = make_order()
+    quote = await quote_fulfillment(order.to_dict())
+    agent = FulfillmentAgent()
+    
+    prompt = agent.build_prompt({"order": order, "quote": quote})
+    
+    assert quote["shipping_cost"] in prompt
+    assert "Check shipping availability" not in prompt
+    assert agent.parse_decision("Tracking TRK123. SHIP", {"order": order, "quote": quote}).decision == "SHIP"
@@ -0,0 +1,56 @@
+import os
+import subprocess
+import sys
+from src.utils.import_profile import measure_imports, parse_importtime, summarize
+
+WORKER_IMPORT_BUDGET_MS = float(os.getenv("WORKER_IMPORT_BUDGET_MS", "1500"))
+
+
+def test_worker_import_defers_agents_sdk():
+    proc = subprocess.run(
+        [sys.executable, "-c", "import sys, src.worker; print('agents' in sys.modules, 'openai' in sys.modules)"],
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    
+    assert proc.stdout.split() == ["False", "False"]
+
+
+def test_worker_import_within_startup_budget():
+    report = summarize(measure_imports(["src.worker"]))
+    
+    assert report["total_us"] / 1000 < WORKER_IMPORT_BUDGET_MS, report["top_cumulative"][:5]
+
+
+def test_agent_class_loads_on_first_use():
+    proc = subprocess.run(
+        [
+            sys.executable, "-c",
+            "import sys; from src.agents.registry import load_agent_class; "
+            "before = 'agents' in sys.modules; cls = load_agent_class('payment'); "
+            "print(before, 'agents' in sys.modules, cls.__name__)"
+        ],
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    
+    assert proc.stdout.split() == ["False", "True", "PaymentAgent"]
+
+
+def test_parse_importtime_output():
+    output = "\n".join([
+        "import time: self [us] | cumulative | imported package",
+        "import time:       120 |        120 |     json.decoder",
+        "import time:       300 |        420 |   json",
+        "import time:        50 |        470 | src.worker",
+    ])
+    
+    rows = parse_importtime(output)
+    report = summarize(rows)
+    
+    assert [r["module"] for r in rows] == ["json.decoder", "json", "src.worker"]
+    assert [r["depth"] for r in rows] == [2, 1, 0]
+    assert report["total_us"] == 470
+    assert report["by_package"] == {"json": 420, "src": 50}
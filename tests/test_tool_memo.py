@@ -0,0 +1,99 @@
+import pytest
+from src.agents import tool_memo
+from src.agents.tool_memo import ToolMemo, memo_scope, memoized
+from src.utils.metrics import METRICS
+
+
+@pytest.fixture(autouse=True)
+def fresh_memo(monkeypatch):
+    monkeypatch.setattr(tool_memo, "_memo", ToolMemo())
+    METRICS.reset()
+    yield
+    METRICS.reset()
+
+
+def counting_tool():
+    calls = []
+    
+    @memoized
+    def validate(address: str, strict: bool = False) -> str:
+        calls.append(address)
+        return f"{address} checked #{len(calls)}"
+    
+    return validate, calls
+
+
+def test_memoized_tool_reuses_result_within_order():
+    validate, calls = counting_tool()
+    with memo_scope("ORD-1"):
+        first = validate("1 Main St")
+        assert validate(address="1 Main St") == first
+        validate("2 Main St")
+    with memo_scope("ORD-2"):
+        validate("1 Main St")
+    
+    assert calls == ["1 Main St", "2 Main St", "1 Main St"]
+    assert METRICS.counter("tool_memo.hits", tool="validate") == 1
+
+
+def test_memoized_tool_without_scope_always_runs():
+    validate, calls = counting_tool()
+    validate("1 Main St")
+    validate("1 Main St")
+    assert len(calls) == 2
+
+
+def test_payment_charge_is_keyed_on_order_attempt_not_model_arguments(monkeypatch):
+    from src.agents import payment
+    provider = payment.LocalPaymentProvider()
+    monkeypatch.setattr(payment, "PAYMENT_PROVIDER", provider)
+    
+    token = payment._charge_key.set(payment.charge_idempotency_key("ORD-1", 0))
+    try:
+        first = payment.process_payment(10.0, "visa", "4242")
+        assert payment.process_payment(10.001, "credit card", "4242") == first
+    finally:
+        payment._charge_key.reset(token)
+    assert METRICS.counter("payment.idempotent_replays") == 1
+    
+    assert provider.charge(payment.charge_idempotency_key("ORD-1", 1), 10.0, "4242") is not None
+    assert METRICS.counter("payment.idempotent_replays") == 1
+
+
+def test_payment_provider_forgets_oldest_and_expired_keys():
+    from src.agents.payment import LocalPaymentProvider
+    now = [0.0]
+    provider = LocalPaymentProvider(max_keys=2, ttl_seconds=10, clock=lambda: now[0])
+    provider.charge("a", 10.0, "4242")
+    provider.charge("b", 10.0, "4242")
+    provider.charge("c", 10.0, "4242")
+    assert len(provider) == 2
+    
+    now[0] = 5
+    assert provider.charge("b", 10.0, "4242") == provider.charge("b", 10.0, "4242")
+    now[0] = 11
+    provider.charge("a", 10.0, "4242")
+    assert len(provider) == 1
+
+
+def test_memo_evicts_oldest_and_expired_orders():
+    now = [0.0]
+    memo = ToolMemo(max_scopes=2, ttl_seconds=10, clock=lambda: now[0])
+    memo.put("a", "k", 1)
+    memo.put("b", "k", 2)
+    memo.get("a", "k")
+    memo.put("c", "k", 3)
+    assert memo.get("b", "k") == (False, None)
+    assert memo.get("a", "k") == (True, 1)
+    
+    now[0] = 11
+    assert memo.get("a", "k") == (False, None)
+    assert len(memo) == 1
+
+
+def test_agent_tools_keep_their_schema():
+    from src.agents.payment import TOOLS
+    
+    schemas = {tool.name: list(tool.params_json_schema["properties"]) for tool in TOOLS}
+    assert schemas["process_payment"] == ["amount", "payment_method", "card_last4"]
+    assert schemas["check_fraud_risk"] == ["amount", "customer_email", "shipping_address"]
@@ -0,0 +1,56 @@
+import asyncio
+import json
+from types import SimpleNamespace
+import pytest
+from src.utils.warmup import WarmupReport, clear_ready, signal_ready, signal_when_running, warm_up
+
+
+@pytest.mark.asyncio
+async def test_warm_up_times_every_step_without_calling_the_model():
+    report = await warm_up(connections=0)
+
+    assert [s["step"] for s in report.steps] == [
+        "agents", "model_client", "model_connections", "serialization",
+        "catalog", "quote", "prompts_and_decisions", "status_updates"
+    ]
+    assert all(s["error"] is None for s in report.steps), report.steps
+    assert report.total_ms >= sum(s["ms"] for s in report.steps) - 1
+
+
+@pytest.mark.asyncio
+async def test_failing_step_is_reported_not_raised():
+    report = WarmupReport()
+    async with report.step("broken"):
+        raise RuntimeError("boom")
+
+    assert report.steps[0]["error"] == "RuntimeError: boom"
+
+
+def test_ready_file_written_and_cleared(tmp_path, monkeypatch):
+    path = tmp_path / "ready.json"
+    monkeypatch.setenv("WORKER_READY_FILE", str(path))
+    report = WarmupReport()
+    report.finish()
+
+    signal_ready(report, ["orders", "orders-high"])
+    ready = json.loads(path.read_text())
+    assert ready["task_queues"] == ["orders", "orders-high"]
+    assert ready["warmup"]["steps"] == []
+
+    clear_ready()
+    assert not path.exists()
+
+
+@pytest.mark.asyncio
+async def test_ready_only_once_every_worker_is_running(tmp_path, monkeypatch):
+    path = tmp_path / "ready.json"
+    monkeypatch.setenv("WORKER_READY_FILE", str(path))
+    workers = [SimpleNamespace(is_running=True), SimpleNamespace(is_running=False)]
+
+    task = asyncio.create_task(signal_when_running(workers, WarmupReport(), ["orders"], poll_seconds=0.01))
+    await asyncio.sleep(0.05)
+    assert not path.exists()
+
+    workers[1].is_running = True
+    await asyncio.wait_for(task, timeout=1)
+    assert path.exists()